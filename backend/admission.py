@@ -0,0 +1,134 @@
+"""
+admission.py
+Admission control for the expensive endpoints of one worker.
+
+The per-IP rate limit (main.check_rate_limit) does nothing against many
+distinct clients. Without a cap, every extra concurrent analysis slows all
+the others down until they all time out. AdmissionController runs at most
+`limit` analyses at once. Up to `max_queue` more wait in FIFO order, each
+for at most `max_wait` seconds:
+
+    waited = await admission.acquire()   # raises Overloaded
+    try:
+        ...
+    finally:
+        admission.release(elapsed)
+
+Requests that find the queue full, or that wait too long, fail fast with
+Overloaded. It carries a retry_after estimate from the recent service time,
+which main.py turns into a 503 with Retry-After. Admitted requests then run
+at the speed of `limit` concurrent analyses, so completed analyses per
+second (goodput) stay flat under overload instead of collapsing.
+
+All methods run on the worker's event loop; no locking is needed.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; `reason` is 'queue_full' or 'queue_timeout'."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO wait queue.
+
+    Args:
+        limit: analyses allowed to run at once
+        max_queue: requests allowed to wait for a slot; more are rejected at once
+        max_wait: seconds a request may wait before it is rejected
+        alpha: weight of the newest sample in the service-time average
+    """
+
+    def __init__(self, limit: int, max_queue: int, max_wait: float, alpha: float = 0.2):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.alpha = alpha
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service = 1.0  # seconds, moving average of admitted requests
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a retry is likely to be admitted (at least 1)."""
+        return max(1, math.ceil(self._service * (self.waiting + 1) / self.limit))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot. Returns the seconds spent waiting.
+
+        Raises:
+            Overloaded: if the queue is full or no slot freed up within max_wait
+        """
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded("queue_full", self.retry_after())
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over by resolving the future
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            self.rejected += 1
+            raise Overloaded("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            self._forget(waiter)
+            raise
+        self.admitted += 1
+        return time.monotonic() - start
+
+    def release(self, elapsed: Optional[float] = None) -> None:
+        """Free the slot of a request that ran for `elapsed` seconds (passes it to the next waiter)."""
+        if elapsed is not None:
+            self._service = self._service * (1 - self.alpha) + elapsed * self.alpha
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Granted a slot just as it gave up: pass the slot on
+            self.release()
+        elif waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Limits, current queue depth and counters."""
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "service_ms": round(self._service * 1000, 1),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
@@ -29,27 +29,31 @@ Requirements (add to requirements.txt):
 """
 
 from __future__ import annotations
-from typing import List, Dict, Tuple, Set, Any
+from typing import List, Dict, Tuple, Set, Any, Optional
 import re
+import threading
 
-from collections import Counter
 
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-from spacy.matcher import PhraseMatcher
-from skillNer.skill_extractor_class import SkillExtractor
-from skillNer.general_params import SKILL_DB
 from parser import _normalize
+from skill_artifact import get_skill_artifact
+from skill_vocab import SkillSet, cover, normalize_skill, vocab
+from jd_segmenter import PREFERRED_WEIGHT, focus_jd
+from deadline import DeadlineExceeded, check_deadline
+from fidelity import FULL, current_fidelity, disabled_pipes, extraction_tier, fidelity_scope
+from resume_structure import is_structure
+from structure_index import StructureIndex, build_structure_index
 
-# Initialize spaCy model
-try:
-    nlp = spacy.load("en_core_web_lg")
-except Exception:
-    try:
-        nlp = spacy.load("en_core_web_sm")
-    except Exception:
-        raise ImportError("spaCy model not found. Please install en_core_web_lg or en_core_web_sm")
+# Share the spaCy model loaded by suggest_skills: a second spacy.load() would
+# keep another private copy of the (large) vector table in every worker.
+import suggest_skills
+from suggest_skills import nlp
+
+
+def _get_skill_extractor():
+    """The process-wide SkillNER extractor built by suggest_skills (None if unavailable)."""
+    return suggest_skills.skill_extractor
 
 
 # -----------------------
@@ -104,6 +108,7 @@ class ATSCalculator:
     """
 
     MIN_TEXT_LENGTH = 50  # sanity threshold for meaningful content
+    PIPE_BATCH_SIZE = 16  # bullets per nlp.pipe batch (deadline checked in between)
 
     # Scoring weights (sum to 1.0)
     SKILL_COVERAGE_WEIGHT = 0.25
@@ -125,89 +130,223 @@ class ATSCalculator:
             raise ValueError(msg)
 
         self.jd_text_raw = jd_text
-        self.jd_text = _normalize(jd_text)
+        # Only the sections worth matching against (no benefits, EEO or company text)
+        focused = focus_jd(jd_text)
+        self.jd_text = _normalize(focused.text)
 
-        # Initialize SkillNER with error handling
+        # Share one SkillNER extractor per process: building its matchers
+        # takes tens of seconds, far too slow to repeat per request.
         self.nlp = nlp  # Use shared spaCy instance
-        try:
-            # phrase_matcher = PhraseMatcher(self.nlp.vocab)
-            self.skill_extractor = SkillExtractor(self.nlp, SKILL_DB, PhraseMatcher)
-        except Exception as e:
-            print(f"Warning: Could not initialize SkillExtractor in ATS Calculator: {e}")
-            print("Using fallback skill extraction...")
-            self.skill_extractor = None
+        self.skill_extractor = _get_skill_extractor()
 
-        # Extract skills from JD
-        self.jd_skills = self._extract_skills(self.jd_text)
+        # Extract skills from JD (canonical names and their SkillSet, see skill_vocab.py)
+        # for the current tier's extractor; other tiers are extracted on first use
+        self._focused = focused
+        self._jd_skill_sets: Dict[str, Tuple[Set[str], SkillSet, SkillSet]] = {}
+        self.jd_skill_sets()
         
         # Extract experience requirements once
         self.jd_required_years = self._extract_experience_requirements(self.jd_text)
 
-        # For internal logging/explainability
-        self.debug_details: Dict[str, Any] = {}
+        # For internal logging/explainability (see debug_details)
+        self._debug = threading.local()
+
+    def jd_skill_sets(self) -> Tuple[Set[str], SkillSet, SkillSet]:
+        """
+        (JD skills, their SkillSet, the nice-to-have part) from the extractor of
+        the current fidelity tier, the one resume skills are extracted with.
+        Skills only asked for as nice-to-haves count PREFERRED_WEIGHT in coverage.
+        """
+        tier = extraction_tier()
+        sets = self._jd_skill_sets.get(tier)
+        if sets is None:
+            with fidelity_scope(tier):
+                skills = self._extract_skills(_normalize(self._focused.core))
+                preferred = self._extract_skills(_normalize(self._focused.preferred)) - skills
+            skills |= preferred
+            sets = self._jd_skill_sets[tier] = (skills, vocab.encode(skills), vocab.encode(preferred))
+        return sets
+
+    @property
+    def jd_skills(self) -> Set[str]:
+        return self.jd_skill_sets()[0]
+
+    @property
+    def jd_skill_bits(self) -> SkillSet:
+        return self.jd_skill_sets()[1]
+
+    @property
+    def jd_preferred_bits(self) -> SkillSet:
+        return self.jd_skill_sets()[2]
+
+    @property
+    def debug_details(self) -> Dict[str, Any]:
+        """
+        Details of the latest scoring call in the current thread. Per thread,
+        because a registered JD's calculator scores concurrent requests.
+        """
+        return self._debug.__dict__.setdefault("details", {})
 
     # -----------------------
     # Public API
     # -----------------------
-    def total_score(self, resume_text: str, resume_structure: List[Dict]) -> int:
+    def total_score(self, resume_text: str, resume_structure: List[Dict],
+                    index: Optional[StructureIndex] = None,
+                    readability: Optional[Tuple[List[int], int]] = None,
+                    content: Optional[Tuple[float, Dict[str, Any]]] = None) -> int:
         """
         Compute final ATS score 0–100.
         Only return the integer to keep frontend simple.
+        `index` (structure_index.py) may be shared with restructure advice;
+        `readability` (readability_inputs()) and `content` (content_score())
+        may be computed beforehand, concurrently (see pipeline.py); the
+        details content_score() recorded are merged into this thread's.
         """
-        ok, msg = self._validate_text(resume_text, "Resume")
-        if not ok:
-            # Log internally and return 0 for invalid text
-            self.debug_details["error"] = msg
+        self._debug.details = {}
+        if index is None:
+            index = build_structure_index(resume_structure)
+        if not self._precheck(resume_text, resume_structure, index):
             return 0
 
-        if not isinstance(resume_structure, list) or not resume_structure:
-            self.debug_details["error"] = "Invalid or empty resume structure"
+        try:
+            if content is None:
+                content_score = self._content_score(resume_text)
+            else:
+                content_score, content_details = content
+                self.debug_details.update(content_details)
+            # If time runs out in the readability pass (the NLP-heavy part),
+            # the stage falls back to this score without readability
+            structure_only = max(0.0, min(0.40, self._structure_score(index)))
+            check_deadline("ats", partial=int(round((content_score + structure_only) * 100)))
+            formatting_score = self._formatting_score(resume_text, index, readability)
+            final = content_score + formatting_score
+            final_pct = int(round(final * 100))
+            self.debug_details["final_score"] = final_pct
+            return final_pct
+        except DeadlineExceeded:
+            # Handled by the caller (pipeline.run_stage), not a zero score
+            raise
+        except Exception as e:
+            self.debug_details["error"] = f"ATS computation error: {e}"
             return 0
 
-        # Check disqualifiers early
-        disq_ok, disq_reason = self._check_disqualifiers(resume_structure)
-        if not disq_ok:
-            self.debug_details["disqualified"] = disq_reason
+    def content_score(self, resume_text: str) -> Tuple[float, Dict[str, Any]]:
+        """
+        Content part of the score (0–0.60), the JD-dependent part, with the
+        debug details it recorded (e.g. skill_synonyms): debug_details is per
+        thread, and total_score(content=...) usually runs on another one.
+        """
+        self._debug.details = {}
+        score = self._content_score(resume_text)
+        return score, dict(self.debug_details)
+
+    def annotate_element(self, element: Dict) -> Dict[str, Any]:
+        """
+        Per-element inputs to the score, computed independently of the JD and of
+        the other elements, so callers (live_session) can cache them and only
+        re-annotate elements that changed:
+            skills        - SkillSet (skill_vocab.py) of the skills in the element content
+            sent_lengths  - word count of each sentence in the element
+            verb_start    - bullet that starts with a verb
+        """
+        content = element.get("content") or ""
+        if not content.strip():
+            return {"skills": SkillSet(), "sent_lengths": [], "verb_start": False}
+        doc = self.nlp(content)
+        return {
+            "skills": vocab.encode(self._extract_skills(_normalize(content))),
+            "sent_lengths": [self._sentence_length(s) for s in doc.sents],
+            "verb_start": element.get("type") == "bullet" and self._starts_with_verb(doc),
+        }
+
+    def score_annotated(self, resume_text: str, resume_structure: List[Dict],
+                        annotations: List[Dict[str, Any]],
+                        index: Optional[StructureIndex] = None) -> int:
+        """
+        Same score as total_score, but built from per-element annotations
+        (see annotate_element) instead of running the NLP pipeline over the
+        whole resume. `annotations` is parallel to `resume_structure`.
+        """
+        self._debug.details = {}
+        if index is None:
+            index = build_structure_index(resume_structure)
+        if not self._precheck(resume_text, resume_structure, index):
             return 0
 
         try:
-            content_score = self._content_score(resume_text)
-            formatting_score = self._formatting_score(resume_text, resume_structure)
-            final = content_score + formatting_score
-            final_pct = int(round(final * 100))
+            resume_skills = SkillSet()
+            sent_lengths: List[int] = []
+            verb_starts = 0
+            for ann in annotations:
+                resume_skills |= ann["skills"]
+                sent_lengths.extend(ann["sent_lengths"])
+                verb_starts += ann["verb_start"]
+
+            content_score = self._content_from_skills(_normalize(resume_text), resume_skills)
+            formatting_score = min(0.40, self._structure_score(index)
+                                   + self._readability_score(sent_lengths, verb_starts))
+            final_pct = int(round((content_score + max(0.0, formatting_score)) * 100))
             self.debug_details["final_score"] = final_pct
             return final_pct
         except Exception as e:
             self.debug_details["error"] = f"ATS computation error: {e}"
             return 0
 
+    def _precheck(self, resume_text: str, resume_structure: List[Dict], index: StructureIndex) -> bool:
+        """Validation and hard disqualifiers shared by the scoring entry points."""
+        ok, msg = self._validate_text(resume_text, "Resume")
+        if not ok:
+            # Log internally and return 0 for invalid text
+            self.debug_details["error"] = msg
+            return False
+
+        if not is_structure(resume_structure) or not resume_structure:
+            self.debug_details["error"] = "Invalid or empty resume structure"
+            return False
+
+        # Check disqualifiers early
+        disq_ok, disq_reason = self._check_disqualifiers(index)
+        if not disq_ok:
+            self.debug_details["disqualified"] = disq_reason
+            return False
+        return True
+
     # -----------------------
     # Content scoring (0.60)
     # -----------------------
     def _extract_skills(self, text: str) -> Set[str]:
-        """Extract skills from text using SkillNER or fallback methods."""
+        """Extract skills (canonical names, see skill_vocab.py) using SkillNER or fallback methods."""
         if not text or not text.strip():
             return set()
 
         skills = set()
 
+        # Read once: a concurrent call may disable the extractor meanwhile.
+        # Below full fidelity (under load) SkillNER is skipped for the artifact.
+        extractor = self.skill_extractor if current_fidelity() == FULL else None
+
         # Try SkillNER if available
-        if self.skill_extractor is not None:
+        if extractor is not None:
             try:
-                annotations = self.skill_extractor.annotate(text)
+                annotations = extractor.annotate(text)
                 # Get full matches and high-confidence n-gram matches
-                full_matches = {match['doc_node_value'].lower().strip()
+                full_matches = {normalize_skill(match['doc_node_value'])
                               for match in annotations['results']['full_matches']}
-                ngram_matches = {match['doc_node_value'].lower().strip()
+                ngram_matches = {normalize_skill(match['doc_node_value'])
                                for match in annotations['results']['ngram_scored']
                                if match.get('score', 0) > 0.7}
                 skills.update(full_matches.union(ngram_matches))
             except Exception as e:
                 print(f"Skill extraction error: {e}")
-                self.skill_extractor = None  # Disable for future calls
+                self.skill_extractor = extractor = None  # Disable for future calls
 
-        # Fallback to basic pattern matching if SkillNER is not available
-        if self.skill_extractor is None:
+        # Precompiled skill artifact (see skill_artifact.py) if SkillNER is not available
+        artifact = get_skill_artifact() if extractor is None else None
+        if artifact is not None:
+            skills.update(normalize_skill(s) for s in artifact.extract(text))
+
+        # Fallback to basic pattern matching if neither is available
+        if extractor is None and artifact is None:
             # Use basic keyword matching
             text_lower = text.lower()
             common_skills = {
@@ -218,18 +357,30 @@ class ATSCalculator:
                 if skill in text_lower:
                     skills.add(skill)
 
-        return skills
+        return vocab.canonical(skills)
 
     def _content_score(self, resume_text: str) -> float:
         """Combine skill coverage, TF-IDF similarity, and keyword matching."""
+        check_deadline("ats")
         resume_norm = _normalize(resume_text)
-        resume_skills = self._extract_skills(resume_norm)
-        
+        resume_skills = vocab.encode(self._extract_skills(resume_norm))
+        check_deadline("ats")
+        return self._content_from_skills(resume_norm, resume_skills)
+
+    def _skill_weight(self, skills: SkillSet) -> float:
+        """Number of JD skills in `skills`, nice-to-have ones counting PREFERRED_WEIGHT."""
+        preferred = len(skills & self.jd_preferred_bits)
+        return len(skills) - preferred + PREFERRED_WEIGHT * preferred
+
+    def _content_from_skills(self, resume_norm: str, resume_skills: SkillSet) -> float:
+        """Content score given the normalized resume text and its SkillSet."""
         # 1) Skill coverage (0.25)
         skill_coverage = 0.0
-        if self.jd_skills:
-            matched_skills = self.jd_skills.intersection(resume_skills)
-            skill_coverage = len(matched_skills) / len(self.jd_skills)
+        if self.jd_skill_bits:
+            # Same canonical skill, or a synonym by word-vector similarity
+            covered, synonyms = cover(self.jd_skill_bits, resume_skills)
+            skill_coverage = self._skill_weight(covered) / self._skill_weight(self.jd_skill_bits)
+            self.debug_details["skill_synonyms"] = synonyms
         
         skill_component = self.SKILL_COVERAGE_WEIGHT * skill_coverage
         
@@ -245,15 +396,11 @@ class ATSCalculator:
             print(f"TF-IDF error: {e}")
             
         # 3) Keyword matching (0.15)
-        keyword_component = 0.0
-        try:
-            doc = self.nlp(resume_norm.lower())
-            present_keywords = [kw for kw in self.IMPORTANT_KEYWORDS 
-                              if kw in doc.text]
-            keyword_score = len(present_keywords) / len(self.IMPORTANT_KEYWORDS)
-            keyword_component = self.KEYWORD_MATCH_WEIGHT * keyword_score
-        except Exception as e:
-            print(f"Keyword matching error: {e}")
+        # resume_norm is already lowercased; no need to run the pipeline over it
+        present_keywords = [kw for kw in self.IMPORTANT_KEYWORDS 
+                          if kw in resume_norm]
+        keyword_score = len(present_keywords) / len(self.IMPORTANT_KEYWORDS)
+        keyword_component = self.KEYWORD_MATCH_WEIGHT * keyword_score
             
         # Experience bonus (small)
         exp_bonus = self._experience_bonus(resume_norm)
@@ -265,29 +412,52 @@ class ATSCalculator:
     # -----------------------
     # Formatting scoring (0.40)
     # -----------------------
-    def _formatting_score(self, resume_text: str, resume_structure: List[Dict]) -> float:
+    def _formatting_score(self, resume_text: str, index: StructureIndex,
+                          readability: Optional[Tuple[List[int], int]] = None) -> float:
+        score = self._structure_score(index)
+
+        # Readability & action verbs (0.10)
+        sent_lengths, verb_starts = readability or self.readability_inputs(resume_text, index)
+        score += self._readability_score(sent_lengths, verb_starts)
+
+        # Final clamp within 0–0.40 just in case
+        return max(0.0, min(0.40, score))
+
+    @classmethod
+    def readability_inputs(cls, resume_text: str, index: StructureIndex) -> Tuple[List[int], int]:
+        """
+        The NLP-heavy part of the formatting score, independent of the JD:
+        sentence lengths of the resume and the number of verb-initial bullets.
+        Below full fidelity, spaCy components these do not need are skipped.
+        """
+        check_deadline("ats")
+        disable = disabled_pipes(nlp)
+        doc = nlp(resume_text, disable=disable)
+        sent_lengths = [cls._sentence_length(s) for s in doc.sents]
+
+        # Action verbs: bullets that start with a verb, checking the deadline
+        # between nlp.pipe batches
+        verb_starts = 0
+        for i, bullet_doc in enumerate(nlp.pipe(index.bullets, batch_size=cls.PIPE_BATCH_SIZE, disable=disable)):
+            if i % cls.PIPE_BATCH_SIZE == 0:
+                check_deadline("ats")
+            if cls._starts_with_verb(bullet_doc):
+                verb_starts += 1
+        return sent_lengths, verb_starts
+
+    def _structure_score(self, index: StructureIndex) -> float:
+        """Sections (0.20) and bullet balance (0.10) -- structure only, no NLP."""
         score = 0.0
-        details: Dict = {}
 
         # 1) Sections presence (0.20): skills/experience/education
         required = {"skills", "experience", "education"}
-        headings = [it.get("content", "").lower() for it in resume_structure if it.get("type") == "heading"]
-        present = {h for h in headings if h in required}
+        present = {h.lower() for h in index.headings if h.lower() in required}
         sections_component = self.SECTIONS_WEIGHT * (len(present) / len(required))
         score += sections_component
-        details["sections_found"] = list(present)
+        self.debug_details["sections_found"] = list(present)
 
         # 2) Bullet balance (0.10): reward 2–4 bullets per major section, mild penalty beyond
-        bullets_by_section = Counter()
-        current = None
-        for it in resume_structure:
-            if it.get("type") == "heading":
-                h = it.get("content", "").lower()
-                current = h if h in {"experience", "projects", "project", "education"} else None
-                if current and current not in bullets_by_section:
-                    bullets_by_section[current] = 0
-            elif it.get("type") == "bullet" and current:
-                bullets_by_section[current] += 1
+        bullets_by_section = index.bullets_by_section({"experience", "projects", "project", "education"})
 
         bullet_component = 0.0
         for _, cnt in bullets_by_section.items():
@@ -298,43 +468,37 @@ class ATSCalculator:
         # Clamp within [0, BULLETS_WEIGHT]
         bullet_component = max(0.0, min(self.BULLETS_WEIGHT, bullet_component))
         score += bullet_component
-        details["bullets_by_section"] = dict(bullets_by_section)
+        self.debug_details["bullets_by_section"] = bullets_by_section
+        return score
 
-        # 3) Readability & action verbs (0.10)
+    def _readability_score(self, sent_lengths: List[int], verb_starts: int) -> float:
+        """Readability & action verbs (0.10) from sentence lengths and verb-initial bullets."""
         read_component = 0.0
-        doc = nlp(resume_text)
-        sents = [s for s in doc.sents]
-        if sents:
-            avg_len = sum(len([t for t in s if not (t.is_punct or t.is_space)]) for s in sents) / len(sents)
-        else:
-            avg_len = 0.0
+        avg_len = sum(sent_lengths) / len(sent_lengths) if sent_lengths else 0.0
 
         # Reward moderate sentences
         if 10 <= avg_len <= 30:
             read_component += self.READABILITY_VERBS_WEIGHT * 0.5  # 50% of this bucket
 
-        # Action verbs: bullets that start with a verb
-        verb_starts = 0
-        for it in resume_structure:
-            if it.get("type") == "bullet":
-                bdoc = nlp(it.get("content", ""))
-                first = next((t for t in bdoc if not (t.is_punct or t.is_space)), None)
-                if first is not None and first.pos_ == "VERB":
-                    verb_starts += 1
         if verb_starts >= 3:
             read_component += self.READABILITY_VERBS_WEIGHT * 0.5  # remaining 50%
 
         # Clamp within [0, READABILITY_VERBS_WEIGHT]
-        read_component = max(0.0, min(self.READABILITY_VERBS_WEIGHT, read_component))
-        score += read_component
+        return max(0.0, min(self.READABILITY_VERBS_WEIGHT, read_component))
 
-        # Final clamp within 0–0.40 just in case
-        return max(0.0, min(0.40, score))
+    @staticmethod
+    def _sentence_length(sent) -> int:
+        return len([t for t in sent if not (t.is_punct or t.is_space)])
+
+    @staticmethod
+    def _starts_with_verb(doc) -> bool:
+        first = next((t for t in doc if not (t.is_punct or t.is_space)), None)
+        return first is not None and first.pos_ == "VERB"
 
     # -----------------------
     # Disqualifiers (hard fails)
     # -----------------------
-    def _check_disqualifiers(self, resume_structure: List[Dict]) -> Tuple[bool, str]:
+    def _check_disqualifiers(self, index: StructureIndex) -> Tuple[bool, str]:
         """
         Hard rejections similar to ATS rules:
           - Tables/images present
@@ -342,43 +506,12 @@ class ATSCalculator:
 
         """
         # tables or images
-        if any(it.get("type") in {"table", "image"} for it in resume_structure):
+        if index.table_count or index.image_count:
             return False, "Resume contains tables or images (not ATS-friendly)"
 
-        # basic contact info check
-        email_regex = r'\b[A-Za-z0-9._%+-]+@[\w.-]+\.[A-Za-z]{2,}\b'
-        phone_regex = r'(\+\d{1,3}[-.\s]?)?\(?\d{1,5}\)?[-.\s]?\d{3}[-.\s]?\d{3,5}'  # Updated for broader formats
-        linkedin_regex = r'linkedin\.com/in/[\w-]+'
-        github_regex = r'github\.com/[\w-]+'
-
-        has_name = False
-        has_email = False
-        has_phone_or_profile = False
-
-        # Debug: Log all headings for inspection
-        headings = [it.get("content", "").strip() for it in resume_structure if it.get("type") == "heading"]
-        print("All headings:", headings)
-
-        for it in resume_structure:
-            content = (it.get("content") or "").strip()
-            if it.get("type") == "heading" and content:
-                # Relaxed name detection: Any first heading with 1-5 words, at least one capitalized
-                parts = content.split()
-                if 1 <= len(parts) <= 5 and any(p[0].isupper() for p in parts if p):
-                    has_name = True
-            low = content.lower()
-            if re.search(email_regex, content):
-                has_email = True
-            if re.search(phone_regex, content) or re.search(linkedin_regex, low) or re.search(github_regex, low):
-                has_phone_or_profile = True
-
-        # Debug prints for troubleshooting (remove after testing)
-        print("Has name:", has_name)
-        print("Has email:", has_email)
-        print("Has phone/profile:", has_phone_or_profile)
-
         # Less strict: Require name + (email OR phone/profile)
-        if not (has_name and (has_email or has_phone_or_profile)):
+        # Relaxed name detection: any heading with 1-5 words, at least one capitalized
+        if not (index.has_name_heading and (index.has_email or index.has_phone_or_profile)):
             return False, "Missing minimal contact information (name + email + phone or profile)"
 
         return True, ""
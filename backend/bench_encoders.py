@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark response encoders on typical and large analysis responses.
+
+Usage:
+    python bench_encoders.py                 # typical (~60 elements) and large (~3000 elements)
+    python bench_encoders.py --repeat 200
+
+For each payload the script reports the mean encode time, the body size and
+the gzip size/time for:
+
+    pydantic    AnalysisResponse validated, then jsonable_encoder + json.dumps
+                (FastAPI's default response path; needs main.py importable)
+    json        encoding.encode with the standard library
+    orjson      encoding.encode (default JSON encoder when orjson is installed)
+    msgpack     encoding.encode for Accept: application/msgpack
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+
+import encoding
+from resume_structure import ResumeStructure
+
+BULLET = "• Designed and shipped Python services on AWS, cutting p95 latency by 40%"
+
+
+def make_payload(elements: int) -> dict:
+    """An analysis response with `elements` structure elements."""
+    structure = ResumeStructure()
+    for n in range(elements):
+        if n % 12 == 0:
+            structure.append({"type": "heading", "content": f"Section {n // 12}", "font_size": 13.0,
+                              "page": 1 + n // 60})
+        else:
+            structure.append({"type": "bullet", "content": f"{BULLET} ({n})", "font_size": 10.5,
+                              "page": 1 + n // 60})
+    resume_text = "\n".join(element["content"] for element in structure)
+    return {
+        "success": True,
+        "jd_text": "Looking for a Python developer with AWS, Docker and SQL experience. " * 20,
+        "resume_text": resume_text,
+        "resume_structure": structure,
+        "ats_score": 73.5,
+        "suggested_skills": ["docker", "kubernetes", "terraform", "sql"],
+        "improvement_recommendation": [
+            {"issue": "Weak action verbs", "advice": "Start bullets with strong action verbs."}
+        ] * 5,
+        "stages": [
+            {"name": name, "status": "completed", "elapsed_ms": 12.5, "detail": None}
+            for name in ("parse", "skills", "ats", "structure")
+        ],
+    }
+
+
+def _encoders():
+    encoders = {}
+    try:
+        from fastapi.encoders import jsonable_encoder
+        from main import AnalysisResponse
+
+        def _pydantic(payload):
+            model = AnalysisResponse(**dict(payload, resume_structure=payload["resume_structure"].to_list()))
+            return json.dumps(jsonable_encoder(model)).encode("utf-8")
+        encoders["pydantic"] = _pydantic
+    except Exception as e:
+        print(f"(pydantic baseline skipped: {e})")
+
+    def _stdlib(payload):
+        saved, encoding.orjson = encoding.orjson, None
+        try:
+            return encoding.encode(payload, encoding.JSON)
+        finally:
+            encoding.orjson = saved
+    encoders["json"] = _stdlib
+    if encoding.orjson is not None:
+        encoders["orjson"] = lambda payload: encoding.encode(payload, encoding.JSON)
+    if encoding.msgpack is not None:
+        encoders["msgpack"] = lambda payload: encoding.encode(payload, encoding.MSGPACK)
+    return encoders
+
+
+def _time_ms(fn, arg, repeat: int) -> tuple:
+    fn(arg)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(samples), out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=50, help="Timed repetitions per encoder (default: 50)")
+    args = ap.parse_args()
+
+    encoders = _encoders()
+    for label, elements in (("typical", 60), ("large", 3000)):
+        payload = make_payload(elements)
+        print(f"\n{label} response ({elements} structure elements)")
+        print(f"{'encoder':>10} {'encode ms':>10} {'bytes':>10} {'gzip ms':>9} {'gzip bytes':>11}")
+        for name, fn in encoders.items():
+            encode_ms, body = _time_ms(fn, payload, args.repeat)
+            gzip_ms, compressed = _time_ms(gzip.compress, body, max(1, args.repeat // 5))
+            print(f"{name:>10} {encode_ms:10.3f} {len(body):10d} {gzip_ms:9.3f} {len(compressed):11d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the lite scoring engine against the full engine on a reference corpus.
+
+Usage:
+    python bench_engines.py                      # built-in sample pair
+    python bench_engines.py path/to/corpus       # *.pdf/*.docx resumes x *.txt JDs
+    python bench_engines.py corpus --repeat 20
+
+For every resume/JD pair both engines are run and the script reports per-pair
+latency (mean/p95) for each engine, the mean absolute score difference and the
+overlap (Jaccard) of the suggested skills.
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from lite_scorer import LiteATSCalculator, get_missing_skills_lite
+
+SAMPLE_JD = """
+Software Engineer position requiring:
+- 3+ years Python experience
+- Machine learning knowledge, SQL and Docker
+- Experience with AWS and REST APIs
+"""
+
+SAMPLE_RESUME = """
+John Doe
+john@email.com
+(555) 123-4567
+
+Experience:
+Software Engineer (2019-2023)
+- Developed Python applications
+- Worked with databases
+- Built machine learning models
+
+Skills:
+Python, SQL, Machine Learning
+"""
+
+SAMPLE_STRUCTURE = [
+    {"type": "heading", "content": "John Doe", "font_size": 14},
+    {"type": "text", "content": "john@email.com", "font_size": 11},
+    {"type": "text", "content": "(555) 123-4567", "font_size": 11},
+    {"type": "heading", "content": "Experience", "font_size": 12},
+    {"type": "text", "content": "Software Engineer (2019-2023)", "font_size": 11},
+    {"type": "bullet", "content": "Developed Python applications", "font_size": 11},
+    {"type": "bullet", "content": "Worked with databases", "font_size": 11},
+    {"type": "bullet", "content": "Built machine learning models", "font_size": 11},
+    {"type": "heading", "content": "Skills", "font_size": 12},
+    {"type": "text", "content": "Python, SQL, Machine Learning", "font_size": 11},
+]
+
+
+class _CorpusFile:
+    """Minimal stand-in for UploadFile so parser.parse_resume can read from disk."""
+
+    def __init__(self, path: str):
+        self.filename = os.path.basename(path)
+        with open(path, "rb") as f:
+            self.file = BytesIO(f.read())
+
+
+def load_corpus(corpus_dir):
+    """Return (resumes, jds): resumes as (name, text, structure), JDs as (name, text)."""
+    if not corpus_dir:
+        return [("sample", SAMPLE_RESUME, SAMPLE_STRUCTURE)], [("sample", SAMPLE_JD)]
+
+    import parser
+
+    resumes = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.pdf")) + glob.glob(os.path.join(corpus_dir, "*.docx"))):
+        try:
+            text, structure = parser.parse_resume(_CorpusFile(path))
+            resumes.append((os.path.basename(path), text, structure))
+        except Exception as e:
+            print(f"  skipping {path}: {e}")
+
+    jds = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            jds.append((os.path.basename(path), f.read()))
+    return resumes, jds
+
+
+def run_engine(engine, jd_text, resume_text, structure):
+    """Score one pair with the given engine; returns (score, suggested_skills)."""
+    if engine == "lite":
+        calc = LiteATSCalculator(jd_text)
+        return calc.total_score(resume_text, structure), get_missing_skills_lite(jd_text, resume_text)
+
+    from ats_calculator import ATSCalculator
+    from suggest_skills import get_missing_skills
+
+    calc = ATSCalculator(jd_text)
+    return calc.total_score(resume_text, structure), get_missing_skills(jd_text, resume_text)
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("corpus", nargs="?", help="Directory with *.pdf/*.docx resumes and *.txt JDs")
+    ap.add_argument("--repeat", type=int, default=5, help="Timed repetitions per pair (default: 5)")
+    ap.add_argument("--lite-only", action="store_true", help="Skip the full engine (no spaCy needed)")
+    args = ap.parse_args()
+
+    resumes, jds = load_corpus(args.corpus)
+    if not resumes or not jds:
+        print("Corpus needs at least one resume (*.pdf/*.docx) and one JD (*.txt)")
+        return 1
+
+    engines = ["lite"] if args.lite_only else ["lite", "full"]
+    timings = {eng: [] for eng in engines}
+    results = {eng: [] for eng in engines}
+
+    print(f"Benchmarking {len(resumes)} resumes x {len(jds)} JDs, {args.repeat} repetitions\n")
+    for _, jd_text in jds:
+        for _, resume_text, structure in resumes:
+            for eng in engines:
+                # Warm-up run (model load / regex compile) is not timed
+                out = run_engine(eng, jd_text, resume_text, structure)
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    run_engine(eng, jd_text, resume_text, structure)
+                    timings[eng].append((time.perf_counter() - start) * 1000)
+                results[eng].append(out)
+
+    for eng in engines:
+        t = timings[eng]
+        print(f"{eng:>5}: mean {statistics.mean(t):8.2f} ms   p95 {_p95(t):8.2f} ms   ({len(t)} runs)")
+
+    if "full" in results:
+        diffs = [abs(l[0] - f[0]) for l, f in zip(results["lite"], results["full"])]
+        overlaps = []
+        for (_, lite_skills), (_, full_skills) in zip(results["lite"], results["full"]):
+            union = set(lite_skills) | set(full_skills)
+            overlaps.append(len(set(lite_skills) & set(full_skills)) / len(union) if union else 1.0)
+        print(f"\nScore |lite - full|: mean {statistics.mean(diffs):.1f}, max {max(diffs)}")
+        print(f"Suggested skills Jaccard: mean {statistics.mean(overlaps):.2f}")
+        print(f"Speedup: {statistics.mean(timings['full']) / max(1e-9, statistics.mean(timings['lite'])):.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+bulk_score.py
+Offline bulk scoring: many resumes against one or more job descriptions,
+without the HTTP API.
+
+    python bulk_score.py resumes/ "archive/**/*.pdf" --jd jds/*.txt -o scores.jsonl
+    python bulk_score.py resumes/ --jd backend.txt frontend.txt -o scores.csv --workers 8
+    python bulk_score.py resumes/ --jd backend.txt -o scores.jsonl --resume   # continue
+
+Resume arguments are files, directories (searched recursively for .pdf and
+.docx) or glob patterns; JD arguments are UTF-8 text files. Every resume is
+parsed once and analyzed against every JD with the same pipeline as /process
+(parse -> skills -> ats -> structure, no time budget), one output row per
+(resume, JD) pair.
+
+The master preloads the models (preload.py) and analyzes each JD once
+(jd_registry.analyze_jd) before forking the pool, so workers share the model
+and JD memory and start scoring immediately. Rows are appended to the output
+(.jsonl or .csv, by extension or --format) as resumes finish; with --resume
+the pairs already in the output are skipped, so an interrupted run picks up
+where it stopped. Progress and throughput go to stderr.
+"""
+
+import os
+
+# One thread per worker process: the pool provides the parallelism, and BLAS
+# threads in every worker would oversubscribe the cores
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+CSV_COLUMNS = (
+    "resume", "jd", "jd_id", "ats_score", "suggested_skills",
+    "recommendations", "stages", "error", "elapsed_ms",
+)
+
+# Set in the master before forking (shared copy-on-write); built by the pool
+# initializer where fork is unavailable
+_jd_profiles: Dict[str, Any] = {}
+_engine = "full"
+
+
+def collect_resumes(patterns: Iterable[str]) -> List[str]:
+    """Expand files, directories and glob patterns into a sorted list of resume paths."""
+    paths: Set[str] = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                paths.update(
+                    os.path.join(root, name) for name in files
+                    if name.lower().endswith(RESUME_EXTENSIONS)
+                )
+        elif os.path.isfile(pattern):
+            paths.add(pattern)
+        else:
+            paths.update(
+                path for path in glob.glob(pattern, recursive=True)
+                if os.path.isfile(path) and path.lower().endswith(RESUME_EXTENSIONS)
+            )
+    return sorted(paths)
+
+
+def load_jds(patterns: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """(name, jd_id, text) for every JD file; names are the file names."""
+    from jd_registry import jd_hash
+    from parser import extract_jd_from_text
+
+    jds = []
+    for pattern in patterns:
+        matches = [pattern] if os.path.isfile(pattern) else sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise ValueError(f"No job description file matches {pattern!r}")
+        for path in matches:
+            with open(path, encoding="utf-8") as f:
+                text = extract_jd_from_text(f.read())
+            if not text:
+                raise ValueError(f"Job description {path} is empty")
+            jds.append((os.path.basename(path), jd_hash(text), text))
+    return jds
+
+
+def read_checkpoint(path: str, fmt: str) -> Set[Tuple[str, str]]:
+    """(resume, jd_id) pairs already written to an existing output file."""
+    done: Set[Tuple[str, str]] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            rows: Iterable[Dict[str, Any]] = csv.DictReader(f)
+        else:
+            rows = _jsonl_rows(f)
+        for row in rows:
+            if fmt == "csv" and None in row.values():
+                # Fewer fields than CSV_COLUMNS: a row cut off by an interrupted run
+                continue
+            if row.get("resume") and row.get("jd_id"):
+                done.add((row["resume"], row["jd_id"]))
+    return done
+
+
+def drop_partial_line(path: str) -> None:
+    """Truncate an output file after its last complete line (the rest of an interrupted write)."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(pos, 64 * 1024)
+            f.seek(pos - step)
+            newline = f.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        if pos < end:
+            f.truncate(pos)
+
+
+def _jsonl_rows(f) -> Iterable[Dict[str, Any]]:
+    for line in f:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # A line cut off by an interrupted run: that pair is redone
+            continue
+
+
+def _init_worker(jds: List[Tuple[str, str, str]], engine: str, quiet: bool) -> None:
+    global _engine
+    import parser
+    import pipeline
+    from preload import after_fork
+
+    after_fork()
+    # Parallelism is across resumes; no nested page or stage pools inside workers
+    parser.PDF_WORKERS = 1
+    pipeline.ANALYSIS_THREADS = 1
+    _engine = engine
+    if quiet:
+        # The pipeline logs every stage; with thousands of resumes only progress matters
+        sys.stdout = open(os.devnull, "w")
+    if not _jd_profiles:
+        _jd_profiles.update(_analyze_jds(jds))
+
+
+def _analyze_jds(jds: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+    from jd_registry import analyze_jd
+
+    return {jd_id: analyze_jd(jd_id, text, float("inf")) for _, jd_id, text in jds}
+
+
+def score_resume(task: Tuple[str, List[Tuple[str, str]]]) -> List[Dict[str, Any]]:
+    """
+    Parse one resume and analyze it against the given (jd name, jd_id)
+    pairs. Failures are reported in the rows' 'error' field.
+    """
+    from memory_stats import vocab_scope
+    from suggest_skills import nlp
+
+    # One resume at a time per worker: release its spaCy vocab additions afterwards
+    with vocab_scope(nlp):
+        return _score_resume(task)
+
+
+def _score_resume(task: Tuple[str, List[Tuple[str, str]]]) -> List[Dict[str, Any]]:
+    from pipeline import analyze, parse
+
+    path, jds = task
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        stages: List[Dict[str, Any]] = []
+        resume_text, resume_structure = parse(os.path.basename(path), file_bytes, stages)
+    except Exception as e:
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        return [_row(path, name, jd_id, error=str(e), elapsed_ms=elapsed) for name, jd_id in jds]
+    parse_stages = stages
+
+    rows = []
+    for name, jd_id in jds:
+        jd_start = time.perf_counter()
+        profile = _jd_profiles[jd_id]
+        try:
+            result = analyze(resume_text, resume_structure, profile.jd_text, engine=_engine,
+                             jd_profile=profile, stages=list(parse_stages))
+        except Exception as e:
+            rows.append(_row(path, name, jd_id, error=str(e)))
+            continue
+        failed = [s["name"] for s in result["stages"] if s["status"] == "failed"]
+        rows.append(_row(
+            path, name, jd_id,
+            ats_score=result["ats_score"],
+            suggested_skills=result["suggested_skills"],
+            recommendations=result["improvement_recommendation"],
+            stages={s["name"]: s["status"] for s in result["stages"]},
+            error=f"Stage(s) failed: {', '.join(failed)}" if failed else None,
+            elapsed_ms=round((time.perf_counter() - jd_start) * 1000, 1),
+        ))
+    # The parse is shared by all JDs; charge it to the first row
+    rows[0]["elapsed_ms"] = round(rows[0]["elapsed_ms"] + parse_stages[0]["elapsed_ms"], 1)
+    return rows
+
+
+def _row(resume: str, jd: str, jd_id: str, **fields) -> Dict[str, Any]:
+    row: Dict[str, Any] = {
+        "resume": resume, "jd": jd, "jd_id": jd_id,
+        "ats_score": None, "suggested_skills": [], "recommendations": [],
+        "stages": {}, "error": None, "elapsed_ms": 0.0,
+    }
+    row.update(fields)
+    return row
+
+
+class RowWriter:
+    """Appends result rows to a JSONL or CSV file, flushing after every resume."""
+
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, "a", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=CSV_COLUMNS)
+            if not exists:
+                self.writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            if self.fmt == "csv":
+                self.writer.writerow(dict(
+                    row,
+                    suggested_skills=";".join(row["suggested_skills"]),
+                    recommendations=len(row["recommendations"]),
+                    stages=";".join(f"{k}={v}" for k, v in row["stages"].items()),
+                    # One row per line, so drop_partial_line() never splits a row
+                    error=" ".join((row["error"] or "").split()),
+                ))
+            else:
+                self.file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _progress(done: int, total: int, rows: int, started: float) -> str:
+    elapsed = time.time() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    eta = (total - done) / rate if rate > 0 else 0.0
+    return (f"{done}/{total} resumes, {rows} rows, {rate:.2f} resumes/s, "
+            f"{elapsed:.0f}s elapsed, ETA {eta:.0f}s")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("resumes", nargs="+", help="Resume files, directories or glob patterns")
+    ap.add_argument("--jd", nargs="+", required=True, help="Job description text files or glob patterns")
+    ap.add_argument("-o", "--output", required=True, help="Output file (.jsonl or .csv)")
+    ap.add_argument("--format", choices=("jsonl", "csv"), help="Output format (default: from the extension)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--engine", choices=("full", "lite"), default="full")
+    ap.add_argument("--resume", action="store_true",
+                    help="Skip (resume, JD) pairs already in the output and append the rest")
+    ap.add_argument("--progress", type=float, default=5.0, help="Seconds between progress lines")
+    ap.add_argument("--verbose", action="store_true", help="Keep the pipeline's per-resume logging")
+    args = ap.parse_args()
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    if os.path.exists(args.output) and os.path.getsize(args.output) > 0 and not args.resume:
+        print(f"{args.output} exists; pass --resume to continue it or choose another file", file=sys.stderr)
+        return 1
+
+    try:
+        jds = load_jds(args.jd)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    resumes = collect_resumes(args.resumes)
+    if args.resume:
+        # A row cut off by the interrupted run is dropped and scored again
+        drop_partial_line(args.output)
+    done = read_checkpoint(args.output, fmt) if args.resume else set()
+
+    tasks = []
+    for path in resumes:
+        pending = [(name, jd_id) for name, jd_id, _ in jds if (path, jd_id) not in done]
+        if pending:
+            tasks.append((path, pending))
+    print(f"{len(resumes)} resumes x {len(jds)} JDs; {len(tasks)} resumes to score"
+          f"{f' ({len(done)} pairs already done)' if done else ''}", file=sys.stderr)
+    if not tasks:
+        return 0
+
+    from preload import preload_models
+
+    started = time.time()
+    report = preload_models()
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        # Analyzed once here and inherited by every worker
+        _jd_profiles.update(_analyze_jds(jds))
+    else:
+        context = multiprocessing.get_context("spawn")
+    print(f"Preload done in {time.time() - started:.1f}s: {report}", file=sys.stderr)
+
+    writer = RowWriter(args.output, fmt)
+    workers = max(1, min(args.workers, len(tasks)))
+    started = last_report = time.time()
+    scored = rows = 0
+    try:
+        with context.Pool(workers, initializer=_init_worker,
+                          initargs=(jds, args.engine, not args.verbose)) as pool:
+            for result in pool.imap_unordered(score_resume, tasks):
+                writer.write(result)
+                scored += 1
+                rows += len(result)
+                if time.time() - last_report >= args.progress:
+                    last_report = time.time()
+                    print(_progress(scored, len(tasks), rows, started), file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with --resume to continue", file=sys.stderr)
+        return 130
+    finally:
+        writer.close()
+
+    print(f"Done: {_progress(scored, len(tasks), rows, started)} -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+coalesce.py
+In-flight deduplication of identical analyses.
+
+Extension retries and double clicks send several concurrent /process calls
+with the same resume and JD. Coalescer runs one computation per key (the
+leader); identical requests arriving while it runs (followers) await the
+same result instead of recomputing:
+
+    result, shared = await coalescer.run(key, compute)
+
+The computation runs as its own task, detached from the request that
+started it:
+- a leader whose client disconnects (request cancelled) does not cancel
+  the work the followers are waiting for
+- an exception is raised in every waiting request, and the key is released
+  at once, so the next request computes afresh instead of seeing a stale
+  failure
+- if the computation itself is cancelled (e.g. shutdown), a waiting request
+  that was not cancelled starts a new one
+
+Only in-flight work is shared; finished results are not kept here.
+analysis_key() identifies an analysis by resume content, normalized JD,
+engine and parser/scorer versions.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from jd_registry import jd_hash
+from parser import PARSER_VERSION
+from pipeline import SCORER_VERSION
+
+
+def content_hash(file_bytes: bytes) -> str:
+    """sha256 (hex) of an uploaded file; clients send the same value as resume_sha256."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def analysis_key(filename: str, resume_sha256: str, jd_text: Optional[str], engine: str) -> Tuple:
+    """Key of an analysis: same key, same result. resume_sha256 is content_hash() of the file."""
+    extension = os.path.splitext(filename or "")[1].lower()  # selects the parser
+    return (
+        resume_sha256, extension,
+        jd_hash(jd_text) if jd_text and jd_text.strip() else "",
+        engine, PARSER_VERSION, SCORER_VERSION,
+    )
+
+
+class Coalescer:
+    """Shares one running computation between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Result of compute() for `key`, started now or joined while running.
+
+        Returns:
+            tuple: (result, shared) -- shared is True if another caller started it
+
+        Raises:
+            Exception: whatever compute() raised
+        """
+        while True:
+            task = self._inflight.get(key)
+            shared = task is not None
+            if task is None:
+                task = asyncio.ensure_future(compute())
+                self._inflight[key] = task
+                task.add_done_callback(lambda done, key=key: self._release(key, done))
+            try:
+                # shield: cancelling this caller must not cancel the shared task
+                return await asyncio.shield(task), shared
+            except asyncio.CancelledError:
+                if task.cancelled() and not _cancelling():
+                    continue  # the computation was cancelled, not this caller
+                raise
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+
+def _cancelling() -> bool:
+    """Whether the current task has a pending cancellation request (Python 3.11+)."""
+    task = asyncio.current_task()
+    cancelling = getattr(task, "cancelling", None)
+    return bool(cancelling and cancelling())
@@ -0,0 +1,137 @@
+"""
+deadline.py
+Deadline propagation for the synchronous /process path.
+
+A request gets one overall Deadline (Config.TIMEOUT); each pipeline stage gets
+a child deadline capped by its own budget. The deadline of the running stage
+is held in a context variable, so long loops deep in the parser or the
+scorers can check it cooperatively without threading it through every call:
+
+    check_deadline("parse", partial=(text, structure))   # between pages
+    check_deadline("ats")                                 # between nlp.pipe batches
+
+A check past the deadline raises DeadlineExceeded carrying the partial result
+passed at the latest checkpoint, if any; the pipeline then reports the stage
+as 'degraded' (partial result used) or 'skipped' (nothing usable).
+
+Cooperative checks cannot interrupt a single long call (one nlp() or
+extract_tables()), so run_bounded() also runs the stage in a worker thread and
+stops waiting for it when the deadline passes, falling back to the partial
+result recorded at the last checkpoint. The abandoned thread stops at its next
+check and its result is discarded; the response is never held past the
+deadline.
+"""
+
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of time. `partial` holds a usable partial result, if any."""
+
+    def __init__(self, stage: str = "", partial: Any = None):
+        super().__init__(f"Deadline exceeded in '{stage}'" if stage else "Deadline exceeded")
+        self.stage = stage
+        self.partial = partial
+
+
+class Deadline:
+    """A point in time (monotonic clock) by which work must finish; None = no limit."""
+
+    def __init__(self, seconds: Optional[float] = None, at: Optional[float] = None):
+        if at is None and seconds is not None:
+            at = time.monotonic() + seconds
+        self.at = at
+        self.partial: Any = None  # latest partial result seen by check()
+
+    def remaining(self) -> float:
+        """Seconds left (inf without a limit, never negative)."""
+        if self.at is None:
+            return math.inf
+        return max(0.0, self.at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.at is not None and time.monotonic() >= self.at
+
+    def child(self, budget: Optional[float]) -> "Deadline":
+        """Deadline for a sub-task: `budget` seconds from now, capped by this deadline."""
+        if budget is None:
+            return Deadline(at=self.at)
+        at = time.monotonic() + budget
+        return Deadline(at=at if self.at is None else min(at, self.at))
+
+    def check(self, stage: str = "", partial: Any = None) -> None:
+        """
+        Raise DeadlineExceeded if expired. `partial` (the result so far) is
+        remembered, so run_bounded can still use it if the stage later gets
+        stuck in a call that cannot be interrupted.
+        """
+        if self.at is None:
+            return
+        if partial is not None:
+            self.partial = partial
+        if time.monotonic() >= self.at:
+            raise DeadlineExceeded(stage, self.partial)
+
+
+NO_DEADLINE = Deadline()
+
+_current: contextvars.ContextVar = contextvars.ContextVar("deadline", default=NO_DEADLINE)
+
+# Threads for run_bounded; abandoned stages keep a thread until their next check
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="stage")
+
+
+def current_deadline() -> Deadline:
+    """Deadline of the stage running in this context (NO_DEADLINE outside one)."""
+    return _current.get()
+
+
+def check_deadline(stage: str = "", partial: Any = None) -> None:
+    """Cooperative checkpoint against the current stage deadline."""
+    _current.get().check(stage, partial)
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline):
+    """Make `deadline` the current deadline for the enclosed code."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def run_bounded(deadline: Deadline, stage: str, fn: Callable, *args, **kwargs) -> Any:
+    """
+    Call fn(*args, **kwargs) with `deadline` as the current deadline and return
+    its result, or raise DeadlineExceeded (with the last recorded partial
+    result) once the deadline passes, even if fn is still inside a call it
+    cannot break out of.
+    Without a time limit fn simply runs in the calling thread.
+    """
+    if deadline.at is None:
+        with deadline_scope(deadline):
+            return fn(*args, **kwargs)
+
+    deadline.check(stage)
+
+    def _call():
+        with deadline_scope(deadline):
+            return fn(*args, **kwargs)
+
+    future = _executor.submit(contextvars.copy_context().run, _call)
+    try:
+        return future.result(timeout=deadline.remaining())
+    except DeadlineExceeded:
+        # Raised by a checkpoint inside fn (may carry a partial result);
+        # listed first since FutureTimeoutError is TimeoutError on Python 3.11+
+        raise
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(stage, deadline.partial)
@@ -0,0 +1,162 @@
+"""
+encoding.py
+Response encoding for the analysis endpoints: per-request content
+negotiation between JSON and MessagePack, a fast JSON encoder, and gzip that
+runs off the event loop for large bodies.
+
+    Accept: application/msgpack     -> MessagePack (if msgpack is installed)
+    anything else                   -> JSON (orjson if installed, else json)
+
+Both optional packages fall back gracefully: without orjson JSON is encoded
+with the standard library, and without msgpack clients always get JSON.
+
+Payloads are encoded as they are: pydantic models (built with .construct(),
+i.e. without validation) are written from their field values and a
+ResumeStructure is expanded only here, so there is no model -> dict -> JSON
+round trip per response. See bench_encoders.py for encode times and sizes.
+"""
+
+import gzip
+import json
+from typing import Any, Tuple
+
+import anyio
+from pydantic import BaseModel
+from starlette.datastructures import Headers, MutableHeaders
+
+import metrics
+from resume_structure import ResumeStructure
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None  # type: ignore
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK, "application/x-msgpack")
+
+
+def _default(obj: Any) -> Any:
+    """Encode the few non-builtin types found in responses."""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    if isinstance(obj, ResumeStructure):
+        return obj.to_list()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def negotiate(accept: str) -> str:
+    """
+    Pick the response media type from an Accept header: MessagePack when the
+    client prefers it over JSON (by q-value, then order) and msgpack is
+    available; JSON otherwise.
+    """
+    if msgpack is None or not accept:
+        return JSON
+    best, best_q = JSON, -1.0
+    for part in accept.split(","):
+        media, _, params = part.strip().partition(";")
+        media = media.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+        if media in _MSGPACK_ALIASES:
+            candidate = MSGPACK
+        elif media in (JSON, "application/*", "*/*"):
+            candidate = JSON
+        else:
+            continue
+        if q > best_q:
+            best, best_q = candidate, q
+    return best
+
+
+def encode(payload: Any, media_type: str = JSON) -> bytes:
+    """Encode a response payload for `media_type` (JSON or MSGPACK)."""
+    if media_type == MSGPACK and msgpack is not None:
+        return msgpack.packb(payload, default=_default, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def encode_timed(payload: Any, media_type: str, endpoint: str, mode: str) -> Tuple[bytes, str]:
+    """encode() plus serialize_ms / response_bytes metrics; returns (body, media_type)."""
+    if media_type == MSGPACK and msgpack is None:
+        media_type = JSON
+    fmt = "msgpack" if media_type == MSGPACK else "json"
+    with metrics.timed("serialize_ms", endpoint=endpoint, mode=mode, format=fmt):
+        body = encode(payload, media_type)
+    metrics.observe("response_bytes", len(body), endpoint=endpoint, mode=mode, format=fmt)
+    return body, media_type
+
+
+class OffloadedGZipMiddleware:
+    """
+    Gzip responses for clients that accept it, like starlette's
+    GZipMiddleware, but compress bodies of `offload_size` bytes or more in a
+    worker thread so a large response does not block the event loop.
+
+    Responses are buffered before compression (the API does not stream).
+    Bodies below `minimum_size` and responses that already carry a
+    Content-Encoding are passed through unchanged.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, offload_size: int = 64 * 1024,
+                 compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if len(body) >= self.minimum_size and "content-encoding" not in headers:
+                if len(body) >= self.offload_size:
+                    with metrics.timed("gzip_ms", offloaded=True):
+                        body = await anyio.to_thread.run_sync(gzip.compress, body, self.compresslevel)
+                else:
+                    with metrics.timed("gzip_ms", offloaded=False):
+                        body = gzip.compress(body, self.compresslevel)
+                headers["Content-Encoding"] = "gzip"
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,162 @@
+"""
+fidelity.py
+Load-aware analysis fidelity for /process.
+
+Under load, a slightly less precise score returned quickly beats a timeout.
+Each worker keeps a FidelityController. It watches the analyses in flight
+and the recent analysis latency, and picks one of three tiers for new
+requests:
+
+    full     SkillNER and the full spaCy pipeline
+    trimmed  skill artifact (or dictionary) matching instead of SkillNER, and
+             spaCy without the components scoring does not use (NER, lemmatizer)
+    minimal  lite engine (dictionary-only skills, no model), no PDF table extraction
+
+The controller steps down as soon as either signal reaches a tier's
+threshold. It steps back up one tier at a time, once both signals have
+dropped below RECOVERY x that tier's thresholds and the current tier has
+been held for hold_seconds. The tier is reported in the response
+(`fidelity`), counted in /metrics and shown in /health.
+
+Inside the pipeline, the tier of the running analysis is held in a context
+variable, like the deadline (deadline.py). Scorers deep in the call stack
+read it with current_fidelity() instead of taking another parameter.
+
+JD and resume skills must come from the same extractor, or coverage compares
+SkillNER's names with the artifact's. Registered JDs (jd_registry.py) and
+calculators keep JD skills per extraction_tier() for that reason.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Sequence
+
+FULL = "full"
+TRIMMED = "trimmed"
+MINIMAL = "minimal"
+TIERS = (FULL, TRIMMED, MINIMAL)
+
+# spaCy components skipped below full fidelity (scoring only needs sentences and POS)
+TRIMMED_DISABLE = ("ner", "lemmatizer")
+
+RECOVERY = 0.7  # step back up once load is below this fraction of the tier's thresholds
+
+_current: contextvars.ContextVar = contextvars.ContextVar("fidelity", default=FULL)
+
+
+def current_fidelity() -> str:
+    """Tier of the analysis running in this context (FULL outside one)."""
+    return _current.get()
+
+
+@contextmanager
+def fidelity_scope(tier: str):
+    """Make `tier` the current fidelity for the enclosed code."""
+    if tier not in TIERS:
+        raise ValueError(f"Unknown fidelity tier '{tier}'")
+    token = _current.set(tier)
+    try:
+        yield tier
+    finally:
+        _current.reset(token)
+
+
+def extraction_tier() -> str:
+    """Skill extractor in use at the current fidelity: FULL (SkillNER) or TRIMMED (artifact or dictionary)."""
+    return FULL if current_fidelity() == FULL else TRIMMED
+
+
+def disabled_pipes(nlp) -> List[str]:
+    """spaCy components to skip at the current fidelity (only those the model has)."""
+    if current_fidelity() == FULL:
+        return []
+    return [name for name in TRIMMED_DISABLE if name in nlp.pipe_names]
+
+
+class FidelityController:
+    """
+    Picks the fidelity tier for new analyses from the load of this worker.
+
+    Args:
+        in_flight_limits: analyses in flight at which TRIMMED and MINIMAL start
+        latency_limits: recent analysis latency (seconds, moving average) at
+            which TRIMMED and MINIMAL start
+        hold_seconds: minimum time in a tier before stepping back up; the
+            latency average also halves every hold_seconds without new samples
+        alpha: weight of the newest sample in the latency average
+    """
+
+    def __init__(self, in_flight_limits: Sequence[int] = (4, 8),
+                 latency_limits: Sequence[float] = (6.0, 10.0),
+                 hold_seconds: float = 10.0, alpha: float = 0.2):
+        self.in_flight_limits = tuple(in_flight_limits)
+        self.latency_limits = tuple(latency_limits)
+        self.hold_seconds = hold_seconds
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = 0.0
+        self._sampled_at = time.monotonic()
+        self._level = 0  # index into TIERS
+        self._changed_at = time.monotonic()
+
+    def tier(self) -> str:
+        """Tier for a new analysis, re-evaluated from the current load."""
+        with self._lock:
+            return TIERS[self._evaluate(time.monotonic())]
+
+    @contextmanager
+    def track(self):
+        """Count the enclosed analysis as in flight and record its duration."""
+        start = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            self._evaluate(start)
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                self._in_flight -= 1
+                self._latency = self._decayed(now) * (1 - self.alpha) + (now - start) * self.alpha
+                self._sampled_at = now
+                self._evaluate(now)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current tier and the signals it was chosen from."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "tier": TIERS[self._evaluate(now)],
+                "in_flight": self._in_flight,
+                "latency_ms": round(self._decayed(now) * 1000, 1),
+                "in_tier_seconds": round(now - self._changed_at, 1),
+            }
+
+    def _decayed(self, now: float) -> float:
+        # Without new samples the average fades, so an idle worker recovers
+        return self._latency * 0.5 ** ((now - self._sampled_at) / self.hold_seconds)
+
+    def _evaluate(self, now: float) -> int:
+        latency = self._decayed(now)
+        target = 0
+        for level, (flight_limit, latency_limit) in enumerate(
+                zip(self.in_flight_limits, self.latency_limits), 1):
+            if self._in_flight >= flight_limit or latency >= latency_limit:
+                target = level
+        if target > self._level:
+            self._set_level(target, now)
+        elif target < self._level and now - self._changed_at >= self.hold_seconds:
+            flight_limit = self.in_flight_limits[self._level - 1]
+            latency_limit = self.latency_limits[self._level - 1]
+            if self._in_flight < flight_limit * RECOVERY and latency < latency_limit * RECOVERY:
+                self._set_level(self._level - 1, now)
+        return self._level
+
+    def _set_level(self, level: int, now: float) -> None:
+        print(f"Fidelity: {TIERS[self._level]} -> {TIERS[level]} "
+              f"(in flight {self._in_flight}, latency {self._decayed(now):.1f}s)")
+        self._level = level
+        self._changed_at = now
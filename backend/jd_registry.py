@@ -0,0 +1,171 @@
+"""
+jd_registry.py
+Register a job description once and refer to it by jd_id afterwards.
+
+POST /jd analyzes the JD (skills for both engines and fidelity tiers, required
+years) and returns a jd_id with an expiry; /process then accepts jd_id instead
+of the full jd_text, so the JD is neither re-sent nor re-analyzed per call.
+
+jd_id is derived from the normalized JD text, so registering the same JD again
+returns the same id and just extends its expiry. The JD text and expiry are
+kept in a small SQLite table shared by all workers on the host: a worker that
+receives a jd_id registered elsewhere rebuilds the profile once from the stored
+text and caches it in memory.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Set
+
+from ats_calculator import ATSCalculator
+from fidelity import FULL, TRIMMED, fidelity_scope
+from lite_scorer import LiteATSCalculator
+from jd_segmenter import focus_jd
+from local_db import ProcessConnection
+from parser import _normalize
+from suggest_skills import extract_skills
+
+
+class UnknownJDError(KeyError):
+    """jd_id was never registered (or has been purged)."""
+
+
+class ExpiredJDError(KeyError):
+    """jd_id was registered but its expiry has passed."""
+
+
+def jd_hash(jd_text: str) -> str:
+    """Stable id for a JD: sha256 of the normalized text (first 24 hex chars)."""
+    return hashlib.sha256(_normalize(jd_text).encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class JDProfile:
+    """Everything /process needs from a JD, computed once at registration."""
+    jd_id: str
+    jd_text: str
+    expires_at: float
+    calculator: ATSCalculator          # full engine: jd_skills, jd_required_years
+    lite_calculator: LiteATSCalculator  # lite engine
+    skills: Set[str] = field(default_factory=set)  # extract_skills(focus_jd(jd_text).text)
+    trimmed_skills: Set[str] = field(default_factory=set)  # the same, by the reduced tiers' extractor
+
+    @property
+    def required_years(self) -> int:
+        return self.calculator.jd_required_years
+
+    def skills_for(self, tier: str) -> Set[str]:
+        """JD skills from the extractor used at fidelity `tier` (as the resume's skills)."""
+        return self.skills if tier == FULL else self.trimmed_skills
+
+
+def analyze_jd(jd_id: str, jd_text: str, expires_at: float) -> JDProfile:
+    """Run all JD-side analysis. Raises ValueError for unusable JDs."""
+    calculator = ATSCalculator(jd_text)
+    focused = focus_jd(jd_text).text  # without benefits, EEO and company text
+    with fidelity_scope(TRIMMED):
+        # Skills as requests under load extract them (artifact instead of SkillNER)
+        trimmed_skills = extract_skills(focused)
+        calculator.jd_skill_sets()
+    return JDProfile(
+        jd_id=jd_id,
+        jd_text=jd_text,
+        expires_at=expires_at,
+        calculator=calculator,
+        lite_calculator=LiteATSCalculator(jd_text),
+        skills=extract_skills(focused),
+        trimmed_skills=trimmed_skills,
+    )
+
+
+class JDRegistry:
+    """In-memory profile cache backed by a shared SQLite table of JD texts."""
+
+    def __init__(self, db_path: str, ttl_seconds: int = 6 * 3600, max_cached: int = 256):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_cached = max_cached
+        self._profiles: "OrderedDict[str, JDProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Opened in each process on first use (local_db.py)
+        self._db = ProcessConnection(db_path, self._setup, timeout=5)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jds ("
+                " jd_id TEXT PRIMARY KEY, jd_text TEXT NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def register(self, jd_text: str) -> JDProfile:
+        """Analyze and store a JD; re-registering the same JD extends its expiry."""
+        if not isinstance(jd_text, str) or not jd_text.strip():
+            raise ValueError("Job description is empty or not a string")
+
+        jd_id = jd_hash(jd_text)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        with self._lock:
+            profile = self._profiles.get(jd_id)
+        if profile is None:
+            profile = analyze_jd(jd_id, jd_text, expires_at)
+        profile.expires_at = expires_at
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM jds WHERE expires_at < ?", (now,))
+                self._conn.execute(
+                    "INSERT INTO jds (jd_id, jd_text, created_at, expires_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(jd_id) DO UPDATE SET expires_at = excluded.expires_at",
+                    (jd_id, jd_text, now, expires_at),
+                )
+            self._cache(profile)
+        return profile
+
+    def get(self, jd_id: str) -> JDProfile:
+        """
+        Return the profile for jd_id.
+        Raises UnknownJDError or ExpiredJDError.
+        """
+        now = time.time()
+        with self._lock:
+            profile = self._profiles.get(jd_id)
+            if profile is not None:
+                self._profiles.move_to_end(jd_id)
+            row = self._conn.execute(
+                "SELECT jd_text, expires_at FROM jds WHERE jd_id = ?", (jd_id,)
+            ).fetchone()
+
+        if row is None:
+            raise UnknownJDError(jd_id)
+        jd_text, expires_at = row
+        if expires_at < now:
+            with self._lock:
+                self._profiles.pop(jd_id, None)
+            raise ExpiredJDError(jd_id)
+
+        if profile is None:
+            # Registered by another worker: rebuild once from the stored text
+            profile = analyze_jd(jd_id, jd_text, expires_at)
+            with self._lock:
+                self._cache(profile)
+        profile.expires_at = expires_at
+        return profile
+
+    def _cache(self, profile: JDProfile) -> None:
+        self._profiles[profile.jd_id] = profile
+        self._profiles.move_to_end(profile.jd_id)
+        while len(self._profiles) > self.max_cached:
+            self._profiles.popitem(last=False)
@@ -0,0 +1,264 @@
+"""
+jd_segmenter.py
+Rule-based job description segmentation.
+
+JDs scraped from LinkedIn (frontend/content.js) carry long benefits
+sections, EEO statements and company blurbs. They cost SkillNER, spaCy and
+TF-IDF time, and they dilute the similarity score. segment_jd() splits a JD
+into sections by its headings ("Requirements:", "What we offer", "About
+us", ...) and classifies each one:
+
+    responsibilities, requirements, nice_to_have   kept
+    other (untitled or unknown headings)           kept
+    benefits, legal, company                       dropped
+
+A line without a colon only opens a dropped section if it looks like a
+heading: mostly heading keywords, or a short Title Case / ALL CAPS line that
+starts with one. Inside a role section it must consist of the keywords, so
+"Employer branding" or "Data privacy" in a requirements list stay skills.
+
+Lines are reclassified on their own where the wording is unambiguous: EEO
+and accommodation statements anywhere, pay and benefits details outside a
+kept section, and a company self-description before the first heading.
+
+focus_jd() is what the scorers use. It returns the kept text, with the
+nice-to-have part separate so skills only found there can be weighted
+below the requirements (PREFERRED_WEIGHT). Kept headings stay in the text,
+so focusing a focused JD changes nothing. If too little text would remain
+(an unusual layout), the whole JD is kept.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+RESPONSIBILITIES = "responsibilities"
+REQUIREMENTS = "requirements"
+NICE_TO_HAVE = "nice_to_have"
+BENEFITS = "benefits"
+LEGAL = "legal"
+COMPANY = "company"
+OTHER = "other"
+
+KEPT = (RESPONSIBILITIES, REQUIREMENTS, NICE_TO_HAVE, OTHER)
+ROLE = (RESPONSIBILITIES, REQUIREMENTS, NICE_TO_HAVE)  # kept sections that describe the role
+
+PREFERRED_WEIGHT = 0.5  # weight of a nice-to-have skill relative to a required one
+MIN_FOCUSED_LENGTH = 50  # keep the whole JD if less text than this remains (as ATSCalculator.MIN_TEXT_LENGTH)
+HEADING_MAX_WORDS = 8
+STANDALONE_COVERAGE = 0.75  # keyword share of a colon-less line that is a heading whatever its case
+CACHE_SIZE = 128  # focused JDs kept (the same JD is scored many times)
+
+# Heading keywords, checked in this order (first match wins: "Preferred qualifications" is nice-to-have)
+_HEADING_PATTERNS = [
+    (NICE_TO_HAVE, r"nice[- ]to[- ]haves?|preferred|bonus(?: points)?|pluses|(?:is )?a plus|desired|desirable"
+                   r"|good[- ]to[- ]haves?|would be great|extra credit"),
+    (LEGAL, r"equal (?:employment )?opportunit\w*|eeo\w*|diversity|inclusion|accommodations?"
+            r"|privacy(?: notice| policy)?|disclaimer|e-verify|legal|notice to applicants|employer"),
+    (BENEFITS, r"benefits?|perks|what we offer|we offer|compensation|salary|pay(?: range| transparency)?"
+               r"|total rewards|rewards|why (?:join|work)(?: (?:with )?us)?|what'?s in it for you"),
+    (RESPONSIBILITIES, r"responsibilit\w*|duties|what you(?:'ll| will) (?:do|be doing|work on)|day[- ]to[- ]day"
+                       r"|(?:the|your) role|role overview|the opportunity|your (?:mission|impact)|in this role"
+                       r"|key tasks|tasks|position summary|the position"
+                       r"|about the (?:role|position|opportunity)"),
+    (REQUIREMENTS, r"requirements?|required|qualifications?|must[- ]haves?|who you are"
+                   r"|what you(?:'ll| will)? (?:need|bring)|what we(?:'re| are) looking for|you have|about you"
+                   r"|your profile|skills?|experience|minimum|basic|essential|competenc\w*|knowledge"),
+    (COMPANY, r"about (?:us|the company|the team)|who we are|our (?:company|mission|story|culture|values|team)"
+              r"|company (?:overview|description)|life at \w+|why us"),
+]
+_HEADING_RES = [(kind, re.compile(r"\b(?:" + pattern + r")\b")) for kind, pattern in _HEADING_PATTERNS]
+
+# Page wrappers around the whole posting (LinkedIn's "About the job"): neutral
+_WRAPPER_HEADING = re.compile(r"^(?:about the job|job description|description)\W*$", re.IGNORECASE)
+
+# Unambiguous statements, wherever they appear
+_LEGAL_LINE = re.compile(
+    r"equal (?:employment )?opportunity|without regard to|regardless of (?:race|age|gender|sex)|race, colou?r"
+    r"|protected veteran|reasonable accommodation|e-verify|affirmative action|gender identity"
+    r"|sexual orientation|national origin",
+    re.IGNORECASE,
+)
+# Pay and benefits details outside a kept section
+_BENEFITS_LINE = re.compile(
+    r"401\(?k\)?|paid time off|\bpto\b|health(?:,| and| &)? dental|dental(?:,| and| &)? vision|parental leave"
+    r"|stock options|equity (?:grant|package)|(?:salary|pay) range|base salary|\$\s?\d",
+    re.IGNORECASE,
+)
+# Company self-description before the first heading (of a JD that has role sections)
+_COMPANY_LINE = re.compile(
+    r"\b(?:founded in|headquartered|our (?:mission|story|customers|clients) (?:is|are|include)"
+    r"|(?:is|we are|we're) (?:a|an|the) (?:\w+[ -]){0,3}(?:company|startup|leader|provider|platform|organization|firm))\b",
+    re.IGNORECASE,
+)
+_BULLET = re.compile(r"^\s*(?:[-•*·▪◦–]|\d+[.)])\s*")
+_WORD = re.compile(r"[A-Za-z0-9']+")
+# Lowercase words allowed in a Title Case heading ("Equal Opportunity and Benefits")
+_MINOR_WORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "or", "our", "the", "to", "we", "with", "you"}
+
+
+@dataclass
+class JDSection:
+    """Consecutive lines of one kind; `heading` is the line that started it ("" if none)."""
+    kind: str
+    heading: str = ""
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(([self.heading] if self.heading else []) + self.lines)
+
+
+@dataclass(frozen=True)
+class FocusedJD:
+    """The parts of a JD worth scoring against."""
+    core: str       # responsibilities, requirements and other kept text
+    preferred: str  # nice-to-have sections
+    dropped: Tuple[str, ...] = ()  # kinds of the sections left out
+    original_length: int = 0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(part for part in (self.core, self.preferred) if part)
+
+    def mentions(self, term: str) -> float:
+        """Occurrences of a lowercase term; those in nice-to-have sections count PREFERRED_WEIGHT."""
+        return self.core.lower().count(term) + PREFERRED_WEIGHT * self.preferred.lower().count(term)
+
+
+def _heading_shape(head: str) -> bool:
+    """Title Case or ALL CAPS, as a heading on a line of its own is written."""
+    if head.isupper():
+        return True
+    return all(word[0].isupper() or word.lower() in _MINOR_WORDS or word[0].isdigit()
+               for word in _WORD.findall(head))
+
+
+def _heading_kind(line: str, in_role: bool = False) -> Optional[Tuple[str, str]]:
+    """
+    (kind, text after the heading) if the line is a section heading, else None.
+    With in_role (the line is inside a responsibilities, requirements or
+    nice-to-have section), a line without a colon only opens a dropped
+    section if it consists of the heading keywords.
+    """
+    if _BULLET.match(line):
+        return None
+    stripped = line.strip().strip("#*_=").strip()
+    match = re.match(r"^([^:]{1,60}):\s*(.*)$", stripped)
+    head, rest = (match.group(1).strip(), match.group(2).strip()) if match else (stripped.rstrip("."), "")
+    words = _WORD.findall(head)
+    if not words or len(words) > HEADING_MAX_WORDS or (not match and stripped.endswith(".")):
+        return None
+
+    lower = head.lower()
+    found = [(kind, list(regex.finditer(lower))) for kind, regex in _HEADING_RES]
+    found = [(kind, hits) for kind, hits in found if hits]
+    if not found:
+        # "About Acme" (a company name); an unknown "Heading:" starts a neutral section
+        if len(words) <= 4 and words[0].lower() == "about" and all(w[0].isupper() for w in words[1:]) \
+                and not any(ch.isdigit() for ch in head):
+            return COMPANY, rest
+        return (OTHER, "") if match and not rest else None
+    kind = found[0][0]
+    if not match:
+        # Without a colon the keywords must make up most of the line, so that a
+        # plain line such as "Benefits administration for 2,000 employees" is not a heading
+        covered = sum(hit.end() - hit.start() for _, hits in found for hit in hits)
+        letters = len(re.sub(r"[^a-z0-9]", "", lower))
+        if covered < 0.5 * letters:
+            return None
+        if kind not in KEPT and covered < STANDALONE_COVERAGE * letters:
+            # A dropped section needs a heading-shaped line with the keyword first:
+            # "Employer branding" or "Data privacy" in a requirements list are skills
+            first = min(hit.start() for _, hits in found for hit in hits)
+            if in_role or first > 0 or not _heading_shape(head):
+                return None
+    return kind, rest
+
+
+def segment_jd(jd_text: str) -> List[JDSection]:
+    """Split a JD into classified sections, in order."""
+    sections: List[JDSection] = []
+    current = OTHER
+    heading_seen = False
+    lines = [line.strip() for line in (jd_text or "").splitlines() if line.strip()]
+    headings = [None if _WRAPPER_HEADING.match(line) else _heading_kind(line) for line in lines]
+    # Intro text is only judged as a company blurb when the role itself is described further down
+    has_role = any(h is not None and h[0] in (RESPONSIBILITIES, REQUIREMENTS) for h in headings)
+
+    def add(kind: str, line: str, heading: str = "") -> None:
+        if heading or not sections or sections[-1].kind != kind:
+            sections.append(JDSection(kind, heading))
+        if line:
+            sections[-1].lines.append(line)
+
+    for line, heading in zip(lines, headings):
+        if heading is not None and heading[0] not in KEPT and current in ROLE:
+            heading = _heading_kind(line, in_role=True)
+        if heading is not None:
+            current, rest = heading
+            heading_seen = True
+            add(current, rest, heading=line[:len(line) - len(rest)].strip() if rest else line)
+            continue
+        kind = current
+        if _LEGAL_LINE.search(line):
+            kind = LEGAL
+        elif current == OTHER and _BENEFITS_LINE.search(line):
+            kind = BENEFITS
+        elif current == OTHER and has_role and not heading_seen and _COMPANY_LINE.search(line):
+            kind = COMPANY
+        add(kind, line)
+    return sections
+
+
+def _focus(jd_text: str) -> FocusedJD:
+    sections = segment_jd(jd_text)
+    core = "\n".join(s.text for s in sections if s.kind in KEPT and s.kind != NICE_TO_HAVE)
+    preferred = "\n".join(s.text for s in sections if s.kind == NICE_TO_HAVE)
+    dropped = tuple(sorted({s.kind for s in sections if s.kind not in KEPT}))
+    focused = FocusedJD(core, preferred, dropped, len(jd_text))
+    if len(focused.text) < MIN_FOCUSED_LENGTH:
+        return FocusedJD(jd_text.strip(), "", (), len(jd_text))
+    if not sections or (not focused.preferred and not dropped):
+        # Nothing left out and nothing to weight: keep the text exactly as given
+        return FocusedJD(jd_text.strip(), "", (), len(jd_text))
+    return focused
+
+
+_cache: "OrderedDict[str, FocusedJD]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def focus_jd(jd_text: str) -> FocusedJD:
+    """The kept parts of a JD (see module docstring); cached per JD text."""
+    jd_text = jd_text or ""
+    with _cache_lock:
+        focused = _cache.get(jd_text)
+        if focused is not None:
+            _cache.move_to_end(jd_text)
+            return focused
+    focused = _focus(jd_text)
+    with _cache_lock:
+        _cache[jd_text] = focused
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return focused
+
+
+def main() -> None:
+    """Show how a JD is segmented: python jd_segmenter.py jd.txt"""
+    import sys
+
+    with open(sys.argv[1], encoding="utf-8") as f:
+        jd_text = f.read()
+    for section in segment_jd(jd_text):
+        kept = "keep" if section.kind in KEPT else "drop"
+        print(f"[{kept} {section.kind}] {section.heading or '(no heading)'}: {len(section.text)} chars")
+    focused = focus_jd(jd_text)
+    print(f"\n{len(focused.text)} of {focused.original_length} chars kept; dropped: {', '.join(focused.dropped) or 'nothing'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+job_queue.py
+Durable local job queue for asynchronous resume analysis (POST /jobs).
+
+Jobs live in a SQLite table under backend/data, so there is no broker to run
+and queued work survives restarts. Any number of workers (threads in the API
+process or processes started by job_worker.py) share the table:
+
+    queued --claim--> running --complete--> done
+                        |  \\--fail--------> failed
+                        |
+                        +-- lease expires (worker crashed or hung)
+                              -> claimable again, until max_attempts is used up
+
+A claim takes a time-limited lease on the job; progress updates renew it. A
+worker that dies mid-job simply stops renewing, and the job is picked up by
+another worker once the lease runs out (or immediately, when the pool master
+notices the dead worker and calls release_worker). Results are kept for
+result_ttl seconds after the job finishes and are purged afterwards.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from local_db import ProcessConnection
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_COLUMNS = (
+    "job_id", "status", "stage", "progress", "attempts", "max_attempts",
+    "filename", "file_bytes", "jd_text", "jd_id", "engine", "callback_url",
+    "worker_id", "lease_until", "result", "error",
+    "created_at", "updated_at", "expires_at",
+)
+
+
+class JobQueue:
+    """SQLite-backed job queue shared by the API and its workers."""
+
+    def __init__(self, db_path: str, result_ttl: int = 3600, lease_seconds: int = 120,
+                 max_attempts: int = 3):
+        self.db_path = db_path
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Opened in each process on first use (local_db.py). Autocommit mode:
+        # transactions are opened explicitly with BEGIN IMMEDIATE
+        self._db = ProcessConnection(db_path, self._setup, timeout=10, isolation_level=None)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, status TEXT NOT NULL,"
+            " stage TEXT, progress REAL NOT NULL DEFAULT 0,"
+            " attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL,"
+            " filename TEXT NOT NULL, file_bytes BLOB, jd_text TEXT, jd_id TEXT,"
+            " engine TEXT NOT NULL, callback_url TEXT,"
+            " worker_id TEXT, lease_until REAL,"
+            " result TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    # -----------------------
+    # Producer side
+    # -----------------------
+    def submit(self, filename: str, file_bytes: bytes, jd_text: Optional[str] = None,
+               jd_id: Optional[str] = None, engine: str = "full",
+               callback_url: Optional[str] = None) -> str:
+        """Queue a job and return its job_id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, progress, attempts, max_attempts, filename,"
+                " file_bytes, jd_text, jd_id, engine, callback_url, created_at, updated_at)"
+                " VALUES (?, ?, 0, 0, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, self.max_attempts, filename, sqlite3.Binary(file_bytes),
+                 jd_text, jd_id, engine, callback_url, now, now),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Public view of a job (no upload bytes), or None if unknown or purged.
+        'result' is decoded from JSON.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, stage, progress, attempts, max_attempts, engine,"
+                " result, error, created_at, updated_at, expires_at FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job["expires_at"] is not None and job["expires_at"] < time.time():
+            return None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    # -----------------------
+    # Worker side
+    # -----------------------
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest runnable job (queued, or running with an expired lease)
+        and lease it to worker_id. Jobs whose attempts are used up are failed
+        instead of being handed out again. Returns the full job row or None.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, file_bytes = NULL, worker_id = NULL,"
+                    " updated_at = ?, expires_at = ? WHERE status = ? AND lease_until < ?"
+                    " AND attempts >= max_attempts",
+                    (FAILED, "Job abandoned: worker stopped responding on every attempt",
+                     now, now + self.result_ttl, RUNNING, now),
+                )
+                row = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+                    " WHERE status = ? OR (status = ? AND lease_until < ?)"
+                    " ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, worker_id = ?,"
+                    " lease_until = ?, updated_at = ? WHERE job_id = ?",
+                    (RUNNING, worker_id, now + self.lease_seconds, now, row["job_id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["attempts"] += 1
+        job["worker_id"] = worker_id
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, stage: Optional[str] = None,
+                  progress: Optional[float] = None) -> bool:
+        """
+        Record progress and renew the lease. Returns False if the job is no
+        longer leased to this worker (the lease expired and it was re-claimed).
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET stage = COALESCE(?, stage), progress = COALESCE(?, progress),"
+                " lease_until = ?, updated_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (stage, progress, now + self.lease_seconds, now, job_id, worker_id, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store the result; the upload bytes are dropped. False if the lease was lost."""
+        return self._finish(job_id, worker_id, DONE, result=json.dumps(result))
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Mark the job failed for good. False if the lease was lost."""
+        return self._finish(job_id, worker_id, FAILED, error=error)
+
+    def retry(self, job_id: str, worker_id: str, error: str) -> bool:
+        """
+        Give the job back after a transient error; it fails for good once
+        max_attempts is used up. False if the lease was lost.
+        """
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,"
+                " file_bytes = CASE WHEN attempts >= max_attempts THEN NULL ELSE file_bytes END,"
+                " expires_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,"
+                " error = ?, worker_id = NULL, lease_until = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (FAILED, QUEUED, now + self.result_ttl, error, now, job_id, worker_id, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def release_worker(self, worker_id: str) -> int:
+        """Expire the leases held by a worker known to be dead. Returns jobs released."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_until = 0 WHERE worker_id = ? AND status = ?",
+                (worker_id, RUNNING),
+            )
+        return cur.rowcount
+
+    def purge_expired(self) -> int:
+        """Delete finished jobs whose results have outlived result_ttl."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+        return cur.rowcount
+
+    def _finish(self, job_id: str, worker_id: str, status: str,
+                result: Optional[str] = None, error: Optional[str] = None) -> bool:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, progress = COALESCE(?, progress),"
+                " file_bytes = NULL, lease_until = NULL, updated_at = ?, expires_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (status, result, error, 1.0 if status == DONE else None, now,
+                 now + self.result_ttl, job_id, worker_id, RUNNING),
+            )
+        return cur.rowcount == 1
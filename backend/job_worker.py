@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+job_worker.py
+Analysis workers for the asynchronous job API (POST /jobs, see job_queue.py).
+
+Workers run either as threads inside the API process (main.py starts
+Config.JOB_THREADS of them, handy for development) or as a separate pool that
+keeps heavy analyses off the HTTP workers entirely:
+
+    JOB_THREADS=0 python serve.py --workers 2
+    python job_worker.py --workers 4
+
+The pool master preloads the models once (preload.py) and forks the workers,
+so they share model memory like serve.py's HTTP workers. Workers that exit are
+respawned, and the jobs they held are released immediately so another worker
+retries them instead of waiting for the lease to run out. Pool workers run one
+job at a time, so each job's spaCy vocab additions are released when it ends
+(memory_stats.vocab_scope), and a worker retires after --max-jobs jobs or
+past --max-unique-mb / --max-vocab-strings (memory_stats.RecyclePolicy).
+
+A job runs every stage with no time budget; there is no request timeout to
+race. Parse errors and unusable JDs fail the job; any other exception is
+retried up to the queue's max_attempts.
+
+Callback URLs come from clients, so they must not point the worker at
+internal services: check_callback_url() rejects hosts that resolve to
+loopback, link-local, private or otherwise non-public addresses (unless
+listed in JOB_CALLBACK_HOSTS), and callbacks never follow redirects.
+"""
+
+import argparse
+import ipaddress
+import json
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Optional
+
+from job_queue import DONE, FAILED, JobQueue
+from memory_stats import RecyclePolicy, vocab_scope
+from pipeline import STAGES, analyze, parse
+from resume_structure import structure_to_list
+
+# Same location as main.Config.DATA_DIR
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+JOBS_DB = "jobs.sqlite3"
+JD_REGISTRY_DB = "jd_registry.sqlite3"
+
+PURGE_INTERVAL = 60  # seconds between result purges per worker
+
+
+class LeaseLostError(Exception):
+    """The job's lease expired and another worker has taken it over."""
+
+
+def run_job(queue: JobQueue, job: Dict[str, Any], worker_id: str, jd_registry=None) -> Dict[str, Any]:
+    """
+    Parse and analyze one claimed job, reporting progress to the queue.
+    Returns the result in the shape of /process's AnalysisResponse.
+    """
+    job_id = job["job_id"]
+
+    def progress(stage: str) -> None:
+        if not queue.heartbeat(job_id, worker_id, stage, STAGES.index(stage) / len(STAGES)):
+            raise LeaseLostError(job_id)
+
+    stages = []
+    progress("parse")
+    resume_text, resume_structure = parse(job["filename"], job["file_bytes"], stages)
+
+    jd_profile = None
+    if job["jd_id"] and jd_registry is not None:
+        try:
+            jd_profile = jd_registry.get(job["jd_id"])
+        except KeyError:
+            # Expired since submission: the JD text stored with the job still works
+            pass
+
+    result = analyze(
+        resume_text, resume_structure, job["jd_text"],
+        engine=job["engine"], jd_profile=jd_profile, progress=progress,
+        stages=stages, strict=True
+    )
+    return {
+        "success": True,
+        "jd_text": job["jd_text"],
+        "resume_text": resume_text,
+        "resume_structure": structure_to_list(resume_structure),
+        **result,
+    }
+
+
+def handle_job(queue: JobQueue, job: Dict[str, Any], worker_id: str, jd_registry=None) -> None:
+    """Run a claimed job and record its outcome (done, failed or retry)."""
+    job_id = job["job_id"]
+    print(f"Job {job_id}: attempt {job['attempts']}/{job['max_attempts']} on {worker_id}")
+    try:
+        result = run_job(queue, job, worker_id, jd_registry)
+    except LeaseLostError:
+        print(f"Job {job_id}: lease lost, result discarded")
+        return
+    except ValueError as e:
+        # Unparseable resume or unusable JD: retrying cannot help
+        queue.fail(job_id, worker_id, str(e))
+    except Exception as e:
+        print(f"Job {job_id}: error: {str(e)}")
+        traceback.print_exc()
+        queue.retry(job_id, worker_id, f"{type(e).__name__}: {str(e)}")
+    else:
+        if not queue.complete(job_id, worker_id, result):
+            print(f"Job {job_id}: lease lost, result discarded")
+            return
+
+    if job.get("callback_url"):
+        final = queue.get(job_id)
+        if final and final["status"] in (DONE, FAILED):
+            notify_callback(job["callback_url"], {
+                "job_id": job_id,
+                "status": final["status"],
+                "error": final["error"],
+            })
+
+
+# Callback hosts trusted even if they resolve to internal addresses (comma-separated)
+CALLBACK_HOSTS = frozenset(
+    h.strip().lower() for h in os.environ.get("JOB_CALLBACK_HOSTS", "").split(",") if h.strip()
+)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """A redirect could lead to an address check_callback_url() would refuse."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        raise urllib.error.HTTPError(req.full_url, code, f"Redirect to {newurl} not followed", headers, fp)
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def check_callback_url(url: str) -> str:
+    """
+    Validate a client-supplied callback URL and return it.
+
+    Raises:
+        ValueError: if it is not http(s), or its host does not resolve only
+            to public addresses (and is not in JOB_CALLBACK_HOSTS)
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be an http:// or https:// URL")
+    host = parsed.hostname.lower()
+    if host in CALLBACK_HOSTS:
+        return url
+    try:
+        infos = socket.getaddrinfo(host, parsed.port or (443 if parsed.scheme == "https" else 80),
+                                   proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"callback_url host '{host}' does not resolve")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"callback_url host '{host}' resolves to a non-public address")
+    return url
+
+
+def notify_callback(url: str, payload: Dict[str, Any], timeout: float = 5.0) -> bool:
+    """POST the job outcome to the client's callback URL (best effort, no redirects)."""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        # Checked again: the host may resolve differently than at submission
+        check_callback_url(url)
+        with _callback_opener.open(request, timeout=timeout):
+            return True
+    except Exception as e:
+        print(f"Warning: Job callback to {url} failed: {str(e)}")
+        return False
+
+
+def work(queue: JobQueue, worker_id: str, stop: threading.Event, jd_registry=None,
+         poll_interval: float = 0.5, recycle: Optional[RecyclePolicy] = None, nlp=None) -> None:
+    """
+    Claim and run jobs until `stop` is set, or until the `recycle` policy
+    says this worker should be replaced. With `nlp`, each job runs in its own
+    vocab scope: only for processes that run one job at a time.
+    """
+    last_purge = 0.0
+    jobs = 0
+    while not stop.is_set():
+        try:
+            if time.time() - last_purge > PURGE_INTERVAL:
+                queue.purge_expired()
+                last_purge = time.time()
+            job = queue.claim(worker_id)
+        except sqlite3.OperationalError as e:
+            print(f"Warning: Job queue unavailable: {str(e)}")
+            job = None
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        if nlp is not None:
+            with vocab_scope(nlp):
+                handle_job(queue, job, worker_id, jd_registry)
+        else:
+            handle_job(queue, job, worker_id, jd_registry)
+        jobs += 1
+        reason = recycle.check(jobs, nlp) if recycle is not None else None
+        if reason:
+            print(f"Job worker {worker_id} recycling: {reason}")
+            return
+
+
+def start_worker_threads(queue: JobQueue, count: int, jd_registry=None) -> threading.Event:
+    """Start `count` daemon worker threads in this process; set the returned event to stop them."""
+    stop = threading.Event()
+    for n in range(count):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:t{n}"
+        thread = threading.Thread(
+            target=work, args=(queue, worker_id, stop, jd_registry),
+            name=f"job-worker-{n}", daemon=True
+        )
+        thread.start()
+    return stop
+
+
+def _worker_id(pid: int) -> str:
+    return f"{socket.gethostname()}:{pid}"
+
+
+def _run_worker_process(args) -> None:
+    """Body of a forked pool worker: work until SIGTERM or recycled, never return."""
+    from jd_registry import JDRegistry
+    from preload import after_fork
+    from suggest_skills import nlp
+
+    after_fork()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    code = 0
+    try:
+        # SQLite connections must not cross fork(): open them in the child
+        queue = JobQueue(os.path.join(args.data_dir, JOBS_DB), result_ttl=args.result_ttl,
+                         lease_seconds=args.lease, max_attempts=args.max_attempts)
+        registry = JDRegistry(os.path.join(args.data_dir, JD_REGISTRY_DB))
+        recycle = RecyclePolicy(args.max_jobs, args.max_unique_mb, args.max_vocab_strings)
+        work(queue, _worker_id(os.getpid()), stop, registry, poll_interval=args.poll,
+             recycle=recycle, nlp=nlp)
+    except Exception as e:
+        print(f"Job worker {os.getpid()} crashed: {e}")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _spawn(args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _run_worker_process(args)
+    return pid
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Preforked analysis workers for the /jobs queue")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--data-dir", default=DATA_DIR)
+    ap.add_argument("--result-ttl", type=int, default=3600, help="Seconds results are kept")
+    ap.add_argument("--lease", type=int, default=120,
+                    help="Seconds without progress before a job is considered abandoned")
+    ap.add_argument("--max-attempts", type=int, default=3)
+    ap.add_argument("--poll", type=float, default=0.5, help="Idle poll interval in seconds")
+    ap.add_argument("--max-jobs", type=int, default=0, help="Recycle a worker after this many jobs (0 = never)")
+    ap.add_argument("--max-unique-mb", type=float, default=0,
+                    help="Recycle a worker once its private memory exceeds this (0 = off)")
+    ap.add_argument("--max-vocab-strings", type=int, default=0,
+                    help="Recycle a worker once spaCy's StringStore holds this many strings (0 = off)")
+    args = ap.parse_args()
+
+    if not hasattr(os, "fork"):
+        print("job_worker.py needs os.fork(); use in-process workers (Config.JOB_THREADS) instead")
+        return 1
+
+    from preload import preload_models
+
+    print(f"Preloading models in master {os.getpid()}...")
+    print(f"Preload done: {preload_models()}")
+
+    workers: Dict[int, float] = {}
+    stopping = False
+    master_queue: Optional[JobQueue] = None
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    for _ in range(max(1, args.workers)):
+        workers[_spawn(args)] = time.time()
+    print(f"Job workers {sorted(workers)} polling {os.path.join(args.data_dir, JOBS_DB)}")
+
+    while not stopping:
+        time.sleep(0.5)
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                break
+            started = workers.pop(pid, None)
+            if started is None:
+                continue
+            if master_queue is None:
+                master_queue = JobQueue(os.path.join(args.data_dir, JOBS_DB))
+            released = master_queue.release_worker(_worker_id(pid))
+            if not stopping:
+                print(f"Job worker {pid} exited (status {status}), {released} job(s) released; respawning")
+                workers[_spawn(args)] = time.time()
+
+    print("Stopping job workers (current jobs finish first)...")
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in list(workers):
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
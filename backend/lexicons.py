@@ -0,0 +1,116 @@
+"""
+lexicons.py
+Static word lists shared by the full (spaCy/SkillNER) and lite scoring engines.
+
+Kept free of any NLP imports so that modules which only need the lists
+(e.g. lite_scorer) can be imported without loading a spaCy model.
+"""
+
+# Common technical skills and keywords for pattern matching
+COMMON_SKILLS = {
+    # Programming Languages
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'c', 'ruby', 'php', 'swift', 'kotlin',
+    'go', 'rust', 'scala', 'r', 'matlab', 'perl', 'shell', 'bash', 'powershell',
+
+    # Web Technologies
+    'html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
+    'laravel', 'ruby on rails', 'asp.net', '.net', 'jquery', 'bootstrap', 'sass', 'less',
+
+    # Databases
+    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite',
+    'nosql', 'cassandra', 'dynamodb', 'firebase',
+
+    # Cloud & DevOps
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
+    'terraform', 'ansible', 'chef', 'puppet', 'vagrant', 'linux', 'unix', 'windows',
+
+    # Data Science & ML
+    'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'keras', 'scikit-learn',
+    'pandas', 'numpy', 'matplotlib', 'seaborn', 'jupyter', 'tableau', 'power bi',
+    'data analysis', 'data science', 'statistics', 'excel',
+
+    # Mobile Development
+    'ios', 'android', 'react native', 'flutter', 'xamarin', 'cordova', 'ionic',
+
+    # Other Technologies
+    'api', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'kanban', 'jira',
+    'confluence', 'slack', 'teams', 'zoom'
+}
+
+# Other spellings and abbreviations of COMMON_SKILLS (alias -> canonical name).
+# Spacing and punctuation variants ('nodejs', 'node js') need no entry: they
+# are resolved by skill_vocab's punctuation-insensitive key.
+SKILL_ALIASES = {
+    'golang': 'go', 'js': 'javascript', 'ecmascript': 'javascript',
+    'cpp': 'c++', 'csharp': 'c#', 'python3': 'python',
+    'react.js': 'react', 'angularjs': 'angular', 'vue.js': 'vue',
+    'node': 'node.js', 'express.js': 'express', 'rails': 'ruby on rails', 'dotnet': '.net',
+    'postgres': 'postgresql', 'psql': 'postgresql', 'mongo': 'mongodb',
+    'amazon web services': 'aws', 'microsoft azure': 'azure', 'google cloud': 'gcp',
+    'google cloud platform': 'gcp', 'k8s': 'kubernetes', 'github actions': 'github',
+    'ml': 'machine learning', 'sklearn': 'scikit-learn',
+    'microsoft excel': 'excel', 'ms excel': 'excel', 'powerbi': 'power bi',
+    'restful': 'rest', 'rest api': 'rest', 'restful api': 'rest', 'microsoft teams': 'teams',
+}
+
+# Base forms of verbs that commonly open resume bullets. Used in place of
+# POS tagging by the lite engine: a bullet "starts with a verb" when its first
+# word is one of these (or a regular inflection of one, see is_action_verb).
+ACTION_VERBS = frozenset({
+    'accelerate', 'accomplish', 'achieve', 'acquire', 'adapt', 'address', 'administer',
+    'advise', 'align', 'analyze', 'architect', 'assemble', 'assess', 'assist', 'audit',
+    'automate', 'build', 'calculate', 'champion', 'clarify', 'coach', 'collaborate',
+    'compile', 'complete', 'conduct', 'configure', 'consolidate', 'construct', 'consult',
+    'contribute', 'coordinate', 'create', 'cultivate', 'cut', 'debug', 'decrease',
+    'define', 'deliver', 'demonstrate', 'deploy', 'design', 'determine', 'develop',
+    'devise', 'diagnose', 'direct', 'document', 'drive', 'earn', 'educate', 'eliminate',
+    'enable', 'engineer', 'enhance', 'establish', 'evaluate', 'execute', 'expand',
+    'facilitate', 'forecast', 'formulate', 'found', 'generate', 'grow', 'guide', 'handle',
+    'head', 'identify', 'implement', 'improve', 'increase', 'influence', 'initiate',
+    'innovate', 'inspect', 'install', 'integrate', 'interview', 'introduce', 'investigate',
+    'launch', 'lead', 'led', 'leverage', 'maintain', 'manage', 'maximize', 'measure',
+    'mentor', 'migrate', 'minimize', 'model', 'modernize', 'monitor', 'motivate',
+    'negotiate', 'operate', 'optimize', 'orchestrate', 'organize', 'oversee', 'partner',
+    'perform', 'pilot', 'pioneer', 'plan', 'prepare', 'present', 'prioritize', 'produce',
+    'program', 'propose', 'prototype', 'provide', 'publish', 'recommend', 'recruit',
+    'redesign', 'reduce', 'refactor', 'remodel', 'reorganize', 'research', 'resolve',
+    'restructure', 'review', 'revamp', 'run', 'save', 'scale', 'schedule', 'secure',
+    'simplify', 'solve', 'spearhead', 'standardize', 'streamline', 'strengthen',
+    'structure', 'supervise', 'support', 'teach', 'test', 'train', 'transform',
+    'troubleshoot', 'unify', 'upgrade', 'validate', 'win', 'work', 'write',
+    # irregular past forms
+    'built', 'drove', 'grew', 'ran', 'won', 'wrote', 'taught', 'oversaw', 'headed',
+})
+
+# Small English stopword list for the regex tokenizer (no NLTK/sklearn needed)
+STOP_WORDS = frozenset({
+    'a', 'about', 'above', 'after', 'again', 'all', 'also', 'am', 'an', 'and', 'any',
+    'are', 'as', 'at', 'be', 'because', 'been', 'before', 'being', 'below', 'between',
+    'both', 'but', 'by', 'can', 'could', 'did', 'do', 'does', 'doing', 'down', 'during',
+    'each', 'etc', 'few', 'for', 'from', 'further', 'had', 'has', 'have', 'having', 'he',
+    'her', 'here', 'hers', 'him', 'his', 'how', 'i', 'if', 'in', 'into', 'is', 'it',
+    'its', 'itself', 'just', 'may', 'me', 'more', 'most', 'must', 'my', 'no', 'nor',
+    'not', 'now', 'of', 'off', 'on', 'once', 'only', 'or', 'other', 'our', 'ours',
+    'out', 'over', 'own', 'same', 'she', 'should', 'so', 'some', 'such', 'than', 'that',
+    'the', 'their', 'theirs', 'them', 'then', 'there', 'these', 'they', 'this', 'those',
+    'through', 'to', 'too', 'under', 'until', 'up', 'us', 'very', 'was', 'we', 'were',
+    'what', 'when', 'where', 'which', 'while', 'who', 'whom', 'why', 'will', 'with',
+    'would', 'you', 'your', 'yours',
+})
+
+
+def is_action_verb(word: str) -> bool:
+    """Check a (lowercased) word against ACTION_VERBS, allowing -s/-ed/-ing endings."""
+    if not word:
+        return False
+    if word in ACTION_VERBS:
+        return True
+    for suffix, repl in (("ied", "y"), ("ed", ""), ("ed", "e"), ("ing", ""), ("ing", "e"), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) > len(suffix) + 2:
+            base = word[: -len(suffix)] + repl
+            if base in ACTION_VERBS:
+                return True
+            # doubled consonant: planned -> plan, running -> run
+            if len(base) > 3 and base[-1] == base[-2] and base[:-1] in ACTION_VERBS:
+                return True
+    return False
@@ -0,0 +1,339 @@
+# lite_scorer.py
+"""
+"Lite" ATS scoring engine: same output shape as the full engine, no NLP model.
+
+Replaces each model-backed step of ats_calculator / suggest_skills with a cheap
+equivalent:
+- spaCy tokenization        -> precompiled regex tokenizer
+- SkillNER skill extraction -> one precompiled alternation over COMMON_SKILLS
+- POS tags for action verbs -> ACTION_VERBS lexicon (lexicons.py)
+- TF-IDF fit per request    -> IDF table precomputed from token_dist.json
+
+Intended for live feedback in the extension and bulk pre-filtering, where a
+score in a few milliseconds matters more than SkillNER's recall.
+
+Public API (mirrors the full engine):
+    calc = LiteATSCalculator(jd_text)
+    final_score = calc.total_score(resume_text, resume_structure)
+    missing = get_missing_skills_lite(jd_text, resume_text)
+"""
+
+from __future__ import annotations
+from typing import List, Dict, Tuple, Set, Any, Optional
+import json
+import math
+import os
+import re
+import threading
+
+from collections import Counter
+
+from lexicons import COMMON_SKILLS, STOP_WORDS, is_action_verb
+from parser import _normalize
+from jd_segmenter import PREFERRED_WEIGHT, focus_jd
+from resume_structure import is_structure
+from structure_index import StructureIndex, build_structure_index
+
+# -----------------------
+# Precompiled resources (built once at import)
+# -----------------------
+TOKEN_REGEX = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+SENTENCE_SPLIT_REGEX = re.compile(r"(?<=[.!?])\s+|\n+")
+BULLET_PREFIX_REGEX = re.compile(r"^[\s•\-*–—·]+")
+
+# Longest alternatives first so 'react native' wins over 'react'
+SKILL_REGEX = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(s) for s in sorted(COMMON_SKILLS, key=len, reverse=True)) + r")(?![\w+#])"
+)
+
+EXPERIENCE_REGEX = re.compile(r"(\d+)\s*\+?\s*(?:years|yrs)\s+(?:of\s+)?experience")
+YEAR_REGEX = re.compile(r"(20\d{2}|19\d{2})")
+
+TOKEN_DIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "token_dist.json")
+
+
+def _load_idf_table(path: str = TOKEN_DIST_PATH) -> Dict[str, float]:
+    """
+    Build the IDF table from the SkillNER token distribution shipped with the repo.
+
+    token_dist.json counts how many skill names each token appears in, so tokens
+    that are distinctive inside the skill vocabulary ('python', 'kubernetes') get a
+    high weight and generic skill words ('system', 'management') a low one.
+    Tokens outside the table get a neutral weight of 1.0.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            dist = json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load IDF table from {path}: {e}")
+        return {}
+    n_docs = max(dist.values()) if dist else 0
+    return {tok: math.log((1 + n_docs) / (1 + df)) + 1.0 for tok, df in dist.items()}
+
+
+IDF_TABLE: Dict[str, float] = _load_idf_table()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase regex tokenizer (keeps 'c++', 'c#', 'node.js' intact)."""
+    return TOKEN_REGEX.findall(text.lower()) if text else []
+
+
+def extract_skills_lite(text: str) -> Set[str]:
+    """Dictionary-only skill extraction over COMMON_SKILLS."""
+    if not text:
+        return set()
+    return set(SKILL_REGEX.findall(text.lower()))
+
+
+def _tfidf_vector(tokens: List[str]) -> Dict[str, float]:
+    """Unigram + bigram TF-IDF vector using the precomputed IDF table."""
+    words = [t for t in tokens if t not in STOP_WORDS]
+    counts = Counter(words)
+    counts.update(" ".join(pair) for pair in zip(words, words[1:]))
+    vec = {}
+    for term, tf in counts.items():
+        if " " in term:
+            a, b = term.split(" ", 1)
+            idf = (IDF_TABLE.get(a, 1.0) + IDF_TABLE.get(b, 1.0)) / 2.0
+        else:
+            idf = IDF_TABLE.get(term, 1.0)
+        vec[term] = (1.0 + math.log(tf)) * idf
+    return vec
+
+
+def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(w * b[t] for t, w in a.items() if t in b)
+    if dot == 0.0:
+        return 0.0
+    na = math.sqrt(sum(w * w for w in a.values()))
+    nb = math.sqrt(sum(w * w for w in b.values()))
+    return dot / (na * nb)
+
+
+# -----------------------
+# Main calculator
+# -----------------------
+class LiteATSCalculator:
+    """
+    Model-free counterpart of ats_calculator.ATSCalculator.
+
+    Uses the same weights and the same 0–100 integer output so the two engines
+    can be swapped per request.
+    """
+
+    MIN_TEXT_LENGTH = 50  # sanity threshold for meaningful content
+
+    # Scoring weights (sum to 1.0) -- keep in sync with ATSCalculator
+    SKILL_COVERAGE_WEIGHT = 0.25
+    TFIDF_SIM_WEIGHT = 0.20
+    KEYWORD_MATCH_WEIGHT = 0.15
+    SECTIONS_WEIGHT = 0.20
+    BULLETS_WEIGHT = 0.10
+    READABILITY_VERBS_WEIGHT = 0.10
+
+    IMPORTANT_KEYWORDS = {
+        'experience', 'education', 'skills', 'projects', 'certifications',
+        'leadership', 'achievements', 'technical', 'professional', 'summary'
+    }
+
+    def __init__(self, jd_text: str):
+        ok, msg = self._validate_text(jd_text, "Job description")
+        if not ok:
+            raise ValueError(msg)
+
+        self.jd_text_raw = jd_text
+        # Same JD sections as the full engine (jd_segmenter.py)
+        focused = focus_jd(jd_text)
+        self.jd_text = _normalize(focused.text)
+
+        self.jd_skills = extract_skills_lite(_normalize(focused.core))
+        self.jd_preferred = extract_skills_lite(_normalize(focused.preferred)) - self.jd_skills
+        self.jd_skills |= self.jd_preferred
+        self.jd_vector = _tfidf_vector(tokenize(self.jd_text))
+        self.jd_required_years = self._extract_experience_requirements(self.jd_text)
+
+        # For internal logging/explainability (see debug_details)
+        self._debug = threading.local()
+
+    @property
+    def debug_details(self) -> Dict[str, Any]:
+        """Details of the latest scoring call in the current thread (as in ATSCalculator)."""
+        return self._debug.__dict__.setdefault("details", {})
+
+    # -----------------------
+    # Public API
+    # -----------------------
+    def total_score(self, resume_text: str, resume_structure: List[Dict],
+                    index: Optional[StructureIndex] = None) -> int:
+        """Compute final ATS score 0–100 (same contract as ATSCalculator.total_score)."""
+        self._debug.details = {}
+        ok, msg = self._validate_text(resume_text, "Resume")
+        if not ok:
+            self.debug_details["error"] = msg
+            return 0
+
+        if not is_structure(resume_structure) or not resume_structure:
+            self.debug_details["error"] = "Invalid or empty resume structure"
+            return 0
+
+        if index is None:
+            index = build_structure_index(resume_structure)
+
+        disq_ok, disq_reason = self._check_disqualifiers(index)
+        if not disq_ok:
+            self.debug_details["disqualified"] = disq_reason
+            return 0
+
+        try:
+            content_score = self._content_score(resume_text)
+            formatting_score = self._formatting_score(resume_text, index)
+            final_pct = int(round((content_score + formatting_score) * 100))
+            self.debug_details["final_score"] = final_pct
+            return final_pct
+        except Exception as e:
+            self.debug_details["error"] = f"ATS computation error: {e}"
+            return 0
+
+    # -----------------------
+    # Content scoring (0.60)
+    # -----------------------
+    def _skill_weight(self, skills: Set[str]) -> float:
+        """Number of JD skills, nice-to-have ones counting PREFERRED_WEIGHT (as ATSCalculator)."""
+        preferred = len(skills & self.jd_preferred)
+        return len(skills) - preferred + PREFERRED_WEIGHT * preferred
+
+    def _content_score(self, resume_text: str) -> float:
+        resume_norm = _normalize(resume_text)
+
+        skill_coverage = 0.0
+        if self.jd_skills:
+            resume_skills = extract_skills_lite(resume_norm)
+            skill_coverage = self._skill_weight(self.jd_skills & resume_skills) / self._skill_weight(self.jd_skills)
+        skill_component = self.SKILL_COVERAGE_WEIGHT * skill_coverage
+
+        sim = _cosine(self.jd_vector, _tfidf_vector(tokenize(resume_norm)))
+        tfidf_component = self.TFIDF_SIM_WEIGHT * sim
+
+        present_keywords = [kw for kw in self.IMPORTANT_KEYWORDS if kw in resume_norm]
+        keyword_component = self.KEYWORD_MATCH_WEIGHT * len(present_keywords) / len(self.IMPORTANT_KEYWORDS)
+
+        exp_bonus = self._experience_bonus(resume_norm)
+
+        self.debug_details.update({
+            "skill_coverage": skill_coverage,
+            "tfidf_similarity": sim,
+            "keywords_found": present_keywords,
+        })
+        total_content = skill_component + tfidf_component + keyword_component + exp_bonus
+        return max(0.0, min(0.60, total_content))
+
+    # -----------------------
+    # Formatting scoring (0.40)
+    # -----------------------
+    def _formatting_score(self, resume_text: str, index: StructureIndex) -> float:
+        score = 0.0
+
+        # 1) Sections presence (0.20)
+        required = {"skills", "experience", "education"}
+        present = {h.lower() for h in index.headings if h.lower() in required}
+        score += self.SECTIONS_WEIGHT * (len(present) / len(required))
+
+        # 2) Bullet balance (0.10)
+        bullets_by_section = index.bullets_by_section({"experience", "projects", "project", "education"})
+
+        # Action verbs: lexicon lookup instead of POS tags
+        verb_starts = 0
+        for content in index.bullets:
+            first = tokenize(BULLET_PREFIX_REGEX.sub("", content)[:40])
+            if first and is_action_verb(first[0]):
+                verb_starts += 1
+
+        bullet_component = 0.0
+        for cnt in bullets_by_section.values():
+            if cnt >= 2:
+                bullet_component += (self.BULLETS_WEIGHT / 4.0)
+            if cnt > 4:
+                bullet_component -= (self.BULLETS_WEIGHT / 10.0)
+        score += max(0.0, min(self.BULLETS_WEIGHT, bullet_component))
+
+        # 3) Readability & action verbs (0.10)
+        read_component = 0.0
+        sents = [s for s in SENTENCE_SPLIT_REGEX.split(resume_text or "") if s.strip()]
+        avg_len = sum(len(tokenize(s)) for s in sents) / len(sents) if sents else 0.0
+        if 10 <= avg_len <= 30:
+            read_component += self.READABILITY_VERBS_WEIGHT * 0.5
+        if verb_starts >= 3:
+            read_component += self.READABILITY_VERBS_WEIGHT * 0.5
+        score += max(0.0, min(self.READABILITY_VERBS_WEIGHT, read_component))
+
+        self.debug_details.update({
+            "sections_found": list(present),
+            "bullets_by_section": bullets_by_section,
+            "verb_starts": verb_starts,
+        })
+        return max(0.0, min(0.40, score))
+
+    # -----------------------
+    # Disqualifiers (hard fails)
+    # -----------------------
+    def _check_disqualifiers(self, index: StructureIndex) -> Tuple[bool, str]:
+        """Same rules as ATSCalculator._check_disqualifiers."""
+        if index.table_count or index.image_count:
+            return False, "Resume contains tables or images (not ATS-friendly)"
+        if not (index.has_name_heading and (index.has_email or index.has_phone_or_profile)):
+            return False, "Missing minimal contact information (name + email + phone or profile)"
+        return True, ""
+
+    # -----------------------
+    # Experience extraction / bonus
+    # -----------------------
+    def _extract_experience_requirements(self, text: str) -> int:
+        nums = [int(m) for m in EXPERIENCE_REGEX.findall(_normalize(text))]
+        return max(nums) if nums else 0
+
+    def _experience_bonus(self, resume_text: str) -> float:
+        if self.jd_required_years <= 0:
+            return 0.0
+        yrs = sorted({int(y) for y in YEAR_REGEX.findall(resume_text)})
+        resume_years = max(0, min(40, yrs[-1] - yrs[0])) if len(yrs) >= 2 else 0
+        return 0.02 if resume_years >= self.jd_required_years else 0.0
+
+    # -----------------------
+    # Validation helpers
+    # -----------------------
+    def _validate_text(self, text: str, name: str) -> Tuple[bool, str]:
+        if not isinstance(text, str) or not text.strip():
+            return False, f"{name} is empty or not a string"
+        if len(text.strip()) < self.MIN_TEXT_LENGTH:
+            return False, f"{name} is too short (min {self.MIN_TEXT_LENGTH} chars)"
+        ratio = sum(c.isalnum() or c.isspace() for c in text) / max(1, len(text))
+        if ratio < 0.5:
+            return False, f"{name} contains too many non-text characters"
+        return True, ""
+
+
+def get_missing_skills_lite(jd_text: str, resume_text: str, jd_skills: Optional[Set[str]] = None) -> List[str]:
+    """
+    Model-free counterpart of suggest_skills.get_missing_skills.
+    Returns up to 20 COMMON_SKILLS found in the JD but not the resume,
+    sorted by how often they occur in the kept sections of the JD
+    (jd_segmenter.py; nice-to-have mentions count less).
+    """
+    if not jd_text or not resume_text:
+        return []
+
+    focused = focus_jd(jd_text)
+    if jd_skills is None:
+        jd_skills = extract_skills_lite(focused.text)
+    missing = jd_skills - extract_skills_lite(resume_text)
+
+    ranked = sorted(
+        (s for s in missing if len(s) > 2),
+        key=lambda s: (-focused.mentions(s), s)
+    )
+    return ranked[:20]
@@ -0,0 +1,187 @@
+"""
+live_session.py
+Incremental re-scoring for the /live WebSocket endpoint.
+
+A session holds the parsed resume structure (as returned by /process), the
+JD analysis and per-element annotations (skills, sentence lengths, verb-initial
+bullets). Each edit re-annotates only the element it touches; the score is then
+re-aggregated from cached annotations (ATSCalculator.score_annotated) and
+compared with the previous result, so the client receives deltas only.
+
+What an operation recomputes:
+    replace / insert / delete  -> annotation of that element, ATS score,
+                                  missing skills, structure advice
+    set_jd                     -> JD analysis, ATS score, missing skills
+                                  (resume annotations and advice are reused)
+
+Protocol (JSON messages):
+    -> {"op": "init", "jd_text": str, "resume_structure": [element, ...]}
+    <- {"type": "snapshot", "ats_score", "suggested_skills", "improvement_recommendation", "elapsed_ms"}
+    -> {"op": "replace", "index": i, "element": {"type": "bullet", "content": "..."}}
+    -> {"op": "insert",  "index": i, "element": {...}}
+    -> {"op": "delete",  "index": i}
+    -> {"op": "set_jd",  "jd_text": str}
+    <- {"type": "delta", "seq", "ats_score", "previous_ats_score",
+        "suggested_skills": {"added", "removed"},
+        "improvement_recommendation": {"added", "resolved"}, "elapsed_ms"}
+    <- {"type": "error", "message": str}
+
+The resume text is rebuilt from the element contents, so scores can differ
+slightly from /process, which scores the raw extracted text.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ats_calculator import ATSCalculator
+from restructure_advice import analyze_resume_structure
+from jd_segmenter import focus_jd
+from structure_index import build_structure_index
+from skill_vocab import SkillSet, vocab
+from suggest_skills import extract_skills, rank_missing_skill_bits
+
+ELEMENT_TYPES = {"heading", "bullet", "text", "table", "image"}
+MAX_ELEMENTS = 500
+ANNOTATION_CACHE_SIZE = 1024
+
+
+class LiveSession:
+    """Session state for one live-editing client."""
+
+    def __init__(self, jd_text: str, resume_structure: List[Dict[str, Any]]):
+        if not isinstance(resume_structure, list) or not resume_structure:
+            raise ValueError("resume_structure must be a non-empty list of elements")
+        if len(resume_structure) > MAX_ELEMENTS:
+            raise ValueError(f"resume_structure has more than {MAX_ELEMENTS} elements")
+
+        self.elements: List[Dict[str, Any]] = [self._validate_element(el) for el in resume_structure]
+        self.seq = 0
+        # (type, content) -> annotation; shared by identical elements and undo
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._set_jd(jd_text)
+
+        self.ats_score: Optional[int] = None
+        self.suggested_skills: List[str] = []
+        self.advice: List[Dict[str, str]] = []
+        self._recompute(resume_changed=True)
+
+    # -----------------------
+    # Public API
+    # -----------------------
+    def snapshot(self, elapsed_ms: float = 0.0) -> Dict[str, Any]:
+        return {
+            "type": "snapshot",
+            "seq": self.seq,
+            "ats_score": self.ats_score,
+            "suggested_skills": self.suggested_skills,
+            "improvement_recommendation": self.advice,
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+
+    def apply(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one edit operation and return the resulting delta."""
+        start = time.perf_counter()
+        op = message.get("op")
+
+        if op == "replace":
+            index = self._index(message, len(self.elements))
+            self.elements[index] = self._validate_element(message.get("element"))
+        elif op == "insert":
+            if len(self.elements) >= MAX_ELEMENTS:
+                raise ValueError(f"Resume cannot have more than {MAX_ELEMENTS} elements")
+            index = self._index(message, len(self.elements) + 1)
+            self.elements.insert(index, self._validate_element(message.get("element")))
+        elif op == "delete":
+            if len(self.elements) <= 1:
+                raise ValueError("Cannot delete the last element")
+            index = self._index(message, len(self.elements))
+            del self.elements[index]
+        elif op == "set_jd":
+            self._set_jd(message.get("jd_text"))
+        else:
+            raise ValueError(f"Unknown op '{op}'. Expected one of: replace, insert, delete, set_jd")
+
+        previous = (self.ats_score, self.suggested_skills, self.advice)
+        self._recompute(resume_changed=op != "set_jd")
+        self.seq += 1
+        return self._delta(previous, (time.perf_counter() - start) * 1000)
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _set_jd(self, jd_text: Any) -> None:
+        if not isinstance(jd_text, str) or not jd_text.strip():
+            raise ValueError("jd_text must be a non-empty string")
+        # ATSCalculator raises ValueError for unusable JDs; let it propagate
+        calculator = ATSCalculator(jd_text)
+        self.jd_text = jd_text
+        self.calculator = calculator
+        self.jd_skill_bits = vocab.encode(extract_skills(focus_jd(jd_text).text))
+
+    def _annotation(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        key = (element["type"], element.get("content", ""))
+        ann = self._cache.get(key)
+        if ann is None:
+            ann = self.calculator.annotate_element(element)
+            ann["suggest_skills"] = vocab.encode(extract_skills(element.get("content", "")))
+            self._cache[key] = ann
+            if len(self._cache) > ANNOTATION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return ann
+
+    def _recompute(self, resume_changed: bool) -> None:
+        annotations = [self._annotation(el) for el in self.elements]
+        resume_text = "\n".join(el.get("content", "") for el in self.elements if el.get("content"))
+
+        index = build_structure_index(self.elements, resume_text)
+        self.ats_score = self.calculator.score_annotated(resume_text, self.elements, annotations, index=index)
+
+        resume_skills = SkillSet()
+        for ann in annotations:
+            resume_skills |= ann["suggest_skills"]
+        self.suggested_skills = rank_missing_skill_bits(self.jd_text, self.jd_skill_bits, resume_skills)
+
+        if resume_changed:
+            self.advice = analyze_resume_structure(resume_text, self.elements, index)
+
+    def _delta(self, previous, elapsed_ms: float) -> Dict[str, Any]:
+        prev_score, prev_skills, prev_advice = previous
+        prev_advice_keys = {(a.get("issue"), a.get("advice")) for a in prev_advice}
+        advice_keys = {(a.get("issue"), a.get("advice")) for a in self.advice}
+        return {
+            "type": "delta",
+            "seq": self.seq,
+            "ats_score": self.ats_score,
+            "previous_ats_score": prev_score,
+            "suggested_skills": {
+                "added": [s for s in self.suggested_skills if s not in prev_skills],
+                "removed": [s for s in prev_skills if s not in self.suggested_skills],
+            },
+            "improvement_recommendation": {
+                "added": [a for a in self.advice if (a.get("issue"), a.get("advice")) not in prev_advice_keys],
+                "resolved": [a for a in prev_advice if (a.get("issue"), a.get("advice")) not in advice_keys],
+            },
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+
+    @staticmethod
+    def _index(message: Dict[str, Any], upper: int) -> int:
+        index = message.get("index")
+        if not isinstance(index, int) or not 0 <= index < upper:
+            raise ValueError(f"index must be an integer in [0, {upper})")
+        return index
+
+    @staticmethod
+    def _validate_element(element: Any) -> Dict[str, Any]:
+        if not isinstance(element, dict):
+            raise ValueError("element must be an object")
+        kind = element.get("type")
+        if kind not in ELEMENT_TYPES:
+            raise ValueError(f"element type must be one of: {', '.join(sorted(ELEMENT_TYPES))}")
+        content = element.get("content", "")
+        if not isinstance(content, str):
+            raise ValueError("element content must be a string")
+        return dict(element, content=content)
@@ -0,0 +1,53 @@
+"""
+local_db.py
+SQLite connections that never cross fork().
+
+serve.py imports main in the master before forking the HTTP workers, and
+main builds its stores (JDRegistry, ResultStore, JobQueue) at module level.
+A SQLite connection must not be used in a process other than the one that
+opened it. ProcessConnection therefore opens nothing until first use, and a
+process that finds a connection opened by its parent opens its own:
+
+    self._db = ProcessConnection(db_path, self._setup, timeout=5)
+    self._db.get().execute(...)
+
+The setup callback runs on every new connection (pragmas, CREATE TABLE IF
+NOT EXISTS), so the schema exists whichever process opens the file first.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class ProcessConnection:
+    """A sqlite3 connection opened lazily, once per process."""
+
+    def __init__(self, db_path: str, setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 **connect_args: Any):
+        self.db_path = db_path
+        self.setup = setup
+        self.connect_args = {"check_same_thread": False, **connect_args}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        # Connections inherited from a parent: never used, and never closed either,
+        # since closing one would drop this process's locks on the same file
+        self._inherited: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    def get(self) -> sqlite3.Connection:
+        """The connection of the current process, opened (and set up) on first use."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._conn
+        with self._lock:
+            if self._pid != pid:
+                if self._conn is not None:
+                    self._inherited.append(self._conn)
+                conn = sqlite3.connect(self.db_path, **self.connect_args)
+                if self.setup is not None:
+                    self.setup(conn)
+                self._conn, self._pid = conn, pid
+        return self._conn
@@ -2,12 +2,16 @@
 import time
 import traceback
 import io
+import json
+import os
+import secrets
 from typing import Dict, List, Optional, Any
 
 # FastAPI imports
-from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException, status
-
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi import FastAPI, File, UploadFile, Form, Query, Request, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import HTTPConnection
 
 from pydantic import BaseModel, Field
 
@@ -15,9 +19,22 @@ from contextlib import asynccontextmanager
 
 # Import local modules
 import parser
-from suggest_skills import get_missing_skills
-from ats_calculator import ATSCalculator
-from restructure_advice import analyze_resume_structure
+import suggest_skills
+from pipeline import COMPLETED, analyze, parse
+from deadline import Deadline, DeadlineExceeded
+from memory_stats import process_memory, vocab_size
+import metrics
+from projection import parse_fields, project, selected_fields, without_resume
+from encoding import OffloadedGZipMiddleware, encode_timed, negotiate
+from triage import TriageError, check_triage, triage_document
+from coalesce import Coalescer, analysis_key, content_hash
+from result_store import ResultStore, start_compaction
+from fidelity import FULL, FidelityController
+from admission import AdmissionController, Overloaded
+from live_session import LiveSession
+from jd_registry import JDRegistry, UnknownJDError, ExpiredJDError
+from job_queue import JobQueue
+from job_worker import check_callback_url, start_worker_threads
 
 # Global state for rate limiting
 request_logs: Dict[str, List[float]] = {}
@@ -27,9 +44,38 @@ class Config:
     RATE_LIMIT = 10  # requests per minute
     RATE_LIMIT_WINDOW = 60  # seconds
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+    # Longest PDF accepted; long CVs are parsed page-parallel (parser.PDF_WORKERS)
+    MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "10"))
     ALLOWED_EXTENSIONS = {"pdf", "docx"}
     CHUNK_SIZE = 1024 * 64  # 64KB chunks for streaming
-    TIMEOUT = 15  # seconds
+    TIMEOUT = 15  # seconds, overall deadline for /process
+    # Per-stage budgets in seconds, each capped by what is left of TIMEOUT
+    # (see pipeline.py / deadline.py)
+    STAGE_BUDGETS = {"parse": 5, "skills": 4, "ats": 4, "structure": 2}
+    DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")  # runtime state
+    JD_TTL = 6 * 3600  # seconds a registered jd_id stays valid
+    ENGINES = {"full", "lite"}  # "lite" = model-free scorer (lite_scorer.py)
+    DEFAULT_ENGINE = "full"
+    # Asynchronous jobs (/jobs, see job_queue.py and job_worker.py)
+    JOB_THREADS = int(os.environ.get("JOB_THREADS", "1"))  # in-process workers; 0 with job_worker.py
+    JOB_RESULT_TTL = 3600  # seconds a finished job's result is kept
+    JOB_LEASE = 120  # seconds without progress before a job is retried elsewhere
+    JOB_MAX_ATTEMPTS = 3
+    GZIP_OFFLOAD_SIZE = 64 * 1024  # bytes; larger responses are compressed off the event loop
+    # Finished analyses kept across restarts (see result_store.py); 0 disables
+    RESULT_STORE_MAX_MB = float(os.environ.get("RESULT_STORE_MAX_MB", "256"))
+    RESULT_COMPACT_INTERVAL = 600  # seconds between result store compactions
+    # Parsed resumes under tokens issued to the uploader, for requests that send only resume_token; 0 disables
+    RESUME_STORE_MAX_MB = float(os.environ.get("RESUME_STORE_MAX_MB", "256"))
+    # Load-adaptive analysis fidelity (see fidelity.py); 0 always runs at full fidelity
+    ADAPTIVE_FIDELITY = os.environ.get("ADAPTIVE_FIDELITY", "1") != "0"
+    FIDELITY_IN_FLIGHT = (4, 8)  # analyses in flight at which trimmed / minimal start
+    FIDELITY_LATENCY = (6.0, 10.0)  # seconds of recent analysis latency, likewise
+    FIDELITY_HOLD = 10.0  # seconds in a tier before stepping back up
+    # Admission control for /process and /jd (see admission.py); 0 disables
+    MAX_CONCURRENT_ANALYSES = int(os.environ.get("MAX_CONCURRENT_ANALYSES", "8"))
+    MAX_QUEUED_ANALYSES = int(os.environ.get("MAX_QUEUED_ANALYSES", "16"))
+    MAX_QUEUE_WAIT = float(os.environ.get("MAX_QUEUE_WAIT", "5"))  # seconds, counted against TIMEOUT
 
 class ResumeAnalysisRequest(BaseModel):
     """Request model for resume analysis endpoint"""
@@ -44,19 +90,59 @@ class ResumeAnalysisRequest(BaseModel):
         example="resume.pdf"
     )
 
+class JDRegistrationResponse(BaseModel):
+    """Response model for JD registration"""
+    jd_id: str
+    expires_at: float
+    ttl_seconds: int
+    skills: List[str] = Field(default_factory=list)
+    required_years: int = 0
+
+class StageReport(BaseModel):
+    """Outcome of one pipeline stage"""
+    name: str  # parse, skills, ats, structure
+    status: str  # completed, degraded (partial result), skipped, failed
+    elapsed_ms: float = 0.0
+    detail: Optional[str] = None
+
 class AnalysisResponse(BaseModel):
     """Response model for analysis results"""
     success: bool
     jd_text: Optional[str] = None
-    # parser.parse_resume returns a list of structure elements
+    # parser.parse_resume returns a ResumeStructure; converted to plain dicts here
     resume_structure: Optional[List[Dict[str, Any]]] = None
     resume_text: Optional[str] = None
-    # ATS score can be fractional during calculation
+    # ATS score can be fractional during calculation; None if it was not scored
     ats_score: Optional[float] = None
     # Use Field(default_factory=...) to avoid shared mutable defaults
     suggested_skills: List[str] = Field(default_factory=list)
     improvement_recommendation: List[Dict[str, str]] = Field(default_factory=list)
     error: Optional[str] = None
+    # Which stages completed, were degraded or were skipped
+    stages: List[StageReport] = Field(default_factory=list)
+    # full, trimmed or minimal: reduced under load (see fidelity.py)
+    fidelity: Optional[str] = None
+
+class JobSubmissionResponse(BaseModel):
+    """Response model for job submission"""
+    job_id: str
+    status: str
+    status_url: str
+
+class JobStatusResponse(BaseModel):
+    """Response model for job status polling"""
+    job_id: str
+    status: str  # queued, running, done, failed
+    stage: Optional[str] = None
+    progress: float = 0.0
+    attempts: int = 0
+    max_attempts: int
+    created_at: float
+    updated_at: float
+    # Set once the job finishes; the job is purged after this time
+    expires_at: Optional[float] = None
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -78,11 +164,24 @@ async def lifespan(app: FastAPI):
     print("Configuration:")
     print(f"- Rate limit: {Config.RATE_LIMIT} requests per {Config.RATE_LIMIT_WINDOW} seconds")
     print(f"- Max file size: {Config.MAX_FILE_SIZE/1024/1024:.1f}MB")
+    print(f"- Max PDF pages: {Config.MAX_PDF_PAGES}")
     print(f"- Allowed file types: {', '.join(Config.ALLOWED_EXTENSIONS)}")
+    print(f"- In-process job workers: {Config.JOB_THREADS}")
+    print(f"- Concurrent analyses: {Config.MAX_CONCURRENT_ANALYSES or 'unlimited'} "
+          f"(queue {Config.MAX_QUEUED_ANALYSES}, max wait {Config.MAX_QUEUE_WAIT:g}s)")
     print("="*50 + "\n")
     
     try:
-        # Initialize any required resources here
+        # Start in-process job workers (a separate job_worker.py pool also works)
+        stop_job_workers = None
+        stop_compaction = []
+        if Config.JOB_THREADS > 0:
+            stop_job_workers = start_worker_threads(job_queue, Config.JOB_THREADS, jd_registry)
+        
+        # Periodically drop outdated results and shrink the result store
+        for store in (result_store, resume_store):
+            if store is not None:
+                stop_compaction.append(start_compaction(store, Config.RESULT_COMPACT_INTERVAL))
         
         # Yield control to the application
         yield
@@ -93,6 +192,10 @@ async def lifespan(app: FastAPI):
         
     finally:
         # Shutdown: Clean up resources
+        if stop_job_workers is not None:
+            stop_job_workers.set()
+        for stop in stop_compaction:
+            stop.set()
         shutdown_time = time.time()
         uptime = shutdown_time - startup_time
         print("\n" + "="*50)
@@ -130,8 +233,57 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add GZip compression for responses
-app.add_middleware(GZipMiddleware, minimum_size=1024)
+# Registered job descriptions (see jd_registry.py)
+jd_registry = JDRegistry(os.path.join(Config.DATA_DIR, "jd_registry.sqlite3"), ttl_seconds=Config.JD_TTL)
+
+# Identical /process requests in flight share one analysis (see coalesce.py)
+coalescer = Coalescer()
+
+# Picks the analysis fidelity for /process from this worker's load
+fidelity_controller = FidelityController(
+    in_flight_limits=Config.FIDELITY_IN_FLIGHT,
+    latency_limits=Config.FIDELITY_LATENCY,
+    hold_seconds=Config.FIDELITY_HOLD
+)
+
+# At most MAX_CONCURRENT_ANALYSES analyses run at once; a bounded queue waits
+admission = None
+if Config.MAX_CONCURRENT_ANALYSES > 0:
+    admission = AdmissionController(
+        limit=Config.MAX_CONCURRENT_ANALYSES,
+        max_queue=Config.MAX_QUEUED_ANALYSES,
+        max_wait=Config.MAX_QUEUE_WAIT
+    )
+
+# Finished analyses, shared by all workers and kept across restarts
+result_store = None
+if Config.RESULT_STORE_MAX_MB > 0:
+    result_store = ResultStore(
+        os.path.join(Config.DATA_DIR, "results.sqlite3"),
+        max_bytes=int(Config.RESULT_STORE_MAX_MB * 1024 * 1024)
+    )
+
+# Parses of uploaded resumes under opaque tokens issued to the uploader: later
+# requests from that client may send only resume_token instead of the file.
+# Valid until parser.PARSER_VERSION changes.
+resume_store = None
+if Config.RESUME_STORE_MAX_MB > 0:
+    resume_store = ResultStore(
+        os.path.join(Config.DATA_DIR, "resumes.sqlite3"),
+        max_bytes=int(Config.RESUME_STORE_MAX_MB * 1024 * 1024),
+        version=f"parser-{parser.PARSER_VERSION}"
+    )
+
+# Durable queue for asynchronous analysis jobs
+job_queue = JobQueue(
+    os.path.join(Config.DATA_DIR, "jobs.sqlite3"),
+    result_ttl=Config.JOB_RESULT_TTL,
+    lease_seconds=Config.JOB_LEASE,
+    max_attempts=Config.JOB_MAX_ATTEMPTS
+)
+
+# Add GZip compression for responses; large bodies are compressed in a worker thread
+app.add_middleware(OffloadedGZipMiddleware, minimum_size=1024, offload_size=Config.GZIP_OFFLOAD_SIZE)
 
 @app.get("/health", tags=["Health"])
 async def health_check():
@@ -152,6 +304,23 @@ async def health_check():
         }
     }
     
+    # Worker memory: 'shared' covers preloaded model pages (see serve.py); the
+    # spaCy vocab grows with every new token seen (see memory_stats.py)
+    try:
+        status["memory"] = process_memory()
+        status["memory"]["vocab"] = vocab_size(suggest_skills.nlp)
+    except Exception as e:
+        status["memory"] = {"error": str(e)}
+
+    # Analysis fidelity of new /process requests and the load it was chosen from
+    status["fidelity"] = fidelity_controller.snapshot()
+    if not Config.ADAPTIVE_FIDELITY:
+        status["fidelity"]["tier"] = FULL
+
+    # Concurrent analyses and queue depth (see admission.py)
+    if admission is not None:
+        status["admission"] = admission.snapshot()
+
     # Add rate limiting status
     try:
         status["rate_limiting"] = {
@@ -166,7 +335,15 @@ async def health_check():
     
     return status
 
-async def check_rate_limit(request: Request) -> None:
+@app.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """
+    Request metrics of this worker process (see metrics.py), e.g.
+    serialize_ms and response_bytes per endpoint and response mode.
+    """
+    return metrics.snapshot()
+
+async def check_rate_limit(request: HTTPConnection) -> None:
     """
     Middleware to enforce rate limiting per IP address.
     
@@ -174,7 +351,7 @@ async def check_rate_limit(request: Request) -> None:
     up to RATE_LIMIT requests per RATE_LIMIT_WINDOW seconds per IP address.
     
     Args:
-        request: The incoming HTTP request
+        request: The incoming HTTP request (or /live WebSocket)
         
     Raises:
         HTTPException: 429 if rate limit is exceeded with appropriate headers
@@ -227,6 +404,8 @@ async def check_rate_limit(request: Request) -> None:
         # Log the successful request
         request_logs[ip].append(current_time)
         
+    except HTTPException:
+        raise
     except Exception as e:
         # If rate limiting fails, log the error but don't block the request
         # This is a security measure to avoid DoS if the rate limiting fails
@@ -234,6 +413,224 @@ async def check_rate_limit(request: Request) -> None:
         import traceback
         traceback.print_exc()
 
+@asynccontextmanager
+async def admitted(endpoint: str):
+    """
+    Run the enclosed analysis in an admission slot (see admission.py).
+
+    Raises:
+        HTTPException: 503 with Retry-After if the worker is overloaded
+    """
+    if admission is None:
+        yield
+        return
+    metrics.observe("admission_queue_depth", admission.waiting, endpoint=endpoint)
+    try:
+        waited = await admission.acquire()
+    except Overloaded as e:
+        metrics.observe("admission_rejected", 1, endpoint=endpoint, reason=e.reason)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "Server busy",
+                "message": f"Too many analyses in progress. Please try again in {e.retry_after} seconds.",
+                "code": "overloaded",
+                "retry_after": e.retry_after
+            },
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    metrics.observe("admission_wait_ms", waited * 1000, endpoint=endpoint)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        admission.release(time.perf_counter() - start)
+
+@app.websocket("/live")
+async def live_rescore(websocket: WebSocket):
+    """
+    Live re-scoring session for in-popup editing (protocol in live_session.py).
+
+    The client starts with an 'init' message carrying the JD and the
+    resume_structure returned by /process, then sends edit operations and
+    receives score/skill/advice deltas. The resume is never re-uploaded or
+    re-parsed; only edited elements are re-annotated.
+
+    'init' and 'set_jd' analyze a JD, as costly as a /process call: they are
+    rate limited and admitted like one. A client that is turned away gets
+    {"type": "error", "code": "rate_limited"|"overloaded", "retry_after": s}
+    and the socket is closed; it may reconnect after retry_after seconds.
+    """
+    await websocket.accept()
+    session: Optional[LiveSession] = None
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                op = message.get("op")
+                if op != "init" and session is None:
+                    raise ValueError("Session not initialized; send an 'init' message first")
+                if op in ("init", "set_jd"):
+                    await check_rate_limit(websocket)
+                    async with admitted("live"):
+                        if op == "init":
+                            start = time.perf_counter()
+                            session = await run_in_threadpool(
+                                LiveSession, message.get("jd_text"), message.get("resume_structure")
+                            )
+                            reply = session.snapshot((time.perf_counter() - start) * 1000)
+                        else:
+                            reply = await run_in_threadpool(session.apply, message)
+                else:
+                    reply = await run_in_threadpool(session.apply, message)
+            except HTTPException as e:
+                detail = e.detail if isinstance(e.detail, dict) else {}
+                await websocket.send_json({
+                    "type": "error",
+                    "code": detail.get("code", "rate_limited"),
+                    "message": detail.get("message", "Too many requests"),
+                    "retry_after": detail.get("retry_after", 1)
+                })
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            except ValueError as e:
+                reply = {"type": "error", "message": str(e)}
+            except Exception as e:
+                print(f"Error in /live: {str(e)}")
+                traceback.print_exc()
+                reply = {"type": "error", "message": "Internal error while re-scoring"}
+            await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
+
+def get_known_resume(resume_token: Optional[str]) -> Dict[str, Any]:
+    """
+    Stored parse of a previously uploaded resume, for requests that send
+    the resume_token issued with that upload instead of the file.
+
+    Raises:
+        HTTPException: 400 without file or token, 404 (code resume_unknown)
+            if the token is not known (or expired): send the file itself
+    """
+    token = (resume_token or "").strip()
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "No file provided",
+                "message": "Please upload a valid file"
+            }
+        )
+    known = resume_store.get(("resume", token)) if resume_store is not None else None
+    metrics.observe("known_resume_hits", 1 if known is not None else 0, endpoint="process")
+    if known is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Unknown resume",
+                "code": "resume_unknown",
+                "message": "No stored parse for this resume_token. Send the resume file instead."
+            }
+        )
+    return known
+
+def remember_resume(filename: str, digest: str, payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Store the parse in an analysis payload under a new random token, issued
+    only to the client that uploaded the file (the content hash alone would
+    let anyone who knows a file's hash read its parse). Returns the token,
+    or None if the parse was incomplete or reduced and is not stored.
+    """
+    token = secrets.token_urlsafe(24)
+    stored = resume_store.put(("resume", token), {
+        "filename": filename, "sha256": digest,
+        "resume_text": payload["resume_text"], "resume_structure": payload["resume_structure"],
+        "stages": [s for s in payload.get("stages") or [] if s["name"] == "parse"],
+        "fidelity": payload.get("fidelity") or FULL,
+    })
+    return token if stored else None
+
+def get_jd_profile(jd_id: str):
+    """
+    Look up a registered JD, failing fast with a clear error.
+
+    Raises:
+        HTTPException: 404 for unknown ids, 410 for expired ones
+    """
+    try:
+        return jd_registry.get(jd_id)
+    except ExpiredJDError:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={
+                "error": "Expired jd_id",
+                "message": f"jd_id '{jd_id}' has expired. Register the job description again via /jd."
+            }
+        )
+    except UnknownJDError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Unknown jd_id",
+                "message": f"jd_id '{jd_id}' is not registered. Register the job description via /jd."
+            }
+        )
+
+@app.post(
+    "/jd",
+    response_model=JDRegistrationResponse,
+    summary="Register a job description for reuse",
+    tags=["Analysis"]
+)
+async def register_jd(
+    jd_text: str = Form(..., description="Job description text to analyze once"),
+    request: Request = None
+) -> JDRegistrationResponse:
+    """
+    Analyze a job description once (skills, required years) and return
+    a jd_id that /process accepts in place of jd_text until it expires.
+    Registering the same JD again returns the same jd_id with a renewed expiry.
+    """
+    if request:
+        await check_rate_limit(request)
+    try:
+        async with admitted("jd"):
+            profile = await run_in_threadpool(jd_registry.register, jd_text)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "Invalid job description", "message": str(e)}
+        )
+    return JDRegistrationResponse(
+        jd_id=profile.jd_id,
+        expires_at=profile.expires_at,
+        ttl_seconds=Config.JD_TTL,
+        skills=sorted(profile.skills),
+        required_years=profile.required_years
+    )
+
+def validate_engine(engine: Optional[str]) -> str:
+    """
+    Normalize the requested scoring engine.
+
+    Raises:
+        HTTPException: 400 if the engine is not supported
+    """
+    engine = (engine or Config.DEFAULT_ENGINE).strip().lower()
+    if engine not in Config.ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid engine",
+                "message": f"Engine '{engine}' not supported. "
+                          f"Allowed engines: {', '.join(sorted(Config.ENGINES))}"
+            }
+        )
+    return engine
+
 @app.post("/debug-jd")
 async def debug_jd(request: Request):
     data = await request.json()
@@ -243,7 +640,8 @@ async def debug_jd(request: Request):
 
 async def validate_file(file: UploadFile) -> UploadFile:
     """
-    Validate the uploaded file for type, size, and page count.
+    Validate the uploaded file for type, size, and content (page count,
+    encryption, text layer; see triage.py).
     
     Args:
         file: The uploaded file to validate
@@ -317,28 +715,21 @@ async def validate_file(file: UploadFile) -> UploadFile:
                 }
             )
         
-        # Check page count for PDF files
-        if file_extension == 'pdf':
-            try:
-                from PyPDF2 import PdfReader
-                
-                # Combine chunks into a single bytes object
-                file_content = b''.join(chunks)
-                pdf_reader = PdfReader(io.BytesIO(file_content))
-                
-                if len(pdf_reader.pages) > 2:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail={
-                            "error": "Resume too long",
-                            "message": "Current version of this app is not designed to handle resumes longer than 2 pages"
-                        }
-                    )
-            except Exception as e:
-                if isinstance(e, HTTPException):
-                    raise e
-                # If we can't read the PDF, we'll let the parser handle that error
-                print(f"Warning: Could not validate PDF pages: {str(e)}")
+        # Triage: reject encrypted, scanned, over-long or broken documents from
+        # their metadata and first page, before any full parse (triage.py)
+        with metrics.timed("triage_ms", kind=file_extension):
+            triage = await run_in_threadpool(triage_document, file.filename, b''.join(chunks))
+        try:
+            check_triage(triage, max_pages=Config.MAX_PDF_PAGES)
+        except TriageError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "error": e.title,
+                    "code": e.code,
+                    "message": str(e)
+                }
+            )
         
         # Reset file pointer for further processing
         file.file = io.BytesIO(b''.join(chunks))
@@ -355,34 +746,73 @@ async def validate_file(file: UploadFile) -> UploadFile:
             }
         )
 
+def parse_projection(fields: Optional[str], compact: bool) -> tuple:
+    """
+    Validate the fields/compact parameters.
+
+    Returns:
+        tuple: (selection or None for the full response, mode label for metrics)
+
+    Raises:
+        HTTPException: 400 if a field name is unknown
+    """
+    try:
+        selection = selected_fields(parse_fields(fields), compact)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "Invalid fields", "message": str(e)}
+        )
+    mode = "full" if selection is None else ("fields" if fields and fields.strip() else "compact")
+    return selection, mode
+
+def render_analysis(payload: Dict[str, Any], selection, mode: str, endpoint: str,
+                    request: Optional[Request] = None) -> Response:
+    """
+    Encode an analysis payload as JSON or MessagePack (negotiated from the
+    Accept header, see encoding.py). The full response is an AnalysisResponse
+    built without re-validating the pipeline's output; projected responses
+    are plain dicts. Serialization time and body size are recorded in /metrics.
+    """
+    content = AnalysisResponse.construct(**payload) if selection is None else project(payload, selection)
+    accept = request.headers.get("accept", "") if request is not None else ""
+    body, media_type = encode_timed(content, negotiate(accept), endpoint, mode)
+    return Response(content=body, media_type=media_type)
+
 @app.post(
     "/process",
     response_model=AnalysisResponse,
     summary="Analyze resume with optional job description",
-    description="""
-    Processes an uploaded resume (max 2 pages) and optionally compares it against a job description
+    description=f"""
+    Processes an uploaded resume (max {Config.MAX_PDF_PAGES} pages) and optionally compares it against a job description
     to provide ATS optimization feedback, skill gap analysis, and improvement suggestions.
     
-    Note: The current version of this app only supports resumes that are 2 pages or less.
-    Uploading a longer resume will result in an error.
+    Note: Resumes longer than {Config.MAX_PDF_PAGES} pages are rejected; long PDFs are
+    parsed page-parallel.
     """,
     responses={
-        200: {"model": AnalysisResponse, "description": "Analysis completed successfully"},
+        200: {
+            "model": AnalysisResponse,
+            "description": "Analysis completed successfully (JSON, or MessagePack with Accept: application/msgpack)",
+            "content": {"application/msgpack": {}}
+        },
         400: {
             "description": "Invalid input, file format, or resume too long",
             "content": {
                 "application/json": {
                     "example": {
                         "error": "Resume too long",
-                        "message": "Current version of this app is not designed to handle resumes longer than 2 pages"
+                        "message": f"Resumes longer than {Config.MAX_PDF_PAGES} pages are not supported"
                     }
                 }
             }
         },
+        404: {"description": "Unknown jd_id, or resume_token without a stored parse (code 'resume_unknown')"},
         413: {"description": "File too large (max 5MB)"},
         422: {"description": "Validation error"},
         429: {"description": "Rate limit exceeded"},
-        500: {"description": "Internal server error"}
+        500: {"description": "Internal server error"},
+        503: {"description": "Too many analyses in progress (code 'overloaded'); retry after Retry-After seconds"}
     },
     tags=["Analysis"]
 )
@@ -391,7 +821,30 @@ async def process_resume_and_jd(
         None,
         description="Optional job description text to compare against the resume"
     ),
-    resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    resume: Optional[UploadFile] = File(
+        None,
+        description="Resume file (PDF or DOCX); may be left out when resume_token is sent"
+    ),
+    jd_id: Optional[str] = Form(
+        None,
+        description="jd_id from /jd, used instead of jd_text"
+    ),
+    resume_token: Optional[str] = Form(
+        None,
+        description="X-Resume-Token of an earlier response that uploaded the file, sent instead of the file; 404 with code 'resume_unknown' means the file must be sent"
+    ),
+    engine: str = Form(
+        Config.DEFAULT_ENGINE,
+        description="Scoring engine: 'full' (spaCy + SkillNER) or 'lite' (model-free, for live feedback)"
+    ),
+    fields: Optional[str] = Form(
+        None,
+        description="Comma-separated response fields to return, e.g. 'ats_score,suggested_skills'"
+    ),
+    compact: bool = Form(
+        False,
+        description="Leave out the echoed jd_text, resume_text and resume_structure; return structure_summary instead"
+    ),
     request: Request = None
 ) -> AnalysisResponse:
     """
@@ -404,85 +857,130 @@ async def process_resume_and_jd(
     - Provides specific improvement recommendations
     
     The response includes structured data that can be used to display
-    the analysis results to the user.
+    the analysis results to the user. Use `fields` or `compact` to leave out
+    the echoed inputs (see projection.py).
+    
+    Responses to an upload carry an `X-Resume-Token` header. The same client
+    can send `resume_token` instead of the file later: the upload, validation
+    and parsing are skipped, and the resume text and structure are not echoed.
+    If the token is unknown or expired, the server answers 404 with code
+    'resume_unknown' and the client sends the file.
     """
-    start_time = time.time()
-    timeout_seconds = Config.TIMEOUT
+    deadline = Deadline(Config.TIMEOUT)
     
     try:
         # Rate limiting check
         if request:
             await check_rate_limit(request)
+
+        engine = validate_engine(engine)
+        selection, mode = parse_projection(fields, compact)
+
+        # Resolve a registered JD before touching the upload, so bad ids fail fast
+        jd_profile = None
+        if jd_id:
+            jd_profile = await run_in_threadpool(get_jd_profile, jd_id.strip())
+            jd_text = jd_profile.jd_text
             
-        # Validate the uploaded file
-        await validate_file(resume)
+        # Token-first upload: a known resume is neither sent, validated nor parsed again
+        known = None
+        if resume is None:
+            known = get_known_resume(resume_token)
+            filename, digest = known["filename"], known["sha256"]
+            # The stored resume is not echoed: the token only grants its analysis
+            selection = without_resume(selection)
+        else:
+            # Validate the uploaded file
+            await validate_file(resume)
+            file_bytes = resume.file.getvalue()
+            filename, digest = resume.filename, content_hash(file_bytes)
         
-        # Parse the resume
-        try:
-            resume_text, resume_structure = parser.parse_resume(resume)
-        except Exception as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Error parsing resume: {str(e)}"
-            )
+        async def run_analysis() -> Dict[str, Any]:
+            # Overload fails fast with 503 instead of slowing every analysis down
+            async with admitted("process"):
+                with fidelity_controller.track():
+                    return await _run_analysis()
         
-        # Check for timeout before analysis
-        if time.time() - start_time > timeout_seconds - 3:
-            raise HTTPException(
-                status_code=408,
-                detail="Request timed out during resume parsing."
+        async def _run_analysis() -> Dict[str, Any]:
+            stages = []
+            if known is not None:
+                resume_text, resume_structure = known["resume_text"], known["resume_structure"]
+                stages.append({"name": "parse", "status": COMPLETED, "elapsed_ms": 0.0,
+                               "detail": "Stored parse of resume_token"})
+            else:
+                # Parse the resume; a PDF that runs out of time yields the pages parsed so far
+                try:
+                    resume_text, resume_structure = await run_in_threadpool(
+                        parse, filename, file_bytes, stages,
+                        deadline=deadline, budget=Config.STAGE_BUDGETS.get("parse"),
+                        fidelity=tier
+                    )
+                except DeadlineExceeded:
+                    raise HTTPException(
+                        status_code=408,
+                        detail="Request timed out during resume parsing. Submit large resumes via /jobs instead."
+                    )
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Error parsing resume: {str(e)}"
+                    )
+            
+            # Analysis runs only if a job description is provided (pipeline.analyze).
+            # Each stage gets its own budget; a stage that runs out of time is
+            # reported as degraded or skipped in `stages` rather than scored as zero.
+            result = await run_in_threadpool(
+                analyze,
+                resume_text, resume_structure, jd_text,
+                engine=engine,
+                jd_profile=jd_profile,
+                deadline=deadline,
+                budgets=Config.STAGE_BUDGETS,
+                stages=stages,
+                fidelity=tier
             )
+            payload = dict(success=True, jd_text=jd_text, resume_text=resume_text,
+                           resume_structure=resume_structure, **result)
+            if result_store is not None:
+                # Only complete, full-fidelity analyses are kept (ResultStore.put)
+                await run_in_threadpool(result_store.put, key, payload)
+            return payload
         
-        # Initialize default values
-        ats_score = 0.0
-        suggested_skills = []
-        issues = []
+        key = analysis_key(filename, digest, jd_text, engine)
         
-        # Only perform analysis if job description is provided
-        if jd_text and jd_text.strip():
-            try:
-                print("Starting analysis...")
-
-                # Check for timeout before each operation
-                if time.time() - start_time > timeout_seconds - 10:
-                    print("Timeout approaching, skipping detailed analysis")
-                    raise TimeoutError("Analysis timeout")
-
-                print("Extracting missing skills...")
-                suggested_skills = get_missing_skills(jd_text, resume_text)
-
-                if time.time() - start_time > timeout_seconds - 8:
-                    print("Timeout approaching, skipping ATS calculation")
-                    raise TimeoutError("Analysis timeout")
-
-                print("Calculating ATS score...")
-                ats = ATSCalculator(jd_text)
-                ats_score = ats.total_score(resume_text, resume_structure)
-
-                if time.time() - start_time > timeout_seconds - 5:
-                    print("Timeout approaching, skipping structure analysis")
-                    raise TimeoutError("Analysis timeout")
-
-                print("Analyzing resume structure...")
-                issues = analyze_resume_structure(resume_text, resume_structure)
-
-                print("Analysis completed successfully")
-
-            except Exception as e:
-                # Log the error but don't fail the entire request
-                print(f"Warning: Analysis error: {str(e)}")
-                traceback.print_exc()
-                # Continue with default values
-        # Build response
-        return AnalysisResponse(
-            success=True,
-            jd_text=jd_text,
-            resume_text=resume_text,
-            resume_structure=resume_structure,
-            ats_score=ats_score,
-            suggested_skills=suggested_skills,
-            improvement_recommendation=issues
-        )
+        # Analyses finished earlier (by any worker, before a restart) are returned as stored
+        stored = None
+        if result_store is not None:
+            with metrics.timed("result_store_ms", op="get"):
+                stored = result_store.get(key)
+            metrics.observe("result_store_hits", 1 if stored is not None else 0, endpoint="process")
+        
+        if stored is not None:
+            payload, shared = stored, False
+            payload["jd_text"] = jd_text  # same JD after normalization; echo this request's text
+        else:
+            # Under load, new analyses run at reduced fidelity (see fidelity.py)
+            tier = fidelity_controller.tier() if Config.ADAPTIVE_FIDELITY else FULL
+            # Identical requests in flight (retries, double clicks) share one run
+            payload, shared = await coalescer.run(key + (tier,), run_analysis)
+            if shared:
+                metrics.observe("coalesced_requests", 1, endpoint="process")
+        metrics.observe("fidelity_responses", 1, endpoint="process", tier=payload.get("fidelity") or FULL)
+        
+        # Uploads get a token for this client's later requests (complete, full-fidelity parses only)
+        resume_token = None
+        if known is None and resume_store is not None:
+            resume_token = await run_in_threadpool(remember_resume, filename, digest, payload)
+        
+        # Build response (structure is converted to dicts only if returned)
+        response = render_analysis(payload, selection, mode, endpoint="process", request=request)
+        if resume_token is not None:
+            response.headers["X-Resume-Token"] = resume_token
+        if stored is not None:
+            response.headers["X-Result-Store"] = "hit"
+        if shared:
+            response.headers["X-Coalesced"] = "true"
+        return response
     except HTTPException as he:
         # Re-raise HTTP exceptions (like rate limiting, timeouts)
         raise he
@@ -497,8 +995,123 @@ async def process_resume_and_jd(
         )
     finally:
         # Cleanup: close the uploaded file
-        if 'resume' in locals():
+        if resume is not None:
             try:
                 await resume.close()
             except:
                 pass
+
+@app.post(
+    "/jobs",
+    response_model=JobSubmissionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a resume analysis job",
+    tags=["Jobs"]
+)
+async def submit_job(
+    jd_text: Optional[str] = Form(
+        None,
+        description="Optional job description text to compare against the resume"
+    ),
+    resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    jd_id: Optional[str] = Form(
+        None,
+        description="jd_id from /jd, used instead of jd_text"
+    ),
+    engine: str = Form(
+        Config.DEFAULT_ENGINE,
+        description="Scoring engine: 'full' (spaCy + SkillNER) or 'lite' (model-free)"
+    ),
+    callback_url: Optional[str] = Form(
+        None,
+        description="Optional URL that receives a JSON POST {job_id, status, error} when the job finishes"
+    ),
+    request: Request = None
+) -> JobSubmissionResponse:
+    """
+    Asynchronous variant of /process for large or slow resumes.
+
+    Input is validated exactly as in /process, then the job is stored in a
+    durable local queue and analyzed by a background worker with no request
+    timeout, so no stage is skipped. Poll GET /jobs/{job_id} for status,
+    progress and the result (same shape as the /process response), or pass a
+    callback_url to be notified when it finishes.
+    """
+    try:
+        if request:
+            await check_rate_limit(request)
+
+        engine = validate_engine(engine)
+
+        if callback_url:
+            # Public http(s) hosts only: the worker must not be aimed at internal services
+            try:
+                await run_in_threadpool(check_callback_url, callback_url)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "error": "Invalid callback_url",
+                        "message": str(e)
+                    }
+                )
+
+        if jd_id:
+            jd_id = jd_id.strip()
+            jd_text = (await run_in_threadpool(get_jd_profile, jd_id)).jd_text
+
+        await validate_file(resume)
+
+        job_id = await run_in_threadpool(
+            job_queue.submit,
+            resume.filename,
+            resume.file.getvalue(),
+            jd_text=jd_text,
+            jd_id=jd_id,
+            engine=engine,
+            callback_url=callback_url
+        )
+        return JobSubmissionResponse(job_id=job_id, status="queued", status_url=f"/jobs/{job_id}")
+    finally:
+        try:
+            await resume.close()
+        except:
+            pass
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get the status and result of an analysis job",
+    tags=["Jobs"]
+)
+async def get_job(
+    job_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated result fields to return"),
+    compact: bool = Query(False, description="Leave out the echoed inputs from the result"),
+    request: Request = None
+) -> JobStatusResponse:
+    """
+    Return a job's status and progress; 'result' is set once it is done.
+    `fields` and `compact` project the result as for /process, and the
+    response is JSON or MessagePack as negotiated from the Accept header.
+
+    Raises:
+        HTTPException: 404 if the job is unknown or its result has expired
+        HTTPException: 400 if a field name is unknown
+    """
+    selection, mode = parse_projection(fields, compact)
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Unknown job",
+                "message": f"Job '{job_id}' does not exist or its result has expired"
+            }
+        )
+    job = {name: job[name] for name in JobStatusResponse.__fields__ if name in job}
+    if selection is not None and job.get("result"):
+        job["result"] = project(job["result"], selection)
+    accept = request.headers.get("accept", "") if request is not None else ""
+    body, media_type = encode_timed(JobStatusResponse.construct(**job), negotiate(accept), "jobs", mode)
+    return Response(content=body, media_type=media_type)
@@ -0,0 +1,153 @@
+"""
+memory_stats.py
+Per-process memory accounting used by the preforking server (serve.py) and
+the /health endpoint.
+
+On Linux the numbers come from /proc/<pid>/smaps_rollup (or smaps), which
+splits resident memory into pages shared with other processes and pages that
+are private to the process. With preload-then-fork the model and matcher
+pages should show up as shared; only per-request garbage should be unique.
+
+Long-running workers also grow through spaCy's vocab: every new token of an
+uploaded resume or JD is interned into nlp.vocab.strings (and a lexeme) for
+the life of the process. Two controls keep that bounded:
+
+- vocab_scope(nlp): releases what a block interned, via spaCy memory zones
+  (spaCy >= 3.8; a no-op on older versions). Single-threaded workers only.
+- RecyclePolicy: tells a worker to exit gracefully after a number of
+  requests or once its unique memory or StringStore passes a limit; the
+  master (serve.py, job_worker.py) forks a fresh one from the preloaded
+  parent, which takes milliseconds.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# smaps field -> report key (values in kB in /proc, reported here in bytes)
+_SMAPS_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+    "Swap": "swap",
+}
+
+
+def _read_smaps(pid: int) -> Optional[Dict[str, int]]:
+    totals = {key: 0 for key in _SMAPS_FIELDS.values()}
+    for name in ("smaps_rollup", "smaps"):
+        path = f"/proc/{pid}/{name}"
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    field, _, rest = line.partition(":")
+                    key = _SMAPS_FIELDS.get(field)
+                    if key and rest.strip().endswith("kB"):
+                        totals[key] += int(rest.split()[0]) * 1024
+            return totals
+        except (FileNotFoundError, PermissionError):
+            continue
+    return None
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Memory breakdown for one process, in bytes:
+        rss, pss, shared (clean + dirty), unique (private clean + dirty), swap
+    Falls back to peak RSS from getrusage where /proc is unavailable.
+    """
+    pid = pid or os.getpid()
+    smaps = _read_smaps(pid)
+    if smaps is not None:
+        return {
+            "rss": smaps["rss"],
+            "pss": smaps["pss"],
+            "shared": smaps["shared_clean"] + smaps["shared_dirty"],
+            "unique": smaps["private_clean"] + smaps["private_dirty"],
+            "swap": smaps["swap"],
+        }
+
+    import resource
+    import sys
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kB elsewhere
+    rss = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return {"rss": rss, "pss": rss, "shared": 0, "unique": rss, "swap": 0}
+
+
+def format_memory_report(pids: List[int]) -> str:
+    """Table of unique vs shared memory per process (MB)."""
+    mb = 1024 * 1024
+    lines = [f"{'pid':>8} {'rss':>9} {'pss':>9} {'shared':>9} {'unique':>9}"]
+    total_unique = total_pss = 0
+    for pid in pids:
+        try:
+            m = process_memory(pid)
+        except Exception:
+            continue
+        total_unique += m["unique"]
+        total_pss += m["pss"]
+        lines.append(
+            f"{pid:>8} {m['rss'] / mb:8.1f}M {m['pss'] / mb:8.1f}M "
+            f"{m['shared'] / mb:8.1f}M {m['unique'] / mb:8.1f}M"
+        )
+    lines.append(f"{'total':>8} {'':>9} {total_pss / mb:8.1f}M {'':>9} {total_unique / mb:8.1f}M")
+    return "\n".join(lines)
+
+
+def vocab_size(nlp) -> Dict[str, int]:
+    """Entries in the spaCy StringStore and lexeme table."""
+    return {"strings": len(nlp.vocab.strings), "lexemes": len(nlp.vocab)}
+
+
+@contextmanager
+def vocab_scope(nlp) -> Iterator[None]:
+    """
+    Release strings and lexemes interned inside the block (spaCy memory
+    zones). Docs created inside must not be used afterwards, and no other
+    thread may run the pipeline meanwhile: use it only where one job runs
+    at a time per process. Without memory zones (spaCy < 3.8) recycling is
+    the only bound.
+    """
+    memory_zone = getattr(nlp, "memory_zone", None)
+    if memory_zone is None:
+        yield
+        return
+    with memory_zone():
+        yield
+
+
+class RecyclePolicy:
+    """
+    When a long-running worker should be replaced. Limits of 0 are off:
+
+        max_requests       requests (or jobs) handled
+        max_unique_mb      private memory; RSS would count the shared model pages
+        max_vocab_strings  StringStore entries
+    """
+
+    def __init__(self, max_requests: int = 0, max_unique_mb: float = 0, max_vocab_strings: int = 0):
+        self.max_requests = max_requests
+        self.max_unique_mb = max_unique_mb
+        self.max_vocab_strings = max_vocab_strings
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_requests or self.max_unique_mb or self.max_vocab_strings)
+
+    def check(self, requests: int = 0, nlp=None) -> Optional[str]:
+        """Reason to recycle now, or None."""
+        if self.max_requests and requests >= self.max_requests:
+            return f"{requests} requests handled (limit {self.max_requests})"
+        if self.max_unique_mb:
+            unique_mb = process_memory()["unique"] / (1024 * 1024)
+            if unique_mb >= self.max_unique_mb:
+                return f"unique memory {unique_mb:.0f}MB (limit {self.max_unique_mb:.0f}MB)"
+        if self.max_vocab_strings and nlp is not None:
+            strings = len(nlp.vocab.strings)
+            if strings >= self.max_vocab_strings:
+                return f"{strings} vocab strings (limit {self.max_vocab_strings})"
+        return None
@@ -0,0 +1,97 @@
+"""
+metrics.py
+In-process request metrics, exposed by GET /metrics.
+
+Timings and sizes are kept per metric name as a running count/total plus a
+bounded window of recent samples for percentiles. Each HTTP worker process
+keeps its own numbers (serve.py forks several), so /metrics describes the
+worker that answered.
+
+Usage:
+    >>> with timed("serialize_ms", mode="compact"):
+    ...     body = json.dumps(payload)
+    >>> observe("response_bytes", len(body), mode="compact")
+    >>> snapshot()["serialize_ms{mode=compact}"]["p95"]
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict
+
+WINDOW = 1024  # recent samples kept per metric for percentiles
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=WINDOW)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else 0.0
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "max": round(self.max, 3),
+        }
+
+
+_lock = threading.Lock()
+_series: Dict[str, _Series] = {}
+_started = time.time()
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={labels[k]}" for k in sorted(labels)) + "}"
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """Record one sample (e.g. a duration in ms or a size in bytes)."""
+    key = _key(name, labels)
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = _Series()
+        series.add(float(value))
+
+
+@contextmanager
+def timed(name: str, **labels: Any):
+    """Record the wall time of the enclosed block in milliseconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - start) * 1000, **labels)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Summary of every metric recorded by this process."""
+    with _lock:
+        metrics = {key: series.summary() for key, series in sorted(_series.items())}
+    return {"uptime_seconds": round(time.time() - _started, 1), "metrics": metrics}
+
+
+def reset() -> None:
+    """Drop all recorded samples (tests)."""
+    with _lock:
+        _series.clear()
@@ -5,12 +5,25 @@ Handles:
 2. Parsing resumes (PDF/DOCX) to get text and structure.
 """
 
+import hashlib
+import multiprocessing
+import os
 import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
 import pdfplumber
-import docx
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
+from pdfminer.pdftypes import PDFObjRef, PDFStream
 from fastapi import UploadFile
 
+from deadline import DeadlineExceeded, check_deadline, current_deadline
+from resume_structure import ResumeStructure
+
 
 def _normalize(text: str) -> str:
     """Lowercase and collapse whitespace."""
@@ -34,12 +47,273 @@ def extract_jd_from_text(jd_text: str) -> str:
 # 2. RESUME PARSING
 # -------------------------
 
-def parse_pdf_resume(file_bytes: bytes) -> tuple:
+# Bump when the text or structure produced for the same file changes: shared
+# analysis results are keyed by it (coalesce.analysis_key)
+PARSER_VERSION = "2"
+
+# Page-parallel PDF parsing (long CVs): pages missing from the page cache are
+# split into contiguous ranges and extracted in worker processes
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+PDF_PARALLEL_MIN_PAGES = 4  # fewer uncached pages are parsed inline
+PDF_PAGE_CACHE_SIZE = 256  # parsed pages kept, keyed by page content hash
+
+_pdf_page_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_pdf_page_lock = threading.Lock()
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _parse_pdf_page(page, page_num: int, checkpoint=None, tables: bool = True) -> tuple:
+    """
+    Extract one page: text lines with font sizes, tables (unless `tables` is
+    False) and images.
+
+    Returns:
+        tuple: (page_text: str, structure: ResumeStructure) -- page_text is the
+        page's share of the resume text, including table and image markers
+    """
+    text = ""
+    structure = ResumeStructure()
+    
+    # Get character-level data for font size analysis
+    chars = page.chars if hasattr(page, 'chars') else []
+    
+    # 1. Extract text with font information
+    if hasattr(page, 'extract_text'):
+        page_text = page.extract_text()
+        if page_text:
+            lines = page_text.split("\n")
+            current_line = ""
+            current_fonts = []
+            
+            # Group characters by line and collect font information
+            for char in chars:
+                if char.get('text') == '\n':
+                    if current_line.strip():
+                        # Calculate average font size for the line
+                        avg_size = round(sum(f['size'] for f in current_fonts) / len(current_fonts), 1) if current_fonts else 0
+                        line_type = "text"
+                        
+                        # Determine line type
+                        line_stripped = current_line.strip()
+                        if line_stripped.endswith(":") or line_stripped.isupper():
+                            line_type = "heading"
+                        elif line_stripped.startswith(("•", "-", "*")):
+                            line_type = "bullet"
+                        
+                        structure.append({
+                            "type": line_type,
+                            "content": current_line,
+                            "font_size": avg_size,
+                            "page": page_num
+                        })
+                        
+                    current_line = ""
+                    current_fonts = []
+                else:
+                    current_line += char.get('text', '')
+                    current_fonts.append({
+                        'size': char.get('size', 0),
+                        'fontname': char.get('fontname', '')
+                    })
+            
+            text += page_text + "\n"
+    
+    # 2. Extract tables (the slowest step per page). The default table settings
+    # find tables from ruling lines, so a page without any edges has none.
+    if checkpoint is not None:
+        checkpoint()
+    try:
+        found = page.extract_tables() if tables and hasattr(page, 'extract_tables') and page.edges else []
+        if found:
+            for table_num, table in enumerate(found, 1):
+                if table and any(any(cell for cell in row if cell) for row in table):
+                    table_text = "\n".join(" | ".join(str(cell or "").strip() for cell in row) for row in table)
+                    structure.append({
+                        "type": "table",
+                        "content": table_text,
+                        "page": page_num,
+                        "table_num": table_num
+                    })
+                    text += f"\n[Table {table_num} on page {page_num}]\n{table_text}\n"
+    except Exception as e:
+        print(f"Warning: Error extracting tables from page {page_num}: {str(e)}")
+    
+    # 3. Check for images
+    try:
+        if hasattr(page, 'images') and page.images:
+            for img_num, img in enumerate(page.images, 1):
+                structure.append({
+                    "type": "image",
+                    "page": page_num,
+                    "image_num": img_num,
+                    "bbox": img.get("bbox", []),
+                    "width": img.get("width", 0),
+                    "height": img.get("height", 0)
+                })
+                text += f"\n[Image {img_num} on page {page_num}]\n"
+    except Exception as e:
+        print(f"Warning: Error processing images on page {page_num}: {str(e)}")
+    
+    return text, structure
+
+
+def _parse_pdf_pages(file_bytes: bytes, page_numbers: list, tables: bool = True) -> list:
+    """Worker process entry point: parse the given 1-based pages of a PDF."""
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        return [_parse_pdf_page(pdf.pages[n - 1], n, tables=tables) for n in page_numbers]
+
+
+def _hash_pdf_object(obj, digest, seen: set) -> None:
+    """Feed a PDF object into `digest`, resolving references and streams recursively."""
+    if isinstance(obj, PDFObjRef):
+        if obj.objid in seen:
+            digest.update(b"<cycle>")
+            return
+        seen.add(obj.objid)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        digest.update(b"<stream>")
+        _hash_pdf_object(obj.attrs, digest, seen)
+        digest.update(obj.get_rawdata() or obj.get_data())
+    elif isinstance(obj, dict):
+        digest.update(b"<dict>")
+        for name in sorted(obj, key=str):
+            digest.update(str(name).encode() + b"=")
+            _hash_pdf_object(obj[name], digest, seen)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"<list>")
+        for item in obj:
+            _hash_pdf_object(item, digest, seen)
+    else:
+        digest.update(repr(obj).encode() + b";")
+
+
+def _pdf_page_key(page) -> str:
+    """
+    Content hash of a page, or None if it cannot be read: page box, rotation,
+    content streams and the resources they use (fonts with their ToUnicode
+    maps, form XObjects, ...), resolved recursively. Identical pages across
+    uploads share a key; the text of a page depends on nothing else.
+    """
+    try:
+        digest = hashlib.sha256(repr((page.bbox, page.rotation)).encode())
+        seen = set()
+        _hash_pdf_object(page.page_obj.contents or [], digest, seen)
+        _hash_pdf_object(page.page_obj.resources or {}, digest, seen)
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+# Table and image markers in page text; cached pages are stored without page numbers
+_PAGE_MARKER = re.compile(r"(\[(?:Table|Image) \d+ on page )\d+(\])")
+
+
+def _on_page(result: tuple, page_num: int) -> tuple:
+    """A parsed page (text, structure) relabelled as page `page_num` (0: no page)."""
+    text, structure = result
+    text = _PAGE_MARKER.sub(lambda m: f"{m.group(1)}{page_num}{m.group(2)}", text)
+    return text, ResumeStructure({**element, "page": page_num} for element in structure)
+
+
+def _pdf_cached_page(key: str, page_num: int):
+    if key is None:
+        return None
+    with _pdf_page_lock:
+        result = _pdf_page_cache.get(key)
+        if result is not None:
+            _pdf_page_cache.move_to_end(key)
+    return _on_page(result, page_num) if result is not None else None
+
+
+def _pdf_cache_page(key: str, result: tuple) -> None:
+    if key is None:
+        return
+    result = _on_page(result, 0)  # the same page may come back at another position
+    with _pdf_page_lock:
+        _pdf_page_cache[key] = result
+        if len(_pdf_page_cache) > PDF_PAGE_CACHE_SIZE:
+            _pdf_page_cache.popitem(last=False)
+
+
+def _pdf_worker_pool():
+    """Shared process pool for page extraction, started on first use."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            # Not fork: the API process runs threads (and may hold the models)
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=context)
+        return _pdf_pool
+
+
+def _reset_pdf_worker_pool() -> None:
+    """Drop a broken pool; the next parallel parse starts a new one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        _pdf_pool = None
+
+
+def _merge_pdf_pages(results: dict, page_count: int, prefix_only: bool = False) -> tuple:
+    """Join per-page results in page order; prefix_only stops at the first missing page."""
+    text = ""
+    structure = ResumeStructure()
+    for page_num in range(1, page_count + 1):
+        if page_num not in results:
+            if prefix_only:
+                break
+            continue
+        page_text, page_structure = results[page_num]
+        text += page_text
+        structure.extend(page_structure)
+    return text.strip(), structure
+
+
+def _parse_pdf_pages_parallel(file_bytes: bytes, page_numbers: list, keys: dict,
+                              results: dict, page_count: int, tables: bool = True) -> None:
+    """
+    Extract `page_numbers` in the worker pool, one contiguous range per
+    worker, adding them to `results` (and the page cache) as ranges finish.
+    """
+    deadline = current_deadline()
+    size = -(-len(page_numbers) // PDF_WORKERS)
+    pool = _pdf_worker_pool()
+    futures = {
+        pool.submit(_parse_pdf_pages, file_bytes, page_numbers[i:i + size], tables): page_numbers[i:i + size]
+        for i in range(0, len(page_numbers), size)
+    }
+    try:
+        for future in as_completed(futures, timeout=None if deadline.at is None else deadline.remaining()):
+            for page_num, result in zip(futures[future], future.result()):
+                results[page_num] = result
+                _pdf_cache_page(keys[page_num], result)
+            if deadline.expired():
+                deadline.check("parse", partial=_merge_pdf_pages(results, page_count, prefix_only=True))
+    except DeadlineExceeded:
+        for future in futures:
+            future.cancel()
+        raise
+    except FutureTimeoutError:
+        for future in futures:
+            future.cancel()
+        text, structure = _merge_pdf_pages(results, page_count, prefix_only=True)
+        raise DeadlineExceeded("parse", (text, structure) if structure else None)
+
+
+def parse_pdf_resume(file_bytes: bytes, parallel: bool = True, tables: bool = True) -> tuple:
     """
     Extract text and structure from a PDF resume, including detection of tables, images, and font sizes.
     
+    Pages are looked up in a cache keyed by page content hash first. With
+    `parallel`, PDF_PARALLEL_MIN_PAGES or more uncached pages are extracted
+    in worker processes (PDF_WORKERS); fewer are parsed inline. Per-page
+    results are merged in page order either way. tables=False skips table
+    extraction (reduced fidelity under load, see fidelity.py).
+    
     Returns:
-        tuple: (text: str, structure: list) where structure contains elements with types:
+        tuple: (text: str, structure: ResumeStructure) where structure contains elements with types:
             - 'heading': Section headings with font size
             - 'bullet': Bullet points with font size
             - 'table': Extracted tables
@@ -48,144 +322,348 @@ def parse_pdf_resume(file_bytes: bytes) -> tuple:
     
     Raises:
         ValueError: If the PDF cannot be processed
+        DeadlineExceeded: If the current deadline (deadline.py) passes; carries
+            the leading pages parsed so far as `partial`, if any
     """
-    text = ""
-    structure = []
+    results = {}  # page number -> (page_text, ResumeStructure)
     
     try:
         with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+            page_count = len(pdf.pages)
+            keys = {}
             for page_num, page in enumerate(pdf.pages, 1):
-                # Get character-level data for font size analysis
-                chars = page.chars if hasattr(page, 'chars') else []
-                
-                # 1. Extract text with font information
-                if hasattr(page, 'extract_text'):
-                    page_text = page.extract_text()
-                    if page_text:
-                        lines = page_text.split("\n")
-                        current_line = ""
-                        current_fonts = []
-                        
-                        # Group characters by line and collect font information
-                        for char in chars:
-                            if char.get('text') == '\n':
-                                if current_line.strip():
-                                    # Calculate average font size for the line
-                                    avg_size = round(sum(f['size'] for f in current_fonts) / len(current_fonts), 1) if current_fonts else 0
-                                    line_type = "text"
-                                    
-                                    # Determine line type
-                                    line_stripped = current_line.strip()
-                                    if line_stripped.endswith(":") or line_stripped.isupper():
-                                        line_type = "heading"
-                                    elif line_stripped.startswith(("•", "-", "*")):
-                                        line_type = "bullet"
-                                    
-                                    structure.append({
-                                        "type": line_type,
-                                        "content": current_line,
-                                        "font_size": avg_size,
-                                        "page": page_num
-                                    })
-                                    
-                                current_line = ""
-                                current_fonts = []
-                            else:
-                                current_line += char.get('text', '')
-                                current_fonts.append({
-                                    'size': char.get('size', 0),
-                                    'fontname': char.get('fontname', '')
-                                })
-                        
-                        text += page_text + "\n"
-                
-                # 2. Extract tables
-                try:
-                    tables = page.extract_tables() if hasattr(page, 'extract_tables') else []
-                    if tables:
-                        for table_num, table in enumerate(tables, 1):
-                            if table and any(any(cell for cell in row if cell) for row in table):
-                                table_text = "\n".join(" | ".join(str(cell or "").strip() for cell in row) for row in table)
-                                structure.append({
-                                    "type": "table",
-                                    "content": table_text,
-                                    "page": page_num,
-                                    "table_num": table_num
-                                })
-                                text += f"\n[Table {table_num} on page {page_num}]\n{table_text}\n"
-                except Exception as e:
-                    print(f"Warning: Error extracting tables from page {page_num}: {str(e)}")
-                
-                # 3. Check for images
+                keys[page_num] = _pdf_page_key(page)
+                if keys[page_num] and not tables:
+                    keys[page_num] += ":no-tables"  # never served to a full parse
+                cached = _pdf_cached_page(keys[page_num], page_num)
+                if cached is not None:
+                    results[page_num] = cached
+            missing = [n for n in range(1, page_count + 1) if n not in results]
+            
+            def _checkpoint():
+                # The partial result is only built once the deadline has passed
+                if results and current_deadline().expired():
+                    check_deadline("parse", partial=_merge_pdf_pages(results, page_count, prefix_only=True))
+                else:
+                    check_deadline("parse")
+            
+            if parallel and PDF_WORKERS > 1 and len(missing) >= PDF_PARALLEL_MIN_PAGES:
                 try:
-                    if hasattr(page, 'images') and page.images:
-                        for img_num, img in enumerate(page.images, 1):
-                            structure.append({
-                                "type": "image",
-                                "page": page_num,
-                                "image_num": img_num,
-                                "bbox": img.get("bbox", []),
-                                "width": img.get("width", 0),
-                                "height": img.get("height", 0)
-                            })
-                            text += f"\n[Image {img_num} on page {page_num}]\n"
-                except Exception as e:
-                    print(f"Warning: Error processing images on page {page_num}: {str(e)}")
+                    _parse_pdf_pages_parallel(file_bytes, missing, keys, results, page_count, tables)
+                    missing = []
+                except BrokenProcessPool as e:
+                    print(f"Warning: PDF worker pool failed ({str(e)}); parsing pages inline")
+                    _reset_pdf_worker_pool()
+                    missing = [n for n in missing if n not in results]
+            
+            for page_num in missing:
+                _checkpoint()
+                results[page_num] = _parse_pdf_page(pdf.pages[page_num - 1], page_num, _checkpoint, tables)
+                _pdf_cache_page(keys[page_num], results[page_num])
     
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise ValueError(f"Failed to parse PDF: {str(e)}")
     
-    return text.strip(), structure
+    return _merge_pdf_pages(results, page_count)
+
+
+# WordprocessingML namespaces (DOCX)
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_A_BLIP = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+_WP_EXTENT = "{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}extent"
+_V_IMAGEDATA = "{urn:schemas-microsoft-com:vml}imagedata"
+
+# Default font size (in points) for DOCX when neither runs nor styles set one
+DOCX_DEFAULT_FONT_SIZE = 11.0
+EMU_PER_POINT = 12700
+DOCX_CHECKPOINT_EVERY = 50  # top-level blocks between deadline checks
+DOCX_STYLE_CACHE_SIZE = 64  # style indexes kept, keyed by styles.xml CRC and size
+
+# Resumes made from the same template share styles.xml, which can be large
+_docx_style_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+_docx_style_lock = threading.Lock()
+
+
+def _docx_on(element) -> bool:
+    """Value of a WordprocessingML on/off property (absent w:val means on)."""
+    return element.get(_W + "val", "true").lower() not in ("0", "false", "off")
+
+
+def _docx_styles(zf: zipfile.ZipFile) -> dict:
+    """
+    Index word/styles.xml once: styleId -> (lowercased name, font size in
+    points or None, is a list style). Sizes and list numbering are resolved
+    through the basedOn chain and the document defaults. The entry under None
+    is the default paragraph style. Indexes are cached per styles.xml.
+    """
+    try:
+        info = zf.getinfo("word/styles.xml")
+    except KeyError:
+        return {None: ("normal", None, False)}
+    key = (info.CRC, info.file_size)
+    with _docx_style_lock:
+        styles = _docx_style_cache.get(key)
+        if styles is not None:
+            _docx_style_cache.move_to_end(key)
+            return styles
+
+    styles = _index_docx_styles(ET.fromstring(zf.read(info)))
+    with _docx_style_lock:
+        _docx_style_cache[key] = styles
+        if len(_docx_style_cache) > DOCX_STYLE_CACHE_SIZE:
+            _docx_style_cache.popitem(last=False)
+    return styles
+
+
+def _index_docx_styles(root) -> dict:
+
+    default_size = None
+    sz = root.find(f"{_W}docDefaults/{_W}rPrDefault/{_W}rPr/{_W}sz")
+    if sz is not None and sz.get(_W + "val", "").isdigit():
+        default_size = int(sz.get(_W + "val")) / 2
+
+    raw = {}
+    default_id = None
+    for style in root.iter(_W + "style"):
+        if style.get(_W + "type") != "paragraph":
+            continue
+        style_id = style.get(_W + "styleId")
+        name = style.find(_W + "name")
+        based_on = style.find(_W + "basedOn")
+        sz = style.find(f"{_W}rPr/{_W}sz")
+        raw[style_id] = (
+            (name.get(_W + "val") if name is not None else style_id or "").lower(),
+            based_on.get(_W + "val") if based_on is not None else None,
+            int(sz.get(_W + "val")) / 2 if sz is not None and sz.get(_W + "val", "").isdigit() else None,
+            style.find(f"{_W}pPr/{_W}numPr") is not None,
+        )
+        if style.get(_W + "default") in ("1", "true"):
+            default_id = style_id
+
+    styles = {}
+    for style_id, (name, _, _, _) in raw.items():
+        size, is_list, seen, current = None, False, set(), style_id
+        while current in raw and current not in seen:
+            seen.add(current)
+            _, based_on, own_size, own_list = raw[current]
+            size = own_size if size is None else size
+            is_list = is_list or own_list
+            current = based_on
+        styles[style_id] = (name, size if size is not None else default_size, is_list)
+    styles[None] = styles.get(default_id, ("normal", default_size, False))
+    return styles
 
 
 def parse_docx_resume(file_bytes: bytes) -> tuple:
     """
-    Extract text and structure from a DOCX resume.
-    Note: PDF format is recommended for best results as it provides more accurate
-    structure and formatting information.
-    
+    Extract text and structure from a DOCX resume in one streaming pass over
+    word/document.xml (iterparse on the zip member), so memory stays flat
+    regardless of document size.
+
+    - Paragraph styles are resolved through an index of word/styles.xml:
+      'heading' styles give headings, list styles or numbering give bullets,
+      and font sizes fall back from the first run to the style to the defaults.
+    - Tables become 'table' elements (cells joined with ' | ', rows with
+      newlines), as for PDFs; nested tables are flattened into their cell.
+      Cell paragraphs are also emitted as heading/text/bullet elements.
+    - Text box paragraphs are emitted with "text_box": True.
+    - Pictures become 'image' elements.
+    - Explicit page breaks (w:br type="page", pageBreakBefore) advance the
+      page number.
+    Note: PDF format is still recommended; a DOCX has no rendered layout, so
+    pages only change at explicit breaks.
+
     Returns:
-        tuple: (text: str, structure: list) with similar structure to PDF parsing,
-        but with limited font information compared to PDF.
+        tuple: (text: str, structure: ResumeStructure) with similar structure to PDF parsing
+
+    Raises:
+        ValueError: If the file is not a valid DOCX
+        DeadlineExceeded: If the current deadline (deadline.py) passes
     """
-    doc = docx.Document(BytesIO(file_bytes))
-    text = ""
-    structure = []
-    
-    # Default font size (in points) for DOCX (varies by template)
-    DEFAULT_FONT_SIZE = 11.0
-    
-    for para in doc.paragraphs:
-        clean_text = para.text.strip()
-        if not clean_text:
-            continue
-            
-        # Try to get font size (not always available in DOCX)
-        font_size = DEFAULT_FONT_SIZE
-        if para.runs and hasattr(para.runs[0].font, 'size'):
-            if para.runs[0].font.size:
-                # Convert 20ths of a point to points
-                font_size = para.runs[0].font.size.pt if para.runs[0].font.size.pt > 0 else font_size
-        
-        # Determine element type
-        style = para.style.name.lower()
-        if "heading" in style:
-            element_type = "heading"
-        elif clean_text.startswith(("•", "-", "*")):
-            element_type = "bullet"
-        else:
-            element_type = "text"
-            
-        structure.append({
-            "type": element_type,
-            "content": clean_text,
-            "font_size": font_size,
-            "page": 1  # DOCX doesn't have page info easily accessible
-        })
-        
-        text += clean_text + "\n"
-        
-    return text.strip(), structure
+    try:
+        zf = zipfile.ZipFile(BytesIO(file_bytes))
+        styles = _docx_styles(zf)
+        document = zf.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        raise ValueError(f"Failed to parse DOCX: {str(e)}")
+
+    text_parts = []
+    structure = ResumeStructure()
+    page = 1
+    table_num = 0
+    image_num = 0
+
+    paragraphs = []     # open paragraphs, innermost last (text boxes nest inside paragraphs)
+    tables = []         # open tables: list of rows, each a list of cell strings
+    cells = []          # text parts of the open cell, per open table
+    run = None          # {"size": float|None, "text": bool} of the open run
+    drawing = None      # {"image": bool, "width": float, "height": float}
+    in_ppr = 0
+    fallback = 0        # inside mc:Fallback (duplicate of the mc:Choice content)
+    text_box = 0
+    depth = 0
+    body = None
+    blocks = 0
+
+    def _emit(element_type: str, content: str, font_size: float, **extra):
+        element = {"type": element_type, "content": content, "font_size": font_size, "page": page}
+        element.update(extra)
+        structure.append(element)
+        text_parts.append(content)
+
+    try:
+        with document:
+            for event, elem in ET.iterparse(document, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    depth += 1
+                    if tag == _MC_FALLBACK:
+                        fallback += 1
+                    if fallback:
+                        continue
+                    if tag == _W + "body":
+                        body = elem
+                    elif tag == _W + "p":
+                        paragraphs.append({"parts": [], "style": None, "list": False,
+                                           "size": None, "text_box": text_box > 0})
+                    elif tag == _W + "pPr":
+                        in_ppr += 1
+                    elif tag == _W + "r" and paragraphs:
+                        run = {"size": None, "text": False}
+                    elif tag == _W + "tbl":
+                        tables.append([])
+                        cells.append(None)
+                    elif tag == _W + "tr" and tables:
+                        tables[-1].append([])
+                    elif tag == _W + "tc" and tables:
+                        cells[-1] = []
+                    elif tag == _W + "txbxContent":
+                        text_box += 1
+                    elif tag == _W + "drawing" or tag == _W + "pict":
+                        drawing = {"image": False, "width": 0, "height": 0}
+                    continue
+
+                # event == "end"
+                depth -= 1
+                if tag == _MC_FALLBACK:
+                    fallback -= 1
+                    continue
+                if fallback:
+                    continue
+
+                if tag == _W + "t":
+                    if paragraphs and elem.text:
+                        paragraphs[-1]["parts"].append(elem.text)
+                        if run is not None:
+                            run["text"] = True
+                elif tag == _W + "tab":
+                    if paragraphs and not in_ppr:
+                        paragraphs[-1]["parts"].append("\t")
+                elif tag == _W + "br":
+                    if elem.get(_W + "type") == "page":
+                        page += 1
+                    elif paragraphs:
+                        paragraphs[-1]["parts"].append("\n")
+                elif tag == _W + "sz":
+                    val = elem.get(_W + "val", "")
+                    if run is not None and not in_ppr and val.isdigit():
+                        run["size"] = int(val) / 2
+                elif tag == _W + "r":
+                    if run is not None and paragraphs:
+                        current = paragraphs[-1]
+                        if current["size"] is None and run["text"] and run["size"] is not None:
+                            current["size"] = run["size"]
+                    run = None
+                elif tag == _W + "pPr":
+                    in_ppr -= 1
+                elif tag == _W + "pStyle":
+                    if paragraphs and in_ppr:
+                        paragraphs[-1]["style"] = elem.get(_W + "val")
+                elif tag == _W + "numPr":
+                    if paragraphs and in_ppr:
+                        paragraphs[-1]["list"] = True
+                elif tag == _W + "pageBreakBefore":
+                    if paragraphs and in_ppr and _docx_on(elem):
+                        page += 1
+                elif tag == _A_BLIP or tag == _V_IMAGEDATA:
+                    if drawing is not None:
+                        drawing["image"] = True
+                elif tag == _WP_EXTENT:
+                    if drawing is not None:
+                        drawing["width"] = int(elem.get("cx", 0)) / EMU_PER_POINT
+                        drawing["height"] = int(elem.get("cy", 0)) / EMU_PER_POINT
+                elif tag == _W + "drawing" or tag == _W + "pict":
+                    if drawing is not None and drawing["image"]:
+                        image_num += 1
+                        structure.append({
+                            "type": "image",
+                            "page": page,
+                            "image_num": image_num,
+                            "width": round(drawing["width"], 1),
+                            "height": round(drawing["height"], 1)
+                        })
+                        text_parts.append(f"[Image {image_num} on page {page}]")
+                    drawing = None
+                elif tag == _W + "txbxContent":
+                    text_box -= 1
+                elif tag == _W + "p":
+                    current = paragraphs.pop()
+                    clean_text = "".join(current["parts"]).strip()
+                    if clean_text:
+                        # Cell paragraphs are emitted like any other (layout-table
+                        # templates hold the whole resume in cells) and also make
+                        # up the table element, as the PDF path emits lines and tables
+                        if tables and not current["text_box"] and cells[-1] is not None:
+                            cells[-1].append(clean_text)
+                        name, style_size, style_list = styles.get(current["style"], styles[None])
+                        if "heading" in name:
+                            element_type = "heading"
+                        elif current["list"] or style_list or clean_text.startswith(("•", "-", "*")):
+                            element_type = "bullet"
+                        else:
+                            element_type = "text"
+                        font_size = current["size"] or style_size or DOCX_DEFAULT_FONT_SIZE
+                        if current["text_box"]:
+                            _emit(element_type, clean_text, font_size, text_box=True)
+                        else:
+                            _emit(element_type, clean_text, font_size)
+                elif tag == _W + "tc":
+                    if tables and cells[-1] is not None:
+                        if tables[-1]:
+                            tables[-1][-1].append(" ".join(cells[-1]))
+                        cells[-1] = None
+                elif tag == _W + "tbl":
+                    rows = tables.pop()
+                    cells.pop()
+                    table_text = "\n".join(" | ".join(row) for row in rows if any(row))
+                    if tables:
+                        # Nested table: flatten into the enclosing cell
+                        if table_text and cells[-1] is not None:
+                            cells[-1].append(table_text)
+                    elif table_text:
+                        table_num += 1
+                        structure.append({
+                            "type": "table",
+                            "content": table_text,
+                            "page": page,
+                            "table_num": table_num
+                        })
+                        text_parts.append(f"[Table {table_num} on page {page}]\n{table_text}")
+
+                # Drop finished top-level blocks (body children) to keep memory flat
+                if depth == 2 and body is not None:
+                    body.clear()
+                    blocks += 1
+                    # The partial result is only built once the deadline has passed
+                    if blocks % DOCX_CHECKPOINT_EVERY == 0 and current_deadline().expired():
+                        check_deadline("parse", partial=("\n".join(text_parts).strip(), structure.copy()) if structure else None)
+    except ET.ParseError as e:
+        raise ValueError(f"Failed to parse DOCX: {str(e)}")
+
+    return "\n".join(text_parts).strip(), structure
 
 
 def parse_resume(file: UploadFile) -> tuple:
@@ -200,18 +678,35 @@ def parse_resume(file: UploadFile) -> tuple:
         file: Uploaded file (PDF or DOCX)
         
     Returns:
-        tuple: (text: str, structure: list)
+        tuple: (text: str, structure: ResumeStructure)
         
     Raises:
         ValueError: If file type is not supported or file cannot be parsed
     """
-    file_bytes = file.file.read()
+    return parse_resume_bytes(file.filename, file.file.read())
+
+
+def parse_resume_bytes(filename: str, file_bytes: bytes, tables: bool = True) -> tuple:
+    """
+    Parse raw resume bytes, choosing the parser by file extension.
+    Used where the upload has already been read (e.g. queued jobs).
+    tables=False skips PDF table extraction.
+
+    Returns:
+        tuple: (text: str, structure: ResumeStructure)
+
+    Raises:
+        ValueError: If file type is not supported or file cannot be parsed
+    """
+    name = (filename or "").lower()
     try:
-        if file.filename.lower().endswith(".pdf"):
-            return parse_pdf_resume(file_bytes)
-        elif file.filename.lower().endswith(".docx"):
+        if name.endswith(".pdf"):
+            return parse_pdf_resume(file_bytes, tables=tables)
+        elif name.endswith(".docx"):
             return parse_docx_resume(file_bytes)
         else:
             raise ValueError("Unsupported file type. Please upload PDF (recommended) or DOCX.")
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise ValueError(f"Error parsing file: {str(e)}")
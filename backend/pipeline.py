@@ -0,0 +1,335 @@
+"""
+pipeline.py
+The resume analysis pipeline shared by the synchronous /process endpoint and
+the background job workers (job_worker.py).
+
+    parse    -> (resume_text, resume_structure)
+    analyze  -> suggested skills, ATS score, structure advice
+
+After parsing, the work is a small dependency graph (run_graph) whose
+independent nodes run concurrently on a bounded thread pool
+(ANALYSIS_THREADS), so latency approaches the slowest branch rather than
+the sum:
+
+    skills                                   -> skills stage
+    structure                                -> structure stage
+    jd profile -> content score   \
+    readability (spaCy over resume) +-------> ats stage
+
+Each stage runs under a deadline (see deadline.py): /process gives every stage
+its own budget, capped by the request timeout, while jobs run without a limit.
+Every stage is reported in `stages` with one of the statuses below, so a
+skipped stage is never mistaken for a real zero: its result stays empty and
+ats_score is None unless the scoring stage produced a score.
+
+Under load, /process may ask for a reduced fidelity tier (fidelity.py); the
+tier is held in a context variable for the analysis and reported as
+`fidelity` in the result.
+"""
+
+import contextvars
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import parser
+from ats_calculator import ATSCalculator
+from deadline import NO_DEADLINE, Deadline, DeadlineExceeded, run_bounded
+from fidelity import FULL, MINIMAL, extraction_tier, fidelity_scope
+from lite_scorer import LiteATSCalculator, get_missing_skills_lite
+from restructure_advice import analyze_resume_structure
+from structure_index import build_structure_index
+from suggest_skills import get_missing_skills
+
+# Stages in execution order
+STAGES = ("parse", "skills", "ats", "structure")
+
+# Bump when scores, skills or advice for the same input change (like
+# parser.PARSER_VERSION for parsing; see coalesce.analysis_key)
+SCORER_VERSION = "3"
+
+# Stage statuses
+COMPLETED = "completed"
+DEGRADED = "degraded"  # ran out of time; a partial result is used
+SKIPPED = "skipped"    # did not run or produced nothing usable
+FAILED = "failed"      # raised an error (only recorded on the lenient /process path)
+
+# Threads running independent analysis nodes, shared by all requests; 1 runs
+# the graph sequentially in the calling thread (e.g. one bulk_score process per core)
+ANALYSIS_THREADS = int(os.environ.get("ANALYSIS_THREADS", "0")) or min(4, os.cpu_count() or 1)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid = 0
+_executor_lock = threading.Lock()
+
+
+def run_stage(stages: List[Dict[str, Any]], name: str, fn: Callable, *args,
+              deadline: Deadline = NO_DEADLINE, budget: Optional[float] = None,
+              strict: bool = False, start: Optional[float] = None) -> tuple:
+    """
+    Run one stage under min(deadline, now + budget) and append its report
+    ({name, status, elapsed_ms, detail}) to `stages`. `start` (perf_counter)
+    is when the stage's first part began, for stages split across graph nodes.
+
+    Returns:
+        tuple: (status, value) -- value is None when the stage was skipped or failed
+
+    Raises:
+        Exception: errors other than DeadlineExceeded when strict is set
+    """
+    start = time.perf_counter() if start is None else start
+    status, value, detail = COMPLETED, None, None
+    try:
+        value = run_bounded(deadline.child(budget), name, fn, *args)
+    except DeadlineExceeded as e:
+        if e.partial is not None:
+            status, value, detail = DEGRADED, e.partial, "Deadline exceeded; partial result"
+        else:
+            status, detail = SKIPPED, "Deadline exceeded"
+    except Exception as e:
+        if strict:
+            raise
+        print(f"Warning: Stage '{name}' failed: {str(e)}")
+        traceback.print_exc()
+        status, detail = FAILED, str(e)
+    stages.append({
+        "name": name,
+        "status": status,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "detail": detail,
+    })
+    return status, value
+
+
+def skip_stage(stages: List[Dict[str, Any]], name: str, detail: str) -> None:
+    """Record a stage that was not attempted."""
+    stages.append({"name": name, "status": SKIPPED, "elapsed_ms": 0.0, "detail": detail})
+
+
+def _analysis_executor() -> Optional[ThreadPoolExecutor]:
+    """Shared thread pool for graph nodes (None when ANALYSIS_THREADS <= 1), started on first use."""
+    global _executor, _executor_pid
+    if ANALYSIS_THREADS <= 1:
+        return None
+    with _executor_lock:
+        # A pool inherited across fork() has no threads: start a new one
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=ANALYSIS_THREADS, thread_name_prefix="analysis")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def run_graph(graph: Dict[str, Tuple[Tuple[str, ...], Callable]],
+              executor: Optional[ThreadPoolExecutor] = None) -> Dict[str, Any]:
+    """
+    Run a dependency graph {name: (dependencies, fn)}. Each fn is called with
+    the results of its dependencies, in order, once they are all done; nodes
+    whose dependencies are done run concurrently on `executor` (one by one in
+    the calling thread without it). Returns name -> result.
+
+    Raises:
+        Exception: the first exception raised by a node, once the nodes already
+            running have finished (no new nodes are started after it)
+        ValueError: if dependencies are missing or cyclic
+    """
+    results: Dict[str, Any] = {}
+    pending = dict(graph)
+    running: Dict[Any, str] = {}
+    error: Optional[Exception] = None
+    while True:
+        ready = [] if error is not None else [
+            name for name, (deps, _) in pending.items() if all(dep in results for dep in deps)
+        ]
+        for name in ready:
+            deps, fn = pending.pop(name)
+            args = [results[dep] for dep in deps]
+            if executor is None:
+                results[name] = fn(*args)
+            else:
+                # Nodes see the caller's context variables (e.g. the current deadline)
+                running[executor.submit(contextvars.copy_context().run, fn, *args)] = name
+        if running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    error = error or e
+        elif not ready:
+            break
+    if error is not None:
+        raise error
+    if pending:
+        raise ValueError(f"Unresolvable graph nodes: {', '.join(sorted(pending))}")
+    return results
+
+
+class _Failed:
+    """An exception raised by a part of a stage, re-raised where the stage combines its parts."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, _Failed):
+        raise value.error
+    return value
+
+
+def parse(filename: str, file_bytes: bytes, stages: List[Dict[str, Any]],
+          deadline: Deadline = NO_DEADLINE, budget: Optional[float] = None,
+          fidelity: str = FULL) -> tuple:
+    """
+    Parse stage. A PDF that runs out of time mid-way yields the pages parsed
+    so far (stage 'degraded'). At MINIMAL fidelity, PDF tables are not extracted.
+
+    Returns:
+        tuple: (text: str, structure: ResumeStructure)
+
+    Raises:
+        DeadlineExceeded: If not even a partial parse finished in time
+        ValueError: If the file cannot be parsed
+    """
+    status, value = run_stage(stages, "parse", parser.parse_resume_bytes, filename, file_bytes,
+                              fidelity != MINIMAL, deadline=deadline, budget=budget, strict=True)
+    if status == SKIPPED:
+        raise DeadlineExceeded("parse")
+    return value
+
+
+def analyze(
+    resume_text: str,
+    resume_structure: list,
+    jd_text: Optional[str],
+    engine: str = "full",
+    jd_profile=None,
+    deadline: Deadline = NO_DEADLINE,
+    budgets: Optional[Dict[str, float]] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    stages: Optional[List[Dict[str, Any]]] = None,
+    strict: bool = False,
+    fidelity: str = FULL,
+) -> Dict[str, Any]:
+    """
+    Run the analysis stages against a job description.
+
+    Args:
+        engine: "full" (spaCy + SkillNER) or "lite" (lite_scorer.py)
+        jd_profile: registered JD (jd_registry.JDProfile) to reuse, if any
+        deadline: overall deadline; a stage that misses it is degraded or skipped
+        budgets: per-stage time budgets in seconds (stage name -> seconds)
+        progress: called with the stage name before each stage starts
+        stages: stage reports so far (e.g. from parse); appended to
+        strict: re-raise stage errors instead of recording the stage as failed
+        fidelity: tier from fidelity.py; MINIMAL runs the lite engine
+
+    Returns:
+        dict with suggested_skills, ats_score (None unless scored),
+        improvement_recommendation, stages and fidelity
+    """
+    budgets = budgets or {}
+    stages = stages if stages is not None else []
+    if fidelity == MINIMAL:
+        engine = "lite"
+    result: Dict[str, Any] = {
+        "suggested_skills": [],
+        "ats_score": None,
+        "improvement_recommendation": [],
+        "stages": stages,
+        "fidelity": fidelity,
+    }
+
+    if not jd_text or not jd_text.strip():
+        for name in STAGES[1:]:
+            skip_stage(stages, name, "No job description provided")
+        return result
+
+    def _stage(name: str, fn: Callable, *args, **kwargs):
+        if progress is not None:
+            progress(name)
+        kwargs.setdefault("deadline", deadline)
+        kwargs.setdefault("budget", budgets.get(name))
+        return run_stage(stages, name, fn, *args, strict=strict, **kwargs)[1]
+
+    def _skills():
+        if engine == "lite":
+            return get_missing_skills_lite(
+                jd_text, resume_text,
+                jd_skills=jd_profile.lite_calculator.jd_skills if jd_profile else None
+            )
+        return get_missing_skills(
+            jd_text, resume_text,
+            jd_skills=jd_profile.skills_for(extraction_tier()) if jd_profile else None
+        )
+
+    # The ats stage runs in parts (graph nodes below) under one budget
+    ats_deadline = deadline.child(budgets.get("ats"))
+    ats_start = time.perf_counter()
+
+    def _ats_part(fn: Callable, *args):
+        # Errors (and running out of time) surface in the ats stage via _unwrap
+        try:
+            return run_bounded(ats_deadline, "ats", fn, *args)
+        except Exception as e:
+            return _Failed(e)
+
+    def _calculator():
+        if jd_profile:
+            return jd_profile.lite_calculator if engine == "lite" else jd_profile.calculator
+        return LiteATSCalculator(jd_text) if engine == "lite" else ATSCalculator(jd_text)
+
+    def _score(ats, content=None, readability=None):
+        ats = _unwrap(ats)
+        if engine == "lite":
+            return ats.total_score(resume_text, resume_structure, index=index)
+        # A part that raised is left to total_score, which recomputes it (unless
+        # the resume fails its prechecks) and handles the error as before
+        if isinstance(content, _Failed) and not isinstance(content.error, DeadlineExceeded):
+            content = None
+        if isinstance(readability, _Failed) and not isinstance(readability.error, DeadlineExceeded):
+            readability = None
+        content = _unwrap(content)
+        if isinstance(readability, _Failed):
+            # Out of time in the readability pass: the score without readability
+            raise DeadlineExceeded("ats", ats.total_score(resume_text, resume_structure, index=index,
+                                                          readability=([], 0), content=content))
+        return ats.total_score(resume_text, resume_structure, index=index,
+                               readability=readability, content=content)
+
+    def _ats(*parts):
+        # Combining the parts is cheap; the parts themselves ran under ats_deadline
+        return _stage("ats", _score, *parts, deadline=NO_DEADLINE, budget=None, start=ats_start)
+
+    print(f"Starting analysis ({engine} engine, {fidelity} fidelity)...")
+    # One pass over the structure, shared by ATS scoring and structure advice
+    index = build_structure_index(resume_structure, resume_text)
+
+    graph: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+        "skills": ((), lambda: _stage("skills", _skills) or []),
+        "structure": ((), lambda: _stage(
+            "structure", analyze_resume_structure, resume_text, resume_structure, index
+        ) or []),
+        "calculator": ((), lambda: _ats_part(_calculator)),
+    }
+    if engine == "lite":
+        graph["ats"] = (("calculator",), _ats)
+    else:
+        graph["content"] = (("calculator",), lambda ats: ats if isinstance(ats, _Failed)
+                            else _ats_part(ats.content_score, resume_text))
+        graph["readability"] = ((), lambda: _ats_part(ATSCalculator.readability_inputs, resume_text, index))
+        graph["ats"] = (("calculator", "content", "readability"), _ats)
+
+    with fidelity_scope(fidelity):
+        results = run_graph(graph, _analysis_executor())
+    # Report stages in pipeline order, whichever finished first
+    stages.sort(key=lambda stage: STAGES.index(stage["name"]) if stage["name"] in STAGES else len(STAGES))
+    result["suggested_skills"] = results["skills"]
+    result["ats_score"] = results["ats"]
+    result["improvement_recommendation"] = results["structure"]
+    print("Analysis finished: " + ", ".join(f"{s['name']}={s['status']}" for s in stages))
+    return result
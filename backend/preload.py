@@ -0,0 +1,153 @@
+"""
+preload.py
+Load every model, matcher and lookup table once, before forking workers.
+
+Used by serve.py (preforking HTTP server) and by offline tools that fork a
+process pool. The sequence is:
+
+1. gc.disable() so no collection runs while the big object graphs are built
+2. import the analysis modules (spaCy model, SkillNER / skill artifact, IDF table)
+3. move the spaCy vector table into a read-only np.memmap backed by a .npy file
+   and build the canonical skill embeddings (skill_vectors.py, when synonym
+   matching is on)
+4. run one warm-up analysis so lazily created state is built in the parent
+5. gc.collect(); gc.freeze() -- the surviving objects go to the permanent
+   generation, so later collections in the children never touch (and thereby
+   dirty) the pages that hold them
+
+Children then call after_fork() to re-enable the collector.
+"""
+
+import gc
+import importlib
+import os
+import time
+from typing import Any, Dict, Optional
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts")
+
+_WARMUP_JD = """
+Software Engineer position requiring 3+ years of experience with Python,
+SQL, Docker and machine learning. Experience with AWS is a plus.
+"""
+
+_WARMUP_RESUME = """
+Jane Doe
+jane@email.com
+Experience:
+Software Engineer (2018-2023)
+- Developed Python services on AWS
+- Built machine learning pipelines
+Skills:
+Python, SQL, Docker
+Education:
+B.S. Computer Science
+"""
+
+_WARMUP_STRUCTURE = [
+    {"type": "heading", "content": "Jane Doe", "font_size": 14, "page": 1},
+    {"type": "text", "content": "jane@email.com", "font_size": 11, "page": 1},
+    {"type": "heading", "content": "Experience", "font_size": 12, "page": 1},
+    {"type": "bullet", "content": "Developed Python services on AWS", "font_size": 11, "page": 1},
+    {"type": "bullet", "content": "Built machine learning pipelines", "font_size": 11, "page": 1},
+    {"type": "heading", "content": "Skills", "font_size": 12, "page": 1},
+    {"type": "heading", "content": "Education", "font_size": 12, "page": 1},
+]
+
+
+def map_vectors_readonly(nlp, directory: str = ARTIFACTS_DIR) -> Optional[str]:
+    """
+    Replace nlp.vocab.vectors.data with a read-only memory map of the same table.
+
+    The table is written once to <directory>/vectors-<model>-<rows>x<dims>.npy.
+    Pages of a file-backed read-only mapping are shared between all processes
+    that map it and can never be copied-on-write, unlike a heap array inherited
+    across fork(). Returns the .npy path, or None if the model has no vectors.
+    """
+    import numpy as np
+
+    vectors = nlp.vocab.vectors
+    data = getattr(vectors, "data", None)
+    if data is None or not getattr(data, "size", 0):
+        return None
+    if isinstance(data, np.memmap):
+        return data.filename
+
+    data = np.asarray(data)
+    meta = getattr(nlp, "meta", {}) or {}
+    model = f"{meta.get('lang', 'xx')}_{meta.get('name', 'model')}-{meta.get('version', '0')}"
+    path = os.path.join(directory, f"vectors-{model}-{data.shape[0]}x{data.shape[1]}.npy")
+
+    mapped = None
+    if os.path.exists(path):
+        mapped = np.load(path, mmap_mode="r")
+        if mapped.shape != data.shape or mapped.dtype != data.dtype:
+            mapped = None
+    if mapped is None:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}.npy"
+        np.save(tmp_path, data)
+        os.replace(tmp_path, path)
+        mapped = np.load(path, mmap_mode="r")
+
+    vectors.data = mapped
+    return path
+
+
+def preload_models(map_vectors: bool = True, warmup: bool = True, extra_modules=()) -> Dict[str, Any]:
+    """
+    Load and freeze all shared analysis state in the current (parent) process.
+    `extra_modules` are imported before the freeze (e.g. "main" for the app).
+    Returns a small report for logging.
+    """
+    start = time.time()
+    gc.disable()
+
+    import suggest_skills
+    import restructure_advice
+    from ats_calculator import ATSCalculator
+    from lite_scorer import LiteATSCalculator
+    from skill_artifact import get_skill_artifact
+    from skill_vectors import SKILL_SYNONYM_THRESHOLD, get_skill_vector_index
+
+    report: Dict[str, Any] = {
+        "skill_extractor": suggest_skills.skill_extractor is not None,
+        "skill_artifact": get_skill_artifact() is not None,
+        "vectors_path": None,
+    }
+
+    if map_vectors:
+        try:
+            report["vectors_path"] = map_vectors_readonly(suggest_skills.nlp)
+        except Exception as e:
+            print(f"Warning: Could not memory-map word vectors: {e}")
+
+    if SKILL_SYNONYM_THRESHOLD < 1.0:
+        try:
+            # Canonical skill embeddings, built after the vector table is mapped
+            report["skill_vectors"] = get_skill_vector_index().matrix.shape[0]
+        except Exception as e:
+            print(f"Warning: Could not build skill vectors: {e}")
+
+    if warmup:
+        try:
+            suggest_skills.get_missing_skills(_WARMUP_JD, _WARMUP_RESUME)
+            ATSCalculator(_WARMUP_JD).total_score(_WARMUP_RESUME, _WARMUP_STRUCTURE)
+            LiteATSCalculator(_WARMUP_JD).total_score(_WARMUP_RESUME, _WARMUP_STRUCTURE)
+            restructure_advice.analyze_resume_structure(_WARMUP_RESUME, _WARMUP_STRUCTURE)
+        except Exception as e:
+            print(f"Warning: Warm-up analysis failed: {e}")
+
+    for name in extra_modules:
+        importlib.import_module(name)
+
+    gc.collect()
+    gc.freeze()
+    report["frozen_objects"] = gc.get_freeze_count()
+    report["seconds"] = round(time.time() - start, 2)
+    return report
+
+
+def after_fork() -> None:
+    """Call first thing in a forked child: the parent left the collector disabled."""
+    gc.enable()
@@ -0,0 +1,96 @@
+"""
+projection.py
+Field selection and compact mode for analysis responses (/process and
+GET /jobs/{job_id}).
+
+A full AnalysisResponse echoes the JD, the resume text and every structure
+element back to the client. Clients that only need the results can ask for:
+
+    fields=ats_score,suggested_skills   only these fields (plus 'success')
+    compact=true                        everything except the echoed inputs;
+                                        resume_structure becomes structure_summary
+
+'structure_summary' can also be requested by name in `fields`.
+"""
+
+from typing import Any, Dict, FrozenSet, Optional
+
+from resume_structure import structure_to_list
+from structure_index import build_structure_index
+
+# Fields of AnalysisResponse plus the computed structure summary, in response order
+FIELD_ORDER = (
+    "success", "jd_text", "resume_structure", "structure_summary", "resume_text",
+    "ats_score", "suggested_skills", "improvement_recommendation", "error", "stages",
+    "fidelity",
+)
+RESPONSE_FIELDS = frozenset(FIELD_ORDER)
+
+# Echoed inputs left out in compact mode
+ECHOED_FIELDS = frozenset({"jd_text", "resume_text", "resume_structure"})
+COMPACT_FIELDS = RESPONSE_FIELDS - ECHOED_FIELDS
+# The resume itself: never returned for a stored parse (resume_token requests)
+RESUME_FIELDS = frozenset({"resume_text", "resume_structure"})
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a comma-separated field list; None or blank selects everything.
+
+    Raises:
+        ValueError: If a name is not a response field
+    """
+    if fields is None or not fields.strip():
+        return None
+    names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = sorted(names - RESPONSE_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Allowed: {', '.join(sorted(RESPONSE_FIELDS))}"
+        )
+    return names | {"success"}
+
+
+def selected_fields(fields: Optional[FrozenSet[str]], compact: bool) -> Optional[FrozenSet[str]]:
+    """Fields to return: an explicit selection wins, then compact mode; None = full response."""
+    if fields is not None:
+        return fields
+    return COMPACT_FIELDS if compact else None
+
+
+def without_resume(selection: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+    """A selection (None = full response) without the resume text and structure."""
+    return (selection if selection is not None else RESPONSE_FIELDS - {"structure_summary"}) - RESUME_FIELDS
+
+
+def summarize_structure(resume_structure: Any) -> Dict[str, Any]:
+    """Small summary of the parsed structure, returned instead of the elements."""
+    index = build_structure_index(resume_structure)
+    return {
+        "element_count": index.element_count,
+        "headings": index.headings,
+        "bullet_count": len(index.bullets),
+        "table_count": index.table_count,
+        "image_count": index.image_count,
+        "font_min": index.font_min,
+        "font_max": index.font_max,
+    }
+
+
+def project(payload: Dict[str, Any], selection: FrozenSet[str]) -> Dict[str, Any]:
+    """
+    Keep only the selected fields of a full response payload. resume_structure
+    may be a ResumeStructure or a list; it is only converted if selected.
+    """
+    projected = {}
+    for name in FIELD_ORDER:
+        if name not in selection:
+            continue
+        if name == "structure_summary":
+            projected[name] = summarize_structure(payload.get("resume_structure"))
+        elif name == "resume_structure":
+            projected[name] = structure_to_list(payload.get(name))
+        elif name in payload:
+            projected[name] = payload[name]
+    return projected
@@ -8,20 +8,36 @@ This module performs structural analysis of resumes to identify potential issues
 that could affect parsing by Applicant Tracking Systems (ATS). It provides
 specific, actionable advice for improving resume structure and content.
 
+The checks read from a StructureIndex (structure_index.py), built once per
+resume; pass one in to share it with the ATS scorer.
+
 Usage:
     >>> from restructure_advice import analyze_resume_structure
     >>> issues = analyze_resume_structure(resume_text, resume_structure)
 """
 
 import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 
-# Pre-compile regex patterns for better performance
-EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
-PHONE_REGEX = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
-LINKEDIN_REGEX = re.compile(r'linkedin\.com/in/[\w-]+')
-GITHUB_REGEX = re.compile(r'github\.com/[\w-]+')
+from resume_structure import is_structure
+from structure_index import REQUIRED_SECTIONS, StructureIndex, build_structure_index
+
+# Action verbs looked for anywhere in the text; the trailing \w* also matches
+# variations like 'developing'
+ACTION_VERBS = [
+    'achieved', 'managed', 'increased', 'developed', 'led', 'implemented',
+    'created', 'improved', 'reduced', 'designed', 'launched', 'spearheaded',
+    'built', 'optimized', 'analyzed', 'collaborated', 'mentored', 'taught',
+    'coordinated', 'executed', 'facilitated', 'generated', 'resolved'
+]
+ACTION_VERB_REGEX = re.compile(
+    r'\b(' + '|'.join(map(re.escape, ACTION_VERBS)) + r')\w*\b',
+    re.IGNORECASE
+)
+
+# Headings whose bullets are counted (substring match)
+BULLET_SECTION_KEYWORDS = ('experience', 'work experience', 'projects', 'education')
 
 # Constants
 MIN_FONT_SIZE = 9  # Minimum recommended font size
@@ -37,11 +53,12 @@ class ContactInfo:
     phone: bool = False
     profile: bool = False
 
-def check_contact_info(resume_text: str) -> Tuple[bool, ContactInfo, List[Dict[str, str]]]:
+def check_contact_info(resume_text: str, index: Optional[StructureIndex] = None) -> Tuple[bool, ContactInfo, List[Dict[str, str]]]:
     """Check for presence and validity of contact information.
     
     Args:
         resume_text: The full text content of the resume.
+        index: StructureIndex built with resume_text (built here if omitted).
         
     Returns:
         Tuple containing:
@@ -56,23 +73,14 @@ def check_contact_info(resume_text: str) -> Tuple[bool, ContactInfo, List[Dict[s
     contact_info = ContactInfo()
     
     try:
-        # Check for name (usually at the top of the resume)
-        first_100_chars = resume_text[:100].strip()
-        name_parts = first_100_chars.split('\n')[0].strip().split()
-        if 2 <= len(name_parts) <= 4 and all(part and part[0].isupper() for part in name_parts):
-            contact_info.name = True
-        
-        # Check for email using pre-compiled regex
-        contact_info.email = bool(EMAIL_REGEX.search(resume_text))
+        if index is None or not index.has_text:
+            index = build_structure_index(None, resume_text)
         
-        # Check for phone number using pre-compiled regex
-        contact_info.phone = bool(PHONE_REGEX.search(resume_text))
-        
-        # Check for online profiles using pre-compiled regex
-        contact_info.profile = bool(
-            LINKEDIN_REGEX.search(resume_text) or 
-            GITHUB_REGEX.search(resume_text)
-        )
+        # Name (first line), email, phone and profile links from the text
+        contact_info.name = index.text_name
+        contact_info.email = index.text_email
+        contact_info.phone = index.text_phone
+        contact_info.profile = index.text_profile
     
         # Generate specific advice for missing contact info
         if not contact_info.name:
@@ -104,63 +112,42 @@ def check_contact_info(resume_text: str) -> Tuple[bool, ContactInfo, List[Dict[s
             'advice': 'Could not verify contact information. Please check the format.'
         }]
 
-def check_sections(resume_text: str, resume_structure: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def check_sections(resume_text: str, resume_structure: List[Dict[str, Any]],
+                   index: Optional[StructureIndex] = None) -> List[Dict[str, str]]:
     """Check for missing or poorly structured sections in the resume.
 
     Args:
         resume_text: The full text content of the resume.
         resume_structure: List containing parsed resume structure elements.
+        index: StructureIndex built with resume_text (built here if omitted).
 
     Returns:
         List of dictionaries, each containing 'issue' and 'advice' keys.
     """
     if not isinstance(resume_text, str) or not resume_text.strip():
         raise ValueError("resume_text must be a non-empty string")
-    if not isinstance(resume_structure, list):
+    if not is_structure(resume_structure):
         raise ValueError("resume_structure must be a list")
         
     issues = []
-    required_sections = [
-        ('experience', 'work experience', 'employment history'),
-        ('education', 'academic background'),
-        ('skills', 'technical skills', 'key skills')
-    ]
     
     try:
-        # Pre-compile section patterns for better performance
-        section_patterns = {
-            section_group[0]: [
-                re.compile(rf'{re.escape(variant)}', re.IGNORECASE) 
-                for variant in section_group
-            ]
-            for section_group in required_sections
-        }
+        if index is None or not index.has_text:
+            index = build_structure_index(resume_structure, resume_text)
         
-        found_sections = {}
-        for section_name, patterns in section_patterns.items():
-            found = any(
-                pattern.search(resume_text) 
-                for pattern in patterns
-            )
-            if not found:
-                display_name = section_name.title()
+        for section_group in REQUIRED_SECTIONS:
+            if section_group[0] not in index.text_sections:
+                display_name = section_group[0].title()
                 issues.append({
                     'issue': f'Missing "{display_name}" section',
                     'advice': f'Add a clearly labeled "{display_name}" section.'
                 })
         
         # Check section order (basic check: name should be first, contact info near top)
-        # Extract headings from the structure list
-        headings = [
-            item['content'].lower().strip()
-            for item in resume_structure
-            if item.get('type') == 'heading' and item.get('content')
-        ]
-
-        if headings:
-            # Check if first heading looks like a name (simple heuristic)
-            first_heading = headings[0]
-            name_parts = first_heading.split()
+        if index.headings:
+            # Check if first heading looks like a name (simple heuristic, on the
+            # heading as written: capitalization is what identifies a name)
+            name_parts = index.headings[0].split()
             if not (2 <= len(name_parts) <= 4 and all(part[0].isupper() for part in name_parts if part)):
                 issues.append({
                     'issue': 'Name/contact information not at the top',
@@ -176,31 +163,29 @@ def check_sections(resume_text: str, resume_structure: List[Dict[str, Any]]) ->
             'advice': 'Could not analyze section structure. Please check the format.'
         }]
 
-def check_formatting(resume_structure: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def check_formatting(resume_structure: List[Dict[str, Any]],
+                     index: Optional[StructureIndex] = None) -> List[Dict[str, str]]:
     """Check formatting issues like fonts, spacing, and structure.
 
     Args:
         resume_structure: List containing parsed resume structure elements.
+        index: StructureIndex of resume_structure (built here if omitted).
 
     Returns:
         List of dictionaries, each containing 'issue' and 'advice' keys.
     """
-    if not isinstance(resume_structure, list):
+    if not is_structure(resume_structure):
         raise ValueError("resume_structure must be a list")
         
     issues = []
     
     try:
-        # Extract font sizes from structure list
-        font_sizes = [
-            float(item.get('font_size', 11))
-            for item in resume_structure
-            if 'font_size' in item and isinstance(item.get('font_size'), (int, float))
-        ]
+        if index is None:
+            index = build_structure_index(resume_structure)
 
-        if font_sizes:  # Only process if we have valid font sizes
-            min_size = min(font_sizes)
-            max_size = max(font_sizes)
+        if index.font_count:  # Only process if we have valid font sizes
+            min_size = index.font_min
+            max_size = index.font_max
 
             if min_size < MIN_FONT_SIZE:
                 issues.append({
@@ -216,16 +201,14 @@ def check_formatting(resume_structure: List[Dict[str, Any]]) -> List[Dict[str, s
                 })
 
         # Check for tables
-        table_count = sum(1 for item in resume_structure if item.get('type') == 'table')
-        if table_count > 0:
+        if index.table_count > 0:
             issues.append({
                 'issue': 'Uses tables or columns',
                 'advice': 'Avoid tables and columns as they may cause parsing issues with ATS.'
             })
 
         # Check for images/graphics
-        image_count = sum(1 for item in resume_structure if item.get('type') == 'image')
-        if image_count > 0:
+        if index.image_count > 0:
             issues.append({
                 'issue': 'Contains images or graphics',
                 'advice': 'Remove images, icons, and graphics as they are not ATS-friendly.'
@@ -240,39 +223,36 @@ def check_formatting(resume_structure: List[Dict[str, Any]]) -> List[Dict[str, s
             'advice': 'Could not analyze document formatting. Please check the file.'
         }]
 
-def check_content_quality(resume_text: str, resume_structure: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def check_content_quality(resume_text: str, resume_structure: List[Dict[str, Any]],
+                          index: Optional[StructureIndex] = None) -> List[Dict[str, str]]:
     """Check content quality issues like bullet points, action verbs, and length.
 
     Args:
         resume_text: The full text content of the resume.
         resume_structure: List containing parsed resume structure elements.
+        index: StructureIndex of resume_structure (built here if omitted).
 
     Returns:
         List of dictionaries, each containing 'issue' and 'advice' keys.
     """
     if not isinstance(resume_text, str) or not resume_text.strip():
         raise ValueError("resume_text must be a non-empty string")
-    if not isinstance(resume_structure, list):
+    if not is_structure(resume_structure):
         raise ValueError("resume_structure must be a list")
         
     issues = []
     
     try:
-        # Check bullet point usage by analyzing structure list
-        # Group bullets by section
-        current_section = None
-        section_bullets = {}
-
-        for item in resume_structure:
-            if item.get('type') == 'heading':
-                heading = item.get('content', '').lower().strip()
-                if any(exp in heading for exp in ['experience', 'work experience', 'projects', 'education']):
-                    current_section = heading
-                    section_bullets[current_section] = 0
-                else:
-                    current_section = None
-            elif item.get('type') == 'bullet' and current_section:
-                section_bullets[current_section] += 1
+        if index is None:
+            index = build_structure_index(resume_structure)
+        
+        # Bullets per experience/projects/education section (a repeated
+        # heading keeps the count of its last occurrence)
+        section_bullets = {
+            section.key: section.bullets
+            for section in index.sections
+            if any(exp in section.key for exp in BULLET_SECTION_KEYWORDS)
+        }
 
         # Check bullet counts per section
         for section_name, bullet_count in section_bullets.items():
@@ -289,22 +269,8 @@ def check_content_quality(resume_text: str, resume_structure: List[Dict[str, Any
                     'advice': f'Limit to {MAX_BULLETS_PER_SECTION} bullet points per position for better readability.'
                 })
         
-        # Check for action verbs using pre-compiled patterns
-        # Expand the action_verbs list (original has 12; add more for coverage):
-        action_verbs = [
-            'achieved', 'managed', 'increased', 'developed', 'led', 'implemented',
-            'created', 'improved', 'reduced', 'designed', 'launched', 'spearheaded',
-            'built', 'optimized', 'analyzed', 'collaborated', 'mentored', 'taught',  # Add these
-            'coordinated', 'executed', 'facilitated', 'generated', 'resolved'  # More common ones
-        ]
-
-        # Update the pattern to match word boundaries but allow suffixes (e.g., 'developing'):
-        action_verb_pattern = re.compile(
-            r'\b(' + '|'.join(map(re.escape, action_verbs)) + r')\w*\b',  # Add \w* for variations like 'developed' or 'developing'
-            re.IGNORECASE
-        )
-        
-        if not action_verb_pattern.search(resume_text):
+        # Check for action verbs using the pre-compiled pattern
+        if not ACTION_VERB_REGEX.search(resume_text):
             issues.append({
                 'issue': 'Weak action verbs',
                 'advice': 'Start bullet points with strong action verbs (e.g., "Led", "Developed", "Increased").'
@@ -322,13 +288,16 @@ def check_content_quality(resume_text: str, resume_structure: List[Dict[str, Any
             'advice': 'Could not analyze resume content. Please check the format.'
         }]
 
-def analyze_resume_structure(resume_text: str, resume_structure: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+def analyze_resume_structure(resume_text: str, resume_structure: List[Dict[str, Any]],
+                             index: Optional[StructureIndex] = None) -> List[Dict[str, str]]:
     """
     Comprehensive analysis of resume structure and content for ATS optimization.
 
     Args:
         resume_text (str): Full text content of the resume
         resume_structure (List[Dict[str, Any]]): Parsed resume structure from parser.py
+        index (StructureIndex): Optional index built with both arguments, e.g.
+            shared with ATS scoring; built here if omitted
 
     Returns:
         list: List of dictionaries, each containing 'issue' and 'advice' keys
@@ -339,17 +308,21 @@ def analyze_resume_structure(resume_text: str, resume_structure: List[Dict[str,
             'advice': 'Provide valid resume text for analysis.'
         }]
 
-    if not resume_structure or not isinstance(resume_structure, list):
+    if not resume_structure or not is_structure(resume_structure):
         resume_structure = []
     
     # Initialize list to collect all issues
     all_issues = []
     
+    # One pass over the structure, shared by all checks
+    if index is None or not index.has_text:
+        index = build_structure_index(resume_structure, resume_text)
+    
     # Run all checks
-    _, _, contact_issues = check_contact_info(resume_text)
-    section_issues = check_sections(resume_text, resume_structure)
-    formatting_issues = check_formatting(resume_structure)
-    content_issues = check_content_quality(resume_text, resume_structure)
+    _, _, contact_issues = check_contact_info(resume_text, index)
+    section_issues = check_sections(resume_text, resume_structure, index)
+    formatting_issues = check_formatting(resume_structure, index)
+    content_issues = check_content_quality(resume_text, resume_structure, index)
     
     # Combine all issues
     all_issues.extend(contact_issues)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+result_store.py
+Persistent store of finished analyses, shared by all workers on the host and
+kept across restarts.
+
+/process looks a request up by coalesce.analysis_key (resume content,
+normalized JD, engine, parser and scorer versions) before parsing anything;
+a hit is returned without recomputing. Each row also records
+analysis_version(), a fingerprint of everything else that changes results:
+
+- parser.PARSER_VERSION and pipeline.SCORER_VERSION
+- the weights, keyword lists and other constants of ATSCalculator and
+  LiteATSCalculator
+- the skill database (skill_artifact.skill_db_version), lexicons and the
+  synonym threshold (skill_vectors.SKILL_SYNONYM_THRESHOLD)
+
+so editing a weight or rebuilding the skill artifact turns every stored
+result into a miss without a manual flush. Only analyses whose stages all
+completed at full fidelity are stored; a result degraded by the request
+deadline or computed at a reduced tier under load (fidelity.py) is not.
+
+main.py keeps a second store (resumes.sqlite3, versioned by PARSER_VERSION
+alone) with the parse of every uploaded resume under a random token issued
+to the uploader, for clients that send resume_token instead of the file.
+
+Payloads are zlib-compressed JSON. A lookup is one primary-key read plus
+decompression, well under a millisecond for a typical resume, against
+seconds for an analysis. put() evicts least recently used rows once the
+payloads exceed max_bytes; compact() also deletes rows of old versions and
+returns free pages to the filesystem. The API runs it periodically;
+offline:
+
+    python result_store.py info
+    python result_store.py compact
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Dict, Hashable, List, Optional
+
+from encoding import encode
+from local_db import ProcessConnection
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+# Same location as main.Config.DATA_DIR
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+RESULTS_DB = "results.sqlite3"
+
+ACCESS_RESOLUTION = 60  # seconds; last-access times are refreshed at most this often
+EVICT_TARGET = 0.9      # eviction frees space down to this fraction of max_bytes
+
+_version: Optional[str] = None
+
+
+def _constants(cls) -> Dict[str, Any]:
+    """Upper-case class attributes: scalars, and sets (sorted) and tuples such as IMPORTANT_KEYWORDS."""
+    constants: Dict[str, Any] = {}
+    for name, value in vars(cls).items():
+        if not name.isupper():
+            continue
+        if isinstance(value, (int, float, str)):
+            constants[name] = value
+        elif isinstance(value, (set, frozenset)):
+            constants[name] = sorted(map(str, value))
+        elif isinstance(value, (tuple, list)):
+            constants[name] = [str(item) for item in value]
+    return constants
+
+
+def analysis_version() -> str:
+    """Fingerprint of the parser, scorers and skill database (computed once per process)."""
+    global _version
+    if _version is None:
+        from ats_calculator import ATSCalculator
+        from lexicons import COMMON_SKILLS, SKILL_ALIASES
+        from lite_scorer import LiteATSCalculator
+        from parser import PARSER_VERSION
+        from pipeline import SCORER_VERSION
+        from skill_artifact import skill_db_version
+        from skill_vectors import SKILL_SYNONYM_THRESHOLD
+
+        parts = {
+            "parser": PARSER_VERSION,
+            "scorer": SCORER_VERSION,
+            "full": _constants(ATSCalculator),
+            "lite": _constants(LiteATSCalculator),
+            "skill_db": skill_db_version(),
+            "skills": sorted(COMMON_SKILLS),
+            "aliases": sorted(SKILL_ALIASES.items()),
+            "synonym_threshold": SKILL_SYNONYM_THRESHOLD,
+        }
+        blob = json.dumps(parts, sort_keys=True).encode("utf-8")
+        _version = hashlib.sha256(blob).hexdigest()[:16]
+    return _version
+
+
+def is_complete(payload: Dict[str, Any]) -> bool:
+    """
+    Whether every stage of an analysis ran to completion at full fidelity
+    (without a JD, stages after parsing are skipped).
+    """
+    from fidelity import FULL
+    from pipeline import COMPLETED, SKIPPED
+
+    if payload.get("fidelity", FULL) != FULL:
+        return False
+    allowed = (COMPLETED,) if payload.get("jd_text") else (COMPLETED, SKIPPED)
+    return all(stage["status"] in allowed for stage in payload.get("stages") or [])
+
+
+def _row_key(key: Hashable) -> str:
+    return hashlib.sha256("\0".join(map(str, key)).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """Compressed analysis payloads in a SQLite table, with LRU eviction by size."""
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024, version: Optional[str] = None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.version = version or analysis_version()
+        self._lock = threading.Lock()
+        self._written = 0  # payload bytes written since the last size check
+        # Opened in each process on first use: main.py builds its stores before forking
+        self._db = ProcessConnection(db_path, self._setup, timeout=5)
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self._db.get()
+
+    @staticmethod
+    def _setup(conn: sqlite3.Connection) -> None:
+        with conn:
+            # Before the first table: lets compact() shrink the file without a full VACUUM
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL, payload BLOB NOT NULL,"
+                " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Stored payload for an analysis key, or None (also on database errors)."""
+        row_key = _row_key(key)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT payload, accessed_at FROM results WHERE key = ? AND version = ?",
+                    (row_key, self.version),
+                ).fetchone()
+                if row is not None and row[1] < now - ACCESS_RESOLUTION:
+                    with self._conn:
+                        self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, row_key))
+        except sqlite3.Error as e:
+            print(f"Warning: Result store lookup failed: {str(e)}")
+            return None
+        if row is None:
+            return None
+        data = zlib.decompress(row[0])
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+
+    def put(self, key: Hashable, payload: Dict[str, Any]) -> bool:
+        """Store a finished analysis; incomplete ones are ignored. Returns whether it was stored."""
+        if not is_complete(payload):
+            return False
+        blob = zlib.compress(encode(payload))
+        now = time.time()
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results (key, version, payload, size, created_at, accessed_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (_row_key(key), self.version, sqlite3.Binary(blob), len(blob), now, now),
+                    )
+                self._written += len(blob)
+                check = self._written > self.max_bytes * (1 - EVICT_TARGET) / 2
+                if check:
+                    self._written = 0
+            if check:
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not store analysis result: {str(e)}")
+            return False
+        return True
+
+    def evict(self) -> int:
+        """Delete least recently used rows until the payloads fit in max_bytes. Returns rows deleted."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            excess = total - int(self.max_bytes * EVICT_TARGET)
+            keys: List[str] = []
+            for row_key, size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at"):
+                keys.append(row_key)
+                excess -= size
+                if excess <= 0:
+                    break
+            with self._conn:
+                self._conn.executemany("DELETE FROM results WHERE key = ?", ((k,) for k in keys))
+        return len(keys)
+
+    def compact(self) -> Dict[str, int]:
+        """Drop rows of other versions, evict down to max_bytes and release free pages."""
+        with self._lock:
+            with self._conn:
+                stale = self._conn.execute("DELETE FROM results WHERE version != ?", (self.version,)).rowcount
+        evicted = self.evict()
+        with self._lock:
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"stale": stale, "evicted": evicted, **self.stats()}
+
+    def stats(self) -> Dict[str, int]:
+        """Row count, payload bytes and database file size."""
+        with self._lock:
+            rows, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            pages, page_size = (self._conn.execute(f"PRAGMA {p}").fetchone()[0] for p in ("page_count", "page_size"))
+        return {"rows": rows, "payload_bytes": size, "file_bytes": pages * page_size}
+
+
+def start_compaction(store: ResultStore, interval: float) -> threading.Event:
+    """Compact `store` every `interval` seconds in a daemon thread; set the returned event to stop."""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            try:
+                store.compact()
+            except sqlite3.Error as e:
+                print(f"Warning: Result store compaction failed: {str(e)}")
+
+    threading.Thread(target=run, name="result-store-compaction", daemon=True).start()
+    return stop
+
+
+def main() -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Inspect or compact the analysis result store")
+    ap.add_argument("command", choices=("info", "compact"))
+    ap.add_argument("--db", default=os.path.join(DATA_DIR, RESULTS_DB))
+    ap.add_argument("--max-mb", type=float, default=float(os.environ.get("RESULT_STORE_MAX_MB", "256")))
+    args = ap.parse_args()
+
+    store = ResultStore(args.db, max_bytes=int(args.max_mb * 1024 * 1024))
+    report = store.compact() if args.command == "compact" else store.stats()
+    print(json.dumps({"version": store.version, **report}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+resume_structure.py
+Compact, columnar container for parsed resume structure.
+
+The parsers used to return a list with one dict per line. Each dict repeated
+the keys 'type', 'content', 'font_size' and 'page' and boxed every value, and
+that dominated the memory of cached parses and batch jobs. ResumeStructure
+keeps the same data in columns:
+
+    types       array('B')  element type codes (index into ELEMENT_TYPES)
+    flags       array('B')  which optional fields are present
+    font_sizes  array('d')
+    pages       array('H')
+    offsets     array('I')  contents stored back to back in one string
+    extras      {row: dict} rare keys (table_num, image_num, bbox, ...)
+
+Consumers see a read-only sequence of Mapping views, so code written for the
+list of dicts (item.get('type'), item['content'], 'font_size' in item) keeps
+working unchanged. Producers call append() with the usual element dict.
+Conversion back to dicts happens only at the JSON boundary (to_list()).
+
+Usage:
+    >>> structure = ResumeStructure()
+    >>> structure.append({"type": "heading", "content": "Experience", "font_size": 12.0, "page": 1})
+    >>> structure[0]["content"], len(structure)
+    ('Experience', 1)
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ELEMENT_TYPES = ("heading", "bullet", "text", "table", "image")
+_TYPE_CODES = {name: code for code, name in enumerate(ELEMENT_TYPES)}
+
+# Bits in `flags`
+_HAS_CONTENT = 1
+_HAS_FONT = 2
+_HAS_PAGE = 4
+
+_CORE_KEYS = ("type", "content", "font_size", "page")
+
+
+class ResumeElement(Mapping):
+    """Read-only dict-like view of one row of a ResumeStructure."""
+
+    __slots__ = ("_structure", "_row")
+
+    def __init__(self, structure: "ResumeStructure", row: int):
+        self._structure = structure
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._structure._field(self._row, key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._structure._field(self._row, key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: object) -> bool:
+        return self._structure._field(self._row, key) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        s, row = self._structure, self._row
+        flags = s._flags[row]
+        yield "type"
+        if flags & _HAS_CONTENT:
+            yield "content"
+        if flags & _HAS_FONT:
+            yield "font_size"
+        if flags & _HAS_PAGE:
+            yield "page"
+        extra = s._extras.get(row)
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ResumeElement({dict(self)!r})"
+
+
+class _Missing:
+    __slots__ = ()
+
+
+_MISSING = _Missing()
+
+
+class ResumeStructure(Sequence):
+    """Columnar resume structure with a read-only sequence-of-mappings API."""
+
+    __slots__ = ("_types", "_flags", "_font_sizes", "_pages", "_offsets", "_chunks", "_text", "_extras")
+
+    def __init__(self, elements: Optional[Iterable[Dict[str, Any]]] = None):
+        self._types = array("B")
+        self._flags = array("B")
+        self._font_sizes = array("d")
+        self._pages = array("H")
+        self._offsets = array("I", [0])
+        self._chunks: List[str] = []  # contents appended since the last join
+        self._text = ""
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        if elements is not None:
+            for element in elements:
+                self.append(element)
+
+    # -----------------------
+    # Building
+    # -----------------------
+    def append(self, element: Dict[str, Any]) -> None:
+        """Add one element dict (as produced by the parsers)."""
+        kind = element.get("type")
+        code = _TYPE_CODES.get(kind)
+        if code is None:
+            raise ValueError(f"Unknown element type {kind!r}; expected one of: {', '.join(ELEMENT_TYPES)}")
+
+        flags = 0
+        content = element.get("content")
+        if content is not None:
+            flags |= _HAS_CONTENT
+            content = str(content)
+            self._chunks.append(content)
+        font_size = element.get("font_size")
+        if "font_size" in element and isinstance(font_size, (int, float)):
+            flags |= _HAS_FONT
+        page = element.get("page")
+        if isinstance(page, int) and 0 <= page <= 0xFFFF:
+            flags |= _HAS_PAGE
+
+        row = len(self._types)
+        self._types.append(code)
+        self._flags.append(flags)
+        self._font_sizes.append(float(font_size) if flags & _HAS_FONT else 0.0)
+        self._pages.append(page if flags & _HAS_PAGE else 0)
+        self._offsets.append(self._offsets[-1] + (len(content) if content is not None else 0))
+
+        extra = {
+            key: value for key, value in element.items()
+            if key not in _CORE_KEYS
+            or (key == "font_size" and not flags & _HAS_FONT)
+            or (key == "page" and not flags & _HAS_PAGE)
+        }
+        if extra:
+            self._extras[row] = extra
+
+    def extend(self, other: "ResumeStructure") -> None:
+        """Append all elements of another ResumeStructure (column-wise; `other` is not modified)."""
+        base_row, base_offset = len(self._types), self._offsets[-1]
+        self._types.extend(other._types)
+        self._flags.extend(other._flags)
+        self._font_sizes.extend(other._font_sizes)
+        self._pages.extend(other._pages)
+        self._offsets.extend(offset + base_offset for offset in other._offsets[1:])
+        self._chunks.append(other._text_snapshot())
+        for row, extra in other._extras.items():
+            self._extras[base_row + row] = dict(extra)
+
+    def copy(self) -> "ResumeStructure":
+        """Independent copy (e.g. a partial parse handed out while parsing continues)."""
+        other = ResumeStructure()
+        other._types = array("B", self._types)
+        other._flags = array("B", self._flags)
+        other._font_sizes = array("d", self._font_sizes)
+        other._pages = array("H", self._pages)
+        other._offsets = array("I", self._offsets)
+        other._text = self._text_snapshot()
+        other._extras = {row: dict(extra) for row, extra in self._extras.items()}
+        return other
+
+    # -----------------------
+    # Sequence API
+    # -----------------------
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ResumeElement(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ResumeStructure index out of range")
+        return ResumeElement(self, index)
+
+    def __iter__(self) -> Iterator[ResumeElement]:
+        for row in range(len(self._types)):
+            yield ResumeElement(self, row)
+
+    def __repr__(self) -> str:
+        return f"ResumeStructure({len(self)} elements)"
+
+    def __sizeof__(self) -> int:
+        size = object.__sizeof__(self)
+        for column in (self._types, self._flags, self._font_sizes, self._pages, self._offsets):
+            size += sys.getsizeof(column)
+        size += sys.getsizeof(self._joined())
+        size += sys.getsizeof(self._extras) + sum(sys.getsizeof(e) for e in self._extras.values())
+        return size
+
+    # -----------------------
+    # Fast paths and the JSON boundary
+    # -----------------------
+    def rows(self) -> Iterator[Tuple[str, Optional[str], Optional[float]]]:
+        """(type, content or None, font_size or None) per element, without views."""
+        text = self._joined()
+        offsets, flags, fonts = self._offsets, self._flags, self._font_sizes
+        for row, code in enumerate(self._types):
+            f = flags[row]
+            yield (
+                ELEMENT_TYPES[code],
+                text[offsets[row]:offsets[row + 1]] if f & _HAS_CONTENT else None,
+                fonts[row] if f & _HAS_FONT else None,
+            )
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Plain list of element dicts, for JSON responses."""
+        text = self._joined()
+        offsets, flags, fonts, pages, extras = self._offsets, self._flags, self._font_sizes, self._pages, self._extras
+        elements = []
+        for row, code in enumerate(self._types):
+            f = flags[row]
+            element = {"type": ELEMENT_TYPES[code]}
+            if f & _HAS_CONTENT:
+                element["content"] = text[offsets[row]:offsets[row + 1]]
+            if f & _HAS_FONT:
+                element["font_size"] = fonts[row]
+            if f & _HAS_PAGE:
+                element["page"] = pages[row]
+            if row in extras:
+                element.update(extras[row])
+            elements.append(element)
+        return elements
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _joined(self) -> str:
+        if self._chunks:
+            self._text += "".join(self._chunks)
+            self._chunks = []
+        return self._text
+
+    def _text_snapshot(self) -> str:
+        # Like _joined() but read-only, so a shared (e.g. cached) structure can
+        # be copied or extended from several threads
+        return self._text + "".join(self._chunks) if self._chunks else self._text
+
+    def _field(self, row: int, key: Any) -> Any:
+        flags = self._flags[row]
+        if key == "type":
+            return ELEMENT_TYPES[self._types[row]]
+        if key == "content":
+            if not flags & _HAS_CONTENT:
+                return _MISSING
+            return self._joined()[self._offsets[row]:self._offsets[row + 1]]
+        if key == "font_size" and flags & _HAS_FONT:
+            return self._font_sizes[row]
+        if key == "page" and flags & _HAS_PAGE:
+            return self._pages[row]
+        extra = self._extras.get(row)
+        if extra is not None and key in extra:
+            return extra[key]
+        return _MISSING
+
+
+def is_structure(value: Any) -> bool:
+    """True for the structure types the scorers accept (ResumeStructure or a list of dicts)."""
+    return isinstance(value, (list, ResumeStructure))
+
+
+def structure_to_list(structure: Any) -> List[Dict[str, Any]]:
+    """JSON-ready list of element dicts from either representation."""
+    if isinstance(structure, ResumeStructure):
+        return structure.to_list()
+    return list(structure or [])
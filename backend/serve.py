@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+serve.py
+Preload-then-fork server for the Resume Optimizer API.
+
+`uvicorn main:app --workers N` starts N fresh interpreters, each loading its
+own copy of en_core_web_lg and SkillNER. This entry point loads everything once
+in the master (see preload.py), then forks N workers that all serve the same
+listening socket. Model pages stay shared between the workers: the GC
+generation holding them is frozen and the vector table is a read-only mmap.
+
+The master restarts workers that exit (crash or planned recycling) and can
+print unique vs shared memory per worker.
+
+Workers grow over time (spaCy interns every new token, see memory_stats.py),
+so they can be recycled: after --max-requests requests (with per-worker
+jitter so they do not all restart together), or when --max-unique-mb or
+--max-vocab-strings is crossed. A recycled worker stops accepting
+connections, finishes its in-flight requests and exits; the master forks a
+replacement from the preloaded parent.
+
+Usage:
+    python serve.py --workers 4 --port 8000 --memory-report 60
+    python serve.py --workers 4 --max-requests 5000 --max-unique-mb 600
+"""
+
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict
+
+from memory_stats import RecyclePolicy, format_memory_report
+from preload import after_fork, preload_models
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, args) -> None:
+    """Body of a forked worker: serve until uvicorn exits, never return."""
+    import uvicorn
+
+    after_fork()
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    max_requests = None
+    if args.max_requests:
+        max_requests = args.max_requests + random.randint(0, max(0, args.max_requests_jitter))
+    # uvicorn shuts down gracefully once it has served limit_max_requests
+    config = uvicorn.Config(app, log_level=args.log_level, timeout_keep_alive=5,
+                            limit_max_requests=max_requests)
+    server = uvicorn.Server(config)
+    policy = RecyclePolicy(max_unique_mb=args.max_unique_mb, max_vocab_strings=args.max_vocab_strings)
+    if policy.enabled:
+        threading.Thread(target=_watch_memory, args=(server, policy, args.recycle_check),
+                         name="memory-watchdog", daemon=True).start()
+    code = 0
+    try:
+        server.run(sockets=[sock])
+    except Exception as e:
+        print(f"Worker {os.getpid()} crashed: {e}")
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def _watch_memory(server, policy: RecyclePolicy, interval: float) -> None:
+    """Ask uvicorn to exit gracefully once the worker crosses a memory limit."""
+    from suggest_skills import nlp
+
+    while not server.should_exit:
+        time.sleep(interval)
+        reason = policy.check(nlp=nlp)
+        if reason:
+            print(f"Worker {os.getpid()} recycling: {reason}")
+            server.should_exit = True
+
+
+def _spawn(app, sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        _run_worker(app, sock, args)
+    return pid
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Preforking server with shared, preloaded models")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--no-mmap-vectors", action="store_true",
+                    help="Keep the vector table on the heap instead of a read-only memory map")
+    ap.add_argument("--memory-report", type=float, default=0,
+                    help="Print unique vs shared memory per worker every N seconds (0 = off)")
+    ap.add_argument("--log-level", default="info")
+    ap.add_argument("--max-requests", type=int, default=0,
+                    help="Recycle a worker after this many requests (0 = never)")
+    ap.add_argument("--max-requests-jitter", type=int, default=0,
+                    help="Add up to this many requests to --max-requests, per worker")
+    ap.add_argument("--max-unique-mb", type=float, default=0,
+                    help="Recycle a worker once its private memory exceeds this (0 = off)")
+    ap.add_argument("--max-vocab-strings", type=int, default=0,
+                    help="Recycle a worker once spaCy's StringStore holds this many strings (0 = off)")
+    ap.add_argument("--recycle-check", type=float, default=30,
+                    help="Seconds between memory checks for --max-unique-mb / --max-vocab-strings")
+    args = ap.parse_args()
+
+    if not hasattr(os, "fork"):
+        print("serve.py needs os.fork(); use 'uvicorn main:app' on this platform")
+        return 1
+
+    print(f"Preloading models in master {os.getpid()}...")
+    # Import the app inside the preload so its module state is frozen with the models
+    report = preload_models(map_vectors=not args.no_mmap_vectors, extra_modules=("main",))
+    from main import app
+    print(f"Preload done: {report}")
+
+    sock = _bind_socket(args.host, args.port)
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    for _ in range(max(1, args.workers)):
+        workers[_spawn(app, sock, args)] = time.time()
+    print(f"Serving on {args.host}:{args.port} with workers {sorted(workers)}")
+
+    last_report = time.time()
+    while not stopping:
+        time.sleep(0.5)
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                break
+            started = workers.pop(pid, None)
+            if started is not None and not stopping:
+                print(f"Worker {pid} exited (status {status}) after {time.time() - started:.0f}s; respawning")
+                workers[_spawn(app, sock, args)] = time.time()
+
+        if args.memory_report and time.time() - last_report >= args.memory_report:
+            last_report = time.time()
+            print(format_memory_report([os.getpid()] + sorted(workers)))
+
+    print("Shutting down workers...")
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in list(workers):
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# skill_artifact.py
+"""
+Precompiled, memory-mappable skill matcher built from SkillNER's SKILL_DB.
+
+Importing skillNer.general_params.SKILL_DB materializes a large JSON dict and
+SkillExtractor then spends tens of seconds building its spaCy matchers in every
+process. This module moves that work to a one-off build step that writes a
+compact binary artifact:
+
+- an interned string table (skill ids, names, types, tokens) in one UTF-8 blob
+- numeric skill records and numeric token ids
+- an open-addressing hash table token -> token id (crc32, linear probing)
+- the surface-form patterns as token-id sequences, grouped by first token
+
+Everything is stored as flat little-endian uint32 arrays, so loading is an
+mmap plus a few memoryview casts: a few milliseconds, no per-skill Python
+objects, and the pages are shared by every worker process mapping the file.
+
+Usage:
+    python skill_artifact.py build [--out PATH]   # needs skillNer installed
+    python skill_artifact.py info [PATH]
+
+    artifact = get_skill_artifact()               # None if not built
+    skills = artifact.extract("Python, Docker and machine learning")
+"""
+
+from __future__ import annotations
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from array import array
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+
+# Bump whenever the binary layout changes; loaders reject other versions.
+FORMAT_VERSION = 1
+MAGIC = b"RSOSKDB\0"
+
+DEFAULT_ARTIFACT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "artifacts", f"skill_db.v{FORMAT_VERSION}.bin"
+)
+ARTIFACT_PATH = os.environ.get("SKILL_ARTIFACT_PATH", DEFAULT_ARTIFACT_PATH)
+
+# SKILL_MATCHER=artifact skips building SkillNER's matchers entirely and uses
+# the artifact for skill extraction (fast cold start for workers).
+USE_ARTIFACT_MATCHER = os.environ.get("SKILL_MATCHER", "skillner").strip().lower() == "artifact"
+
+# Pattern kinds, in priority order when two patterns of equal length match
+KIND_FULL = 0  # high surface form, full skill name
+KIND_ABV = 1   # high surface form, abbreviation
+KIND_LOW = 2   # low surface form (lemmatized variants)
+KIND_NAMES = {KIND_FULL: "full", KIND_ABV: "abv", KIND_LOW: "low"}
+
+# Same tokenization for patterns and documents: lowercase alnum runs, keeping
+# '+' and '#' so 'c++' / 'c#' survive; 'node.js' -> ['node', 'js'].
+MATCH_TOKEN_REGEX = re.compile(r"[a-z0-9+#]+")
+
+# magic, format version, fingerprint (sha256 of SKILL_DB), n_skills, n_tokens,
+# n_patterns, hash_size, n_strings
+HEADER_FMT = "<8sI32sIIIII"
+SECTIONS = (
+    "meta", "str_offsets", "str_blob", "skills", "tokens",
+    "token_hash", "patterns", "pattern_tokens", "first_index",
+)
+SECTION_FMT = "<" + "QQ" * len(SECTIONS)
+HEADER_SIZE = struct.calcsize(HEADER_FMT) + struct.calcsize(SECTION_FMT)
+
+
+class SkillMatch(NamedTuple):
+    """One matched span: skill record index, token span and matched surface text."""
+    skill: int
+    start: int
+    end: int
+    kind: int
+    surface: str
+
+
+def tokenize_for_match(text: str) -> List[str]:
+    return MATCH_TOKEN_REGEX.findall(text.lower()) if text else []
+
+
+# -----------------------
+# Build step
+# -----------------------
+def _surface_forms(entry: Dict) -> List[Tuple[str, int]]:
+    """Collect (form, kind) pairs from one SKILL_DB entry, tolerating schema drift."""
+    forms: List[Tuple[str, int]] = []
+    high = entry.get("high_surfce_forms") or entry.get("high_surface_forms") or {}
+    if isinstance(high, dict):
+        for key, value in high.items():
+            if isinstance(value, str) and value.strip():
+                forms.append((value, KIND_ABV if key.startswith("abv") else KIND_FULL))
+    for value in entry.get("low_surface_forms") or []:
+        if isinstance(value, str) and value.strip():
+            forms.append((value, KIND_LOW))
+    if not forms:
+        fallback = entry.get("skill_cleaned") or entry.get("skill_name") or ""
+        if fallback.strip():
+            forms.append((fallback, KIND_FULL))
+    return forms
+
+
+def _aligned(buf: bytearray) -> None:
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+def build_artifact(skill_db: Dict[str, Dict], path: str = ARTIFACT_PATH, source_version: str = "") -> Dict:
+    """
+    Compile SKILL_DB into the binary artifact at `path` (written atomically).
+    Returns the metadata dict stored in the artifact.
+    """
+    if sys.byteorder != "little":
+        raise ValueError("Skill artifact build is only supported on little-endian hosts")
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        idx = string_ids.get(s)
+        if idx is None:
+            idx = string_ids[s] = len(strings)
+            strings.append(s)
+        return idx
+
+    skills = array("I")
+    token_ids: Dict[str, int] = {}
+    token_strings = array("I")
+    raw_patterns: Dict[Tuple[Tuple[int, ...], int], int] = {}
+
+    for skill_key in sorted(skill_db):
+        entry = skill_db[skill_key] or {}
+        skill_idx = len(skills) // 3
+        skills.extend((
+            intern(skill_key),
+            intern(str(entry.get("skill_name", skill_key))),
+            intern(str(entry.get("skill_type", ""))),
+        ))
+        for form, kind in _surface_forms(entry):
+            toks = tokenize_for_match(form)
+            if not toks:
+                continue
+            ids = []
+            for tok in toks:
+                tid = token_ids.get(tok)
+                if tid is None:
+                    tid = token_ids[tok] = len(token_strings)
+                    token_strings.append(intern(tok))
+                ids.append(tid)
+            key = (tuple(ids), skill_idx)
+            raw_patterns[key] = min(kind, raw_patterns.get(key, kind))
+
+    # Patterns grouped by first token; longest first, then by kind priority,
+    # so the matcher can stop at the first hit for a position.
+    ordered = sorted(raw_patterns.items(), key=lambda kv: (kv[0][0][0], -len(kv[0][0]), kv[1], kv[0][1]))
+    patterns = array("I")
+    pattern_tokens = array("I")
+    first_index = array("I", [0]) * (len(token_strings) + 1)
+    for (ids, skill_idx), kind in ordered:
+        patterns.extend((skill_idx, len(pattern_tokens), len(ids), kind))
+        pattern_tokens.extend(ids)
+        first_index[ids[0] + 1] += 1
+    for i in range(1, len(first_index)):
+        first_index[i] += first_index[i - 1]
+
+    hash_size = 1
+    while hash_size < 2 * max(1, len(token_strings)):
+        hash_size <<= 1
+    token_hash = array("I", [0]) * hash_size
+    for tok, tid in token_ids.items():
+        h = zlib.crc32(tok.encode("utf-8")) & (hash_size - 1)
+        while token_hash[h]:
+            h = (h + 1) & (hash_size - 1)
+        token_hash[h] = tid + 1  # 0 marks an empty slot
+
+    blob = bytearray()
+    str_offsets = array("I", [0])
+    for s in strings:
+        blob.extend(s.encode("utf-8"))
+        str_offsets.append(len(blob))
+
+    fingerprint = hashlib.sha256(json.dumps(skill_db, sort_keys=True).encode("utf-8")).digest()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "source_version": source_version,
+        "fingerprint": fingerprint.hex(),
+        "built_at": time.time(),
+        "skills": len(skills) // 3,
+        "tokens": len(token_strings),
+        "patterns": len(patterns) // 4,
+    }
+
+    payloads = {
+        "meta": json.dumps(meta).encode("utf-8"),
+        "str_offsets": str_offsets.tobytes(),
+        "str_blob": bytes(blob),
+        "skills": skills.tobytes(),
+        "tokens": token_strings.tobytes(),
+        "token_hash": token_hash.tobytes(),
+        "patterns": patterns.tobytes(),
+        "pattern_tokens": pattern_tokens.tobytes(),
+        "first_index": first_index.tobytes(),
+    }
+    body = bytearray(b"\0" * HEADER_SIZE)
+    _aligned(body)
+    section_table = []
+    for name in SECTIONS:
+        data = payloads[name]
+        section_table.extend((len(body), len(data)))
+        body.extend(data)
+        _aligned(body)
+    struct.pack_into(
+        HEADER_FMT, body, 0, MAGIC, FORMAT_VERSION, fingerprint,
+        len(skills) // 3, len(token_strings), len(patterns) // 4, hash_size, len(strings),
+    )
+    struct.pack_into(SECTION_FMT, body, struct.calcsize(HEADER_FMT), *section_table)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return meta
+
+
+# -----------------------
+# Loader / matcher
+# -----------------------
+class SkillArtifact:
+    """Read-only view over a memory-mapped skill artifact."""
+
+    def __init__(self, path: str = ARTIFACT_PATH):
+        if sys.byteorder != "little":
+            raise ValueError("Skill artifact is stored little-endian; unsupported host byte order")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        buf = memoryview(self._mmap)
+        self._views = [buf]  # released in reverse order by close()
+        if len(buf) < HEADER_SIZE:
+            raise ValueError(f"Skill artifact {path} is truncated")
+
+        (magic, version, fingerprint, self.n_skills, self.n_tokens,
+         self.n_patterns, self._hash_size, self.n_strings) = struct.unpack_from(HEADER_FMT, buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a skill artifact")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Skill artifact {path} has format v{version}, expected v{FORMAT_VERSION}; rebuild it")
+        self.format_version = version
+        self.fingerprint = fingerprint.hex()
+
+        table = struct.unpack_from(SECTION_FMT, buf, struct.calcsize(HEADER_FMT))
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = table[2 * i], table[2 * i + 1]
+            if offset + length > len(buf):
+                raise ValueError(f"Skill artifact {path} is truncated (section {name})")
+            sections[name] = buf[offset:offset + length]
+            self._views.append(sections[name])
+
+        self.meta = json.loads(str(sections["meta"], "utf-8"))
+        self._blob = sections["str_blob"]
+        self._str_offsets = sections["str_offsets"].cast("I")
+        self._skills = sections["skills"].cast("I")
+        self._tokens = sections["tokens"].cast("I")
+        self._token_hash = sections["token_hash"].cast("I")
+        self._patterns = sections["patterns"].cast("I")
+        self._pattern_tokens = sections["pattern_tokens"].cast("I")
+        self._first_index = sections["first_index"].cast("I")
+        self._views.extend((self._str_offsets, self._skills, self._tokens, self._token_hash,
+                            self._patterns, self._pattern_tokens, self._first_index))
+
+    # -- string table --
+    def _string(self, idx: int) -> str:
+        return str(self._blob[self._str_offsets[idx]:self._str_offsets[idx + 1]], "utf-8")
+
+    def skill_key(self, skill: int) -> str:
+        return self._string(self._skills[3 * skill])
+
+    def skill_name(self, skill: int) -> str:
+        return self._string(self._skills[3 * skill + 1])
+
+    def skill_type(self, skill: int) -> str:
+        return self._string(self._skills[3 * skill + 2])
+
+    def token_id(self, token: str) -> int:
+        """Numeric id of a token, or -1 if it does not occur in any pattern."""
+        tb = token.encode("utf-8")
+        mask = self._hash_size - 1
+        h = zlib.crc32(tb) & mask
+        offsets = self._str_offsets
+        while True:
+            slot = self._token_hash[h]
+            if slot == 0:
+                return -1
+            si = self._tokens[slot - 1]
+            if self._blob[offsets[si]:offsets[si + 1]] == tb:
+                return slot - 1
+            h = (h + 1) & mask
+
+    # -- matching --
+    def match(self, text: str) -> List[SkillMatch]:
+        """Greedy longest-match, left to right, non-overlapping."""
+        toks = tokenize_for_match(text)
+        ids = [self.token_id(t) for t in toks]
+        patterns, ptoks, first = self._patterns, self._pattern_tokens, self._first_index
+        n = len(ids)
+        out: List[SkillMatch] = []
+        i = 0
+        while i < n:
+            tid = ids[i]
+            hit = None
+            if tid >= 0:
+                for p in range(first[tid], first[tid + 1]):
+                    base = 4 * p
+                    length = patterns[base + 2]
+                    if length > n - i:
+                        continue
+                    start = patterns[base + 1]
+                    if all(ptoks[start + k] == ids[i + k] for k in range(1, length)):
+                        hit = SkillMatch(patterns[base], i, i + length, patterns[base + 3],
+                                         " ".join(toks[i:i + length]))
+                        break
+            if hit is not None:
+                out.append(hit)
+                i = hit.end
+            else:
+                i += 1
+        return out
+
+    def extract(self, text: str, include_low: bool = False) -> Set[str]:
+        """
+        Matched surface texts, analogous to SkillNER's doc_node_value.
+        Low surface forms (SkillNER's n-gram layer) only with include_low=True.
+        """
+        return {m.surface for m in self.match(text) if include_low or m.kind != KIND_LOW}
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+_artifact_cache: Dict[str, Optional[SkillArtifact]] = {}
+
+
+def get_skill_artifact(path: str = ARTIFACT_PATH) -> Optional[SkillArtifact]:
+    """Load (once per process) and return the artifact, or None if unavailable."""
+    if path not in _artifact_cache:
+        try:
+            _artifact_cache[path] = SkillArtifact(path)
+        except FileNotFoundError:
+            _artifact_cache[path] = None
+        except Exception as e:
+            print(f"Warning: Could not load skill artifact {path}: {e}")
+            _artifact_cache[path] = None
+    return _artifact_cache[path]
+
+
+def _skillner_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("skillNer")
+    except Exception:
+        return ""
+
+
+def skill_db_version() -> str:
+    """Identifies the skill database in use: the artifact's SKILL_DB fingerprint, else the skillNer version."""
+    artifact = get_skill_artifact()
+    if artifact is not None:
+        return artifact.fingerprint
+    return _skillner_version()
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Build or inspect the precompiled skill artifact")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Compile skillNer's SKILL_DB into the artifact")
+    b.add_argument("--out", default=ARTIFACT_PATH)
+    i = sub.add_parser("info", help="Print artifact metadata and load time")
+    i.add_argument("path", nargs="?", default=ARTIFACT_PATH)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        start = time.perf_counter()
+        from skillNer.general_params import SKILL_DB
+        loaded = time.perf_counter()
+        meta = build_artifact(SKILL_DB, args.out, source_version=_skillner_version())
+        print(f"SKILL_DB import: {loaded - start:.2f}s, build: {time.perf_counter() - loaded:.2f}s")
+        print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1024 / 1024:.1f}MB): {meta}")
+        return 0
+
+    start = time.perf_counter()
+    artifact = SkillArtifact(args.path)
+    print(f"Loaded {args.path} in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(json.dumps(artifact.meta, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+skill_vectors.py
+Synonym-aware skill matching with the spaCy word vectors already in memory.
+
+Skill coverage used to be an exact set intersection, so 'postgres' against
+'postgresql' or 'react' against 'reactjs' counted as misses. SkillVectorIndex
+keeps a unit-normalized float32 embedding matrix (one row per skill) over the
+canonical skills (lexicons.COMMON_SKILLS), plus a small LRU cache of rows for
+other skills seen in JDs and resumes. match_skills() compares every unmatched
+JD skill against every resume skill with one matrix multiply and accepts the
+best resume skill at cosine similarity >= SKILL_SYNONYM_THRESHOLD.
+
+Skill vectors are the mean of the token vectors (nlp.make_doc, no pipeline
+run). Skills without any known token have a zero row and only match exactly.
+Without a vector table (e.g. en_core_web_sm) matching is exact only.
+
+Synonym matching is off by default (SKILL_SYNONYM_THRESHOLD=1) until the
+threshold has been tuned on labeled JD/resume pairs: sibling technologies
+('mysql' / 'postgresql') also sit close together in the vector space, so a
+low threshold credits skills the resume does not have. Set it below 1
+(e.g. 0.82) to enable it.
+
+Usage:
+    >>> matches = match_skills({"postgresql", "docker"}, {"postgres", "python"}, threshold=0.82)
+    >>> matches   # JD skill -> resume skill that covers it
+    {'postgresql': 'postgres'}
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from lexicons import COMMON_SKILLS
+
+SKILL_SYNONYM_THRESHOLD = float(os.environ.get("SKILL_SYNONYM_THRESHOLD", "1.0"))  # 1 = exact matches only
+SKILL_VECTOR_CACHE_SIZE = 4096  # non-canonical skill rows kept
+
+
+class SkillVectorIndex:
+    """Normalized skill embeddings: a fixed canonical matrix plus an LRU of other skills."""
+
+    def __init__(self, nlp, canonical: Iterable[str], cache_size: int = SKILL_VECTOR_CACHE_SIZE):
+        self.nlp = nlp
+        vectors = nlp.vocab.vectors
+        self.dim = vectors.shape[1] if vectors.shape[0] else 0
+        self.skills: List[str] = sorted(set(canonical))
+        self._rows = {skill: row for row, skill in enumerate(self.skills)}
+        self.matrix = self._embed(self.skills)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.dim > 0
+
+    def vectors(self, skills: List[str]) -> np.ndarray:
+        """(len(skills), dim) matrix of unit rows (zero rows for unknown words)."""
+        out = np.zeros((len(skills), self.dim), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for i, skill in enumerate(skills):
+                row = self._rows.get(skill)
+                if row is not None:
+                    out[i] = self.matrix[row]
+                    continue
+                cached = self._cache.get(skill)
+                if cached is not None:
+                    self._cache.move_to_end(skill)
+                    out[i] = cached
+                else:
+                    missing.append(i)
+        if missing:
+            embedded = self._embed([skills[i] for i in missing])
+            with self._lock:
+                for i, vector in zip(missing, embedded):
+                    out[i] = vector
+                    self._cache[skills[i]] = vector
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return out
+
+    def _embed(self, skills: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(skills), self.dim), dtype=np.float32)
+        if not self.enabled:
+            return matrix
+        for i, doc in enumerate(self.nlp.tokenizer.pipe(skills)):
+            matrix[i] = doc.vector
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+_index: Optional[SkillVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_skill_vector_index() -> SkillVectorIndex:
+    """Process-wide index over COMMON_SKILLS, built on first use (preload.py builds it before forking)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from suggest_skills import nlp
+                _index = SkillVectorIndex(nlp, COMMON_SKILLS)
+    return _index
+
+
+def match_skills(jd_skills: Set[str], resume_skills: Set[str],
+                 threshold: Optional[float] = None) -> Dict[str, str]:
+    """
+    Map every JD skill covered by the resume to the resume skill covering it:
+    exact matches first, then the most similar resume skill at cosine
+    similarity >= threshold (one vectorized comparison for all pairs).
+    """
+    threshold = SKILL_SYNONYM_THRESHOLD if threshold is None else threshold
+    matches = {skill: skill for skill in jd_skills & resume_skills}
+    if threshold >= 1.0:
+        return matches
+    jd_rest = sorted(jd_skills - resume_skills)
+    candidates = sorted(resume_skills)
+    if not jd_rest or not candidates:
+        return matches
+
+    index = get_skill_vector_index()
+    if not index.enabled:
+        return matches
+    similarity = index.vectors(jd_rest) @ index.vectors(candidates).T
+    best = similarity.argmax(axis=1)
+    best_similarity = similarity[np.arange(len(jd_rest)), best]
+    for i in np.flatnonzero(best_similarity >= threshold):
+        matches[jd_rest[i]] = candidates[best[i]]
+    return matches
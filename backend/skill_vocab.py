@@ -0,0 +1,163 @@
+"""
+skill_vocab.py
+Canonical skill vocabulary with integer ids, and skill sets as bitsets.
+
+Every extractor (suggest_skills, ats_calculator) cleans skill strings with
+normalize_skill() and resolves them through one SkillVocab:
+
+    'Node.js', 'nodejs', 'node js', 'node'  -> 'node.js'
+    'Postgres', 'PostgreSQL'                -> 'postgresql'
+
+Lookup is by a punctuation- and space-insensitive key, plus the alias table
+lexicons.SKILL_ALIASES. Only COMMON_SKILLS and their aliases get ids, so the
+vocabulary is fixed when the process starts and cannot grow with the skills
+seen in traffic.
+
+A set of skills is a SkillSet: a Python int with bit i set for canonical
+skill id i, plus a frozenset of the other (normalized) skill names. Coverage
+and missing skills are bitwise operations and popcounts on the canonical
+part, and a cached set costs a few machine words plus its rare other skills:
+
+    covered = jd_skills & resume_skills
+    missing = (jd_skills - resume_skills).bits   # canonical skills only
+
+Ids are fixed by COMMON_SKILLS, but keep SkillSets in memory only (caches,
+JD profiles): the skill list changes between releases.
+
+Usage:
+    >>> skills = vocab.encode({"postgres", "Docker", "Acme CRM"})
+    >>> skills.names()
+    ['docker', 'postgresql', 'acme crm']
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from lexicons import COMMON_SKILLS, SKILL_ALIASES
+
+# Stripped from both ends; '.', '+' and '#' are kept ('.net', 'c++', 'c#')
+_STRIP_CHARS = " ,;:!?()[]{}<>\"'`•*|/\\-–—"
+_KEY_REGEX = re.compile(r"[^a-z0-9+#]+")
+
+
+def normalize_skill(text: str) -> str:
+    """Lowercase, collapse whitespace and strip surrounding punctuation."""
+    return " ".join(text.lower().split()).strip(_STRIP_CHARS).rstrip(".")
+
+
+def _key(skill: str) -> str:
+    return _KEY_REGEX.sub("", skill.lower())
+
+
+def popcount(bits: int) -> int:
+    """Number of skills in a bitset."""
+    return bin(bits).count("1")
+
+
+class SkillSet:
+    """Canonical skills as a bitset of vocabulary ids, other skills as a frozenset of names."""
+
+    __slots__ = ("bits", "other")
+
+    def __init__(self, bits: int = 0, other: FrozenSet[str] = frozenset()):
+        self.bits = bits
+        self.other = other
+
+    def __and__(self, other: "SkillSet") -> "SkillSet":
+        return SkillSet(self.bits & other.bits, self.other & other.other)
+
+    def __or__(self, other: "SkillSet") -> "SkillSet":
+        return SkillSet(self.bits | other.bits, self.other | other.other)
+
+    def __sub__(self, other: "SkillSet") -> "SkillSet":
+        return SkillSet(self.bits & ~other.bits, self.other - other.other)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SkillSet) and (self.bits, self.other) == (other.bits, other.other)
+
+    def __hash__(self) -> int:
+        return hash((self.bits, self.other))
+
+    def __bool__(self) -> bool:
+        return bool(self.bits or self.other)
+
+    def __len__(self) -> int:
+        return popcount(self.bits) + len(self.other)
+
+    def __repr__(self) -> str:
+        return f"SkillSet({self.names()!r})"
+
+    def names(self) -> List[str]:
+        """Canonical names in id order, then the other skills sorted."""
+        return vocab.decode(self.bits) + sorted(self.other)
+
+
+class SkillVocab:
+    """Skill name <-> id mapping with alias resolution (COMMON_SKILLS and their aliases only)."""
+
+    def __init__(self, canonical: Iterable[str], aliases: Dict[str, str]):
+        self.names: List[str] = sorted(set(canonical))
+        self._ids: Dict[str, int] = {_key(name): i for i, name in enumerate(self.names)}  # lookup key -> id
+        for alias, name in aliases.items():
+            self._ids.setdefault(_key(alias), self._ids[_key(name)])
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def id(self, skill: str) -> Optional[int]:
+        """Id of a canonical skill (any spelling), or None for other skills."""
+        return self._ids.get(_key(skill))
+
+    def name(self, skill: str) -> Optional[str]:
+        """Canonical name of a known skill, the normalized text of any other; None if empty."""
+        if not _key(skill):
+            return None
+        skill_id = self._ids.get(_key(skill))
+        return self.names[skill_id] if skill_id is not None else normalize_skill(skill)
+
+    def canonical(self, skills: Iterable[str]) -> Set[str]:
+        """Canonical names of the given skills (other skills normalized)."""
+        return {name for name in map(self.name, skills) if name}
+
+    def encode(self, skills: Iterable[str]) -> SkillSet:
+        """SkillSet of the given skills; none is dropped."""
+        bits = 0
+        other = set()
+        for skill in skills:
+            skill_id = self._ids.get(_key(skill))
+            if skill_id is not None:
+                bits |= 1 << skill_id
+            elif _key(skill):
+                other.add(normalize_skill(skill))
+        return SkillSet(bits, frozenset(other))
+
+    def decode(self, bits: int) -> List[str]:
+        """Canonical names of the skills in a bitset, in id order."""
+        names = []
+        while bits:
+            low = bits & -bits
+            names.append(self.names[low.bit_length() - 1])
+            bits ^= low
+        return names
+
+
+vocab = SkillVocab(COMMON_SKILLS, SKILL_ALIASES)
+
+
+def cover(jd_skills: SkillSet, resume_skills: SkillSet,
+          threshold: Optional[float] = None) -> Tuple[SkillSet, Dict[str, str]]:
+    """
+    The JD skills the resume covers: the same skill (after alias resolution)
+    or a synonym by word vectors (skill_vectors.match_skills, run only on
+    the JD skills left over). Also returns the synonym pairs (JD skill ->
+    resume skill).
+    """
+    covered = jd_skills & resume_skills
+    rest = jd_skills - resume_skills
+    if not rest or not resume_skills:
+        return covered, {}
+
+    from skill_vectors import match_skills
+
+    synonyms = match_skills(set(rest.names()), set(resume_skills.names()), threshold)
+    return covered | vocab.encode(synonyms), synonyms
@@ -0,0 +1,181 @@
+"""
+structure_index.py
+Single-pass index over a parsed resume structure.
+
+The ATS scorers (ats_calculator, lite_scorer) and every restructure_advice
+check used to walk resume_structure on their own, several times per request,
+re-running regexes per element. build_structure_index() walks the elements
+once and records everything those checks read:
+
+- headings and a section map (heading -> element span, bullets per section)
+- bullet contents, in order
+- font-size stats, table and image counts
+- contact signals per element (ATS disqualifier rules)
+- optionally, signals from the full resume text (contact info and required
+  section names, used by the advice checks)
+
+All patterns are compiled once at import.
+
+Usage:
+    >>> index = build_structure_index(resume_structure, resume_text)
+    >>> index.sections[0].heading, index.table_count, index.has_email
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from resume_structure import ResumeStructure
+
+# Contact patterns checked per element (ATS disqualifier rules; broad phone formats)
+ELEMENT_EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[\w.-]+\.[A-Za-z]{2,}\b')
+ELEMENT_PHONE_REGEX = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{1,5}\)?[-.\s]?\d{3}[-.\s]?\d{3,5}')
+PROFILE_REGEX = re.compile(r'linkedin\.com/in/[\w-]+|github\.com/[\w-]+')
+
+# Contact patterns checked on the full text (restructure advice)
+EMAIL_REGEX = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
+PHONE_REGEX = re.compile(r'(\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+LINKEDIN_REGEX = re.compile(r'linkedin\.com/in/[\w-]+')
+GITHUB_REGEX = re.compile(r'github\.com/[\w-]+')
+
+# Section names looked for in the full text; the first variant names the group
+REQUIRED_SECTIONS = (
+    ('experience', 'work experience', 'employment history'),
+    ('education', 'academic background'),
+    ('skills', 'technical skills', 'key skills'),
+)
+
+
+@dataclass
+class Section:
+    """A heading and the elements that follow it, up to the next heading."""
+    heading: str  # heading content as written (stripped)
+    start: int    # index of the heading element
+    end: int      # index one past the last element of the section
+    bullets: int = 0
+
+    @property
+    def key(self) -> str:
+        return self.heading.lower()
+
+
+@dataclass
+class StructureIndex:
+    """Everything the scorers and advice checks read from a resume structure."""
+    element_count: int = 0
+    headings: List[str] = field(default_factory=list)
+    sections: List[Section] = field(default_factory=list)
+    bullets: List[str] = field(default_factory=list)
+
+    font_count: int = 0
+    font_min: Optional[float] = None
+    font_max: Optional[float] = None
+    table_count: int = 0
+    image_count: int = 0
+
+    # Per-element contact signals (ATS disqualifier rules)
+    has_name_heading: bool = False  # a heading of 1-5 words with a capitalized word
+    has_email: bool = False
+    has_phone_or_profile: bool = False
+
+    # Full-text signals; only set when the text was passed in
+    has_text: bool = False
+    text_name: bool = False  # first line looks like a full name
+    text_email: bool = False
+    text_phone: bool = False
+    text_profile: bool = False
+    text_sections: Set[str] = field(default_factory=set)
+
+    def bullets_by_section(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Bullet counts summed per section whose lowercased heading is one of `keys`."""
+        keys = set(keys)
+        counts: Counter = Counter()
+        for section in self.sections:
+            if section.key in keys:
+                counts[section.key] += section.bullets
+        return dict(counts)
+
+
+def build_structure_index(resume_structure: Any, resume_text: Optional[str] = None) -> StructureIndex:
+    """
+    Walk the structure elements once (and search the text once, if given).
+    Anything that is not a sequence of element dicts yields an empty index.
+    """
+    index = StructureIndex()
+    if resume_text:
+        _index_text(index, resume_text)
+    if not resume_structure or not hasattr(resume_structure, "__iter__"):
+        return index
+
+    # (type, content, font_size) per element; columnar structures skip the element views
+    if isinstance(resume_structure, ResumeStructure):
+        rows = resume_structure.rows()
+    else:
+        rows = (
+            (item.get("type"), item.get("content"), item.get("font_size") if "font_size" in item else None)
+            for item in resume_structure
+        )
+
+    current: Optional[Section] = None
+    position = -1
+    for position, (kind, raw_content, font_size) in enumerate(rows):
+        content = (raw_content or "").strip()
+
+        if kind == "heading":
+            if current is not None:
+                current.end = position
+            current = None
+            if content:
+                index.headings.append(content)
+                current = Section(heading=content, start=position, end=position + 1)
+                index.sections.append(current)
+                if not index.has_name_heading:
+                    parts = content.split()
+                    if 1 <= len(parts) <= 5 and any(p[0].isupper() for p in parts):
+                        index.has_name_heading = True
+        elif kind == "bullet":
+            index.bullets.append(raw_content if raw_content is not None else "")
+            if current is not None:
+                current.bullets += 1
+        elif kind == "table":
+            index.table_count += 1
+        elif kind == "image":
+            index.image_count += 1
+
+        if isinstance(font_size, (int, float)):
+            font_size = float(font_size)
+            index.font_count += 1
+            index.font_min = font_size if index.font_min is None else min(index.font_min, font_size)
+            index.font_max = font_size if index.font_max is None else max(index.font_max, font_size)
+
+        if content:
+            if not index.has_email and ELEMENT_EMAIL_REGEX.search(content):
+                index.has_email = True
+            if not index.has_phone_or_profile and (
+                ELEMENT_PHONE_REGEX.search(content) or PROFILE_REGEX.search(content.lower())
+            ):
+                index.has_phone_or_profile = True
+
+    index.element_count = position + 1
+    if current is not None:
+        current.end = index.element_count
+    return index
+
+
+def _index_text(index: StructureIndex, resume_text: str) -> None:
+    index.has_text = True
+
+    # Name: first line of the first 100 characters, 2-4 capitalized words
+    name_parts = resume_text[:100].strip().split('\n')[0].strip().split()
+    index.text_name = 2 <= len(name_parts) <= 4 and all(part and part[0].isupper() for part in name_parts)
+
+    index.text_email = bool(EMAIL_REGEX.search(resume_text))
+    index.text_phone = bool(PHONE_REGEX.search(resume_text))
+    index.text_profile = bool(LINKEDIN_REGEX.search(resume_text) or GITHUB_REGEX.search(resume_text))
+
+    text_lower = resume_text.lower()
+    index.text_sections = {
+        group[0] for group in REQUIRED_SECTIONS
+        if any(variant in text_lower for variant in group)
+    }
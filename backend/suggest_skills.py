@@ -1,9 +1,14 @@
 import re
 import spacy
 from spacy.matcher import PhraseMatcher
-from skillNer.skill_extractor_class import SkillExtractor
-from skillNer.general_params import SKILL_DB
-from typing import List, Set
+from typing import List, Optional, Set
+
+from lexicons import COMMON_SKILLS
+from skill_artifact import USE_ARTIFACT_MATCHER, get_skill_artifact
+from skill_vocab import SkillSet, cover, normalize_skill, vocab
+from deadline import DeadlineExceeded, check_deadline
+from fidelity import FULL, current_fidelity
+from jd_segmenter import focus_jd
 
 # Initialize spaCy model
 try:
@@ -14,45 +19,26 @@ except OSError:
     except OSError:
         raise ImportError("spaCy model not found. Please install en_core_web_lg or en_core_web_sm")
 
+def build_skill_extractor(nlp):
+    """
+    Build a SkillNER extractor, or return None when SKILL_MATCHER=artifact
+    (the precompiled skill artifact is used instead) or SkillNER is unavailable.
+    SkillNER is imported lazily so artifact mode never loads SKILL_DB.
+    """
+    if USE_ARTIFACT_MATCHER:
+        return None
+    try:
+        from skillNer.skill_extractor_class import SkillExtractor
+        from skillNer.general_params import SKILL_DB
+        # phrase_matcher = PhraseMatcher(nlp.vocab)
+        return SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+    except Exception as e:
+        print(f"Warning: Could not initialize SkillExtractor: {e}")
+        print("Falling back to basic skill extraction...")
+        return None
+
 # Initialize SkillExtractor globally with error handling
-try:
-    # phrase_matcher = PhraseMatcher(nlp.vocab)
-    skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
-except Exception as e:
-    print(f"Warning: Could not initialize SkillExtractor: {e}")
-    print("Falling back to basic skill extraction...")
-    skill_extractor = None
-
-# Common technical skills and keywords for pattern matching
-COMMON_SKILLS = {
-    # Programming Languages
-    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'c', 'ruby', 'php', 'swift', 'kotlin',
-    'go', 'rust', 'scala', 'r', 'matlab', 'perl', 'shell', 'bash', 'powershell',
-
-    # Web Technologies
-    'html', 'css', 'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring',
-    'laravel', 'ruby on rails', 'asp.net', '.net', 'jquery', 'bootstrap', 'sass', 'less',
-
-    # Databases
-    'sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite',
-    'nosql', 'cassandra', 'dynamodb', 'firebase',
-
-    # Cloud & DevOps
-    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
-    'terraform', 'ansible', 'chef', 'puppet', 'vagrant', 'linux', 'unix', 'windows',
-
-    # Data Science & ML
-    'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'keras', 'scikit-learn',
-    'pandas', 'numpy', 'matplotlib', 'seaborn', 'jupyter', 'tableau', 'power bi',
-    'data analysis', 'data science', 'statistics', 'excel',
-
-    # Mobile Development
-    'ios', 'android', 'react native', 'flutter', 'xamarin', 'cordova', 'ionic',
-
-    # Other Technologies
-    'api', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'kanban', 'jira',
-    'confluence', 'slack', 'teams', 'zoom'
-}
+skill_extractor = build_skill_extractor(nlp)
 
 def clean_phrase(text: str) -> str:
     """Clean and normalize text."""
@@ -61,7 +47,7 @@ def clean_phrase(text: str) -> str:
 def extract_skills(text: str) -> Set[str]:
     """
     Extract skills from text using SkillNER and pattern matching.
-    Returns a set of cleaned and normalized skill names.
+    Returns a set of canonical skill names (skill_vocab.py).
     """
     global skill_extractor
 
@@ -74,13 +60,17 @@ def extract_skills(text: str) -> Set[str]:
     if not text.strip():
         return skills
 
-    if skill_extractor is not None:
+    # Read once: a concurrent call may disable the extractor meanwhile.
+    # Below full fidelity (under load) SkillNER is skipped for the artifact.
+    extractor = skill_extractor if current_fidelity() == FULL else None
+
+    if extractor is not None:
         try:
-            annotations = skill_extractor.annotate(text)
+            annotations = extractor.annotate(text)
             # Get full matches
             full_matches = set()
             for match in annotations['results']['full_matches']:
-                skill = clean_phrase(match['doc_node_value'])
+                skill = normalize_skill(match['doc_node_value'])
                 if skill and len(skill) <= 100:  # Sanity check for skill length
                     full_matches.add(skill)
 
@@ -88,23 +78,32 @@ def extract_skills(text: str) -> Set[str]:
             ngram_matches = set()
             for match in annotations['results']['ngram_scored']:
                 if match.get('score', 0) > 0.7:
-                    skill = clean_phrase(match['doc_node_value'])
+                    skill = normalize_skill(match['doc_node_value'])
                     if skill and len(skill) <= 100:  # Sanity check
                         ngram_matches.add(skill)
 
             skills.update(full_matches.union(ngram_matches))
         except Exception as e:
             print(f"SkillNER extraction error: {e}")
-            skill_extractor = None  # Disable for future calls
+            skill_extractor = extractor = None  # Disable for future calls
+
+    # Precompiled skill artifact (see skill_artifact.py) when SkillNER is not available
+    artifact = get_skill_artifact() if extractor is None else None
+    if artifact is not None:
+        skills.update(
+            skill for skill in (normalize_skill(s) for s in artifact.extract(text, include_low=True))
+            if skill and len(skill) <= 100
+        )
 
-    # Fallback to pattern matching and common skills if SkillNER is not available
-    if skill_extractor is None:
-        # Use spaCy NER for basic skill detection
+    # Fallback to pattern matching and common skills if neither is available
+    if extractor is None and artifact is None:
+        # Use spaCy NER for basic skill detection (needs the ner component:
+        # full fidelity only, the common skills scan below covers reduced tiers)
         try:
-            doc = nlp(text)
-            for ent in doc.ents:
+            doc = nlp(text) if current_fidelity() == FULL else None
+            for ent in doc.ents if doc is not None else ():
                 if ent.label_ in ['PERSON', 'ORG', 'PRODUCT']:  # These might be skills/technologies
-                    skill = clean_phrase(ent.text)
+                    skill = normalize_skill(ent.text)
                     if skill and len(skill) <= 100 and skill.lower() in COMMON_SKILLS:
                         skills.add(skill.lower())
         except Exception as e:
@@ -124,9 +123,9 @@ def extract_skills(text: str) -> Set[str]:
     
     for pattern in skill_patterns:
         for match in re.finditer(pattern, text, re.IGNORECASE):
-            skills.update(clean_phrase(s) for s in re.split(r'[,/&+]', match.group(1)) if s.strip())
+            skills.update(normalize_skill(s) for s in re.split(r'[,/&]|\s\+\s', match.group(1)) if s.strip())
     
-    return skills
+    return vocab.canonical(skills)
 
 def extract_phrases(text: str) -> Set[str]:
     """
@@ -155,46 +154,64 @@ def extract_phrases(text: str) -> Set[str]:
     
     return phrases
 
-def get_missing_skills(jd_text: str, resume_text: str) -> List[str]:
+def get_missing_skills(jd_text: str, resume_text: str, jd_skills: Optional[Set[str]] = None) -> List[str]:
     """
     Find skills in job description that are missing from the resume using SkillNER.
     Returns a list of missing skills as strings, sorted by importance.
+    Only the relevant sections of the JD are searched (jd_segmenter.py).
+    Pass `jd_skills` (extract_skills(focus_jd(jd_text).text), at the same
+    fidelity tier, see JDProfile.skills_for) to skip re-extracting a known JD.
     """
     if not jd_text or not resume_text:
         return []
 
     try:
-        jd_skills = extract_skills(jd_text)
+        if jd_skills is None:
+            jd_skills = extract_skills(focus_jd(jd_text).text)
+            check_deadline("skills")
         resume_skills = extract_skills(resume_text)
+        return rank_missing_skills(jd_text, jd_skills, resume_skills)
 
-        # Find skills in JD that aren't in resume
-        missing_skills = jd_skills - resume_skills
-
-        # Filter to only skills in COMMON_SKILLS
-        filtered_missing = [
-            skill for skill in missing_skills 
-            if skill.lower() in COMMON_SKILLS and len(skill) > 2  # Only COMMON_SKILLS, skip short ones
-        ]
-
-        # Create result with skill details for sorting
-        skill_details = []
-        for skill in filtered_missing:
-            # Count occurrences in JD as a simple importance metric
-            importance = jd_text.lower().count(skill.lower())
-            skill_details.append({
-                'skill': skill,
-                'importance': importance
-            })
-
-        # Sort by importance (descending), then alphabetically
-        sorted_skills = sorted(
-            skill_details,
-            key=lambda x: (-x['importance'], x['skill'].lower())
-        )
-
-        # Return just the skill names as strings
-        return [item['skill'] for item in sorted_skills[:20]]  # Limit to top 20
-
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Error in get_missing_skills: {str(e)}")
         return []
+
+def rank_missing_skills(jd_text: str, jd_skills: Set[str], resume_skills: Set[str]) -> List[str]:
+    """
+    Rank JD skills absent from the resume, given already-extracted skill sets
+    (as returned by extract_skills).
+    """
+    return rank_missing_skill_bits(jd_text, vocab.encode(jd_skills), vocab.encode(resume_skills))
+
+def rank_missing_skill_bits(jd_text: str, jd_bits: SkillSet, resume_bits: SkillSet) -> List[str]:
+    """
+    rank_missing_skills for SkillSets (skill_vocab.py). Used directly by
+    callers that cache extractions, e.g. live_session.
+    """
+    # JD skills the resume covers under no spelling or synonym, restricted to COMMON_SKILLS
+    covered, _ = cover(jd_bits, resume_bits)
+    missing_bits = (jd_bits - covered).bits
+    filtered_missing = [skill for skill in vocab.decode(missing_bits) if len(skill) > 2]  # skip short ones
+
+    # Create result with skill details for sorting
+    focused = focus_jd(jd_text)
+    skill_details = []
+    for skill in filtered_missing:
+        # Count occurrences in the kept JD sections as a simple importance
+        # metric (nice-to-have mentions count less)
+        importance = focused.mentions(skill.lower())
+        skill_details.append({
+            'skill': skill,
+            'importance': importance
+        })
+
+    # Sort by importance (descending), then alphabetically
+    sorted_skills = sorted(
+        skill_details,
+        key=lambda x: (-x['importance'], x['skill'].lower())
+    )
+
+    # Return just the skill names as strings
+    return [item['skill'] for item in sorted_skills[:20]]  # Limit to top 20
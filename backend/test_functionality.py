@@ -9,6 +9,7 @@ import time
 from suggest_skills import get_missing_skills
 from ats_calculator import ATSCalculator
 from restructure_advice import analyze_resume_structure
+from lite_scorer import LiteATSCalculator, get_missing_skills_lite
 
 def test_suggest_skills():
     """Test the suggest_skills functionality."""
@@ -95,6 +96,13 @@ def test_ats_calculator():
         score = ats.total_score(resume_text, resume_structure)
         end_time = time.time()
         
+        # Content computed on another thread (as in the analysis graph): same score, details kept
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            content = executor.submit(ats.content_score, resume_text).result()
+        assert ats.total_score(resume_text, resume_structure, content=content) == score
+        assert "skill_synonyms" in ats.debug_details
+        
         print(f"✓ ATS calculator completed in {end_time - start_time:.2f} seconds")
         print(f"  ATS Score: {score}%")
         return True
@@ -142,6 +150,1154 @@ def test_restructure_advice():
         print(f"✗ Restructure advice failed: {str(e)}")
         return False
 
+def test_lite_scorer():
+    """Test the model-free lite scoring engine."""
+    print("Testing lite scorer...")
+    
+    jd_text = """
+    Software Engineer position requiring:
+    - 3+ years Python experience
+    - Machine learning knowledge, Docker and Kubernetes
+    - SQL databases
+    """
+    
+    resume_text = """
+    John Doe
+    john@email.com
+    
+    Experience:
+    Software Engineer (2019-2023)
+    - Developed Python applications
+    - Built machine learning models
+    - Led the migration to Docker
+    
+    Skills:
+    Python, SQL, Machine Learning
+    """
+    
+    resume_structure = [
+        {"type": "heading", "content": "John Doe", "font_size": 14},
+        {"type": "text", "content": "john@email.com", "font_size": 11},
+        {"type": "heading", "content": "Experience", "font_size": 12},
+        {"type": "bullet", "content": "Developed Python applications", "font_size": 11},
+        {"type": "bullet", "content": "Built machine learning models", "font_size": 11},
+        {"type": "bullet", "content": "Led the migration to Docker", "font_size": 11},
+        {"type": "heading", "content": "Skills", "font_size": 12},
+    ]
+    
+    try:
+        start_time = time.time()
+        lite = LiteATSCalculator(jd_text)
+        score = lite.total_score(resume_text, resume_structure)
+        missing = get_missing_skills_lite(jd_text, resume_text)
+        elapsed_ms = (time.time() - start_time) * 1000
+        
+        assert 0 < score <= 100, f"unexpected score {score}"
+        assert missing == ["kubernetes"], f"unexpected missing skills {missing}"
+        assert lite.debug_details["verb_starts"] == 3
+        print(f"✓ Lite scorer completed in {elapsed_ms:.1f} ms")
+        print(f"  Lite ATS Score: {score}%, missing: {missing}")
+        return True
+    except Exception as e:
+        print(f"✗ Lite scorer failed: {str(e)}")
+        return False
+
+def test_job_queue():
+    """Test the job queue lifecycle, including retry after a lost lease."""
+    print("Testing job queue...")
+    
+    import tempfile
+    from job_queue import JobQueue
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = JobQueue(f"{tmp}/jobs.sqlite3", lease_seconds=0.1, max_attempts=2)
+            job_id = queue.submit("resume.pdf", b"%PDF", jd_text="Python developer")
+            
+            job = queue.claim("worker-1")
+            assert job["job_id"] == job_id and job["file_bytes"] == b"%PDF"
+            assert queue.claim("worker-2") is None
+            
+            # worker-1 stops renewing its lease; the job is handed out again
+            time.sleep(0.2)
+            job = queue.claim("worker-2")
+            assert job["attempts"] == 2
+            assert not queue.complete(job_id, "worker-1", {"ats_score": 1})
+            assert queue.complete(job_id, "worker-2", {"ats_score": 42})
+            
+            status = queue.get(job_id)
+            assert status["status"] == "done" and status["result"] == {"ats_score": 42}
+        print("✓ Job queue completed")
+        return True
+    except Exception as e:
+        print(f"✗ Job queue failed: {str(e)}")
+        return False
+
+def test_response_projection():
+    """Test compact/fields projection of an analysis response."""
+    print("Testing response projection...")
+    
+    from projection import parse_fields, project, selected_fields, without_resume
+    from resume_structure import ResumeStructure
+    
+    try:
+        elements = [
+            {"type": "heading", "content": "Experience", "font_size": 14.0, "page": 1},
+            {"type": "bullet", "content": "• Built REST APIs with Python", "font_size": 11.0, "page": 1},
+        ]
+        structure = ResumeStructure(elements)
+        assert structure.to_list() == elements
+        payload = {
+            "success": True, "jd_text": "Python developer", "resume_text": "Experience ...",
+            "resume_structure": structure, "ats_score": 80.0, "suggested_skills": ["docker"],
+            "improvement_recommendation": [], "stages": [],
+        }
+        
+        compact = project(payload, selected_fields(None, True))
+        assert "resume_text" not in compact and "jd_text" not in compact
+        assert compact["structure_summary"]["bullet_count"] == 1
+        
+        selected = project(payload, parse_fields("ats_score"))
+        assert selected == {"success": True, "ats_score": 80.0}
+        
+        # Requests by resume_token never get the stored resume back
+        for selection in (None, parse_fields("resume_text,ats_score")):
+            projected = project(payload, without_resume(selection))
+            assert "resume_text" not in projected and "resume_structure" not in projected
+            assert projected["ats_score"] == 80.0
+        try:
+            parse_fields("ats_score,unknown")
+            raise AssertionError("unknown field accepted")
+        except ValueError:
+            pass
+        print("✓ Response projection completed")
+        return True
+    except Exception as e:
+        print(f"✗ Response projection failed: {str(e)}")
+        return False
+
+def test_docx_parser():
+    """Test the streaming DOCX parser on a minimal document."""
+    print("Testing DOCX parser...")
+    
+    import zipfile
+    from io import BytesIO
+    from parser import parse_docx_resume
+    
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    document = (
+        f'<w:document {ns}><w:body>'
+        '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Experience</w:t></w:r></w:p>'
+        '<w:p><w:pPr><w:numPr><w:ilvl w:val="0"/></w:numPr></w:pPr><w:r><w:t>Built APIs</w:t></w:r></w:p>'
+        '<w:tbl><w:tr><w:tc><w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Skills</w:t></w:r></w:p></w:tc>'
+        '<w:tc><w:p><w:r><w:t>Python</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+        '<w:p><w:r><w:br w:type="page"/><w:t>Education</w:t></w:r></w:p>'
+        '</w:body></w:document>'
+    )
+    styles = (
+        f'<w:styles {ns}><w:style w:type="paragraph" w:styleId="Heading1">'
+        '<w:name w:val="heading 1"/><w:rPr><w:sz w:val="28"/></w:rPr></w:style></w:styles>'
+    )
+    
+    try:
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("word/document.xml", document)
+            zf.writestr("word/styles.xml", styles)
+        text, structure = parse_docx_resume(buffer.getvalue())
+        elements = structure.to_list()
+        
+        # Cell paragraphs (layout-table templates) are elements too, before their table
+        assert [e["type"] for e in elements] == ["heading", "bullet", "heading", "text", "table", "text"]
+        assert elements[0]["font_size"] == 14.0
+        assert elements[2]["content"] == "Skills"
+        assert elements[4]["content"] == "Skills | Python"
+        assert elements[5]["page"] == 2
+        assert "Python" in text
+        print("✓ DOCX parser completed")
+        return True
+    except Exception as e:
+        print(f"✗ DOCX parser failed: {str(e)}")
+        return False
+
+def test_triage():
+    """Test that triage rejects unusable uploads with specific codes."""
+    print("Testing document triage...")
+    
+    from triage import TriageError, check_triage, triage_document
+    
+    def code(filename, file_bytes):
+        try:
+            check_triage(triage_document(filename, file_bytes), max_pages=10)
+            return "ok"
+        except TriageError as e:
+            return e.code
+    
+    try:
+        assert code("resume.pdf", b"plain text") == "not_a_pdf"
+        # Unreadable for PyPDF2: left to the parser
+        assert code("resume.pdf", b"%PDF-1.4\ntruncated") == "ok"
+        ole = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\0" * 504
+        assert code("resume.docx", ole + "EncryptedPackage".encode("utf-16-le")) == "encrypted"
+        assert code("resume.docx", ole + "WordDocument".encode("utf-16-le")) == "not_a_docx"
+        assert code("resume.docx", b"PK\x03\x04 not a zip") == "not_a_docx"
+        print("✓ Document triage completed")
+        return True
+    except Exception as e:
+        print(f"✗ Document triage failed: {str(e)}")
+        return False
+
+def test_skill_vocab():
+    """Test canonical skill ids, alias resolution and skill set coverage."""
+    print("Testing skill vocabulary...")
+    
+    from skill_vocab import vocab
+    
+    try:
+        assert vocab.id("Node JS") == vocab.id("nodejs") == vocab.id("node.js")
+        assert vocab.names[vocab.id("Postgres")] == "postgresql"
+        assert vocab.id("c++") != vocab.id("c")
+        jd_skills = vocab.encode({"postgresql", "kubernetes", "aws", "Acme CRM"})
+        resume_skills = vocab.encode({"postgres", "k8s", "python", "acme crm"})
+        assert len(jd_skills & resume_skills) == 3
+        assert (jd_skills - resume_skills).names() == ["aws"]
+        
+        # Other skills are kept per set, never interned: the vocabulary does not grow
+        size = len(vocab)
+        many = vocab.encode(f"in-house tool {n}" for n in range(1000))
+        assert len(many) == 1000 and len(vocab) == size and vocab.id("in-house tool 1") is None
+        print("✓ Skill vocabulary completed")
+        return True
+    except Exception as e:
+        print(f"✗ Skill vocabulary failed: {str(e)}")
+        return False
+
+def test_result_store():
+    """Test stored analyses: round trip, incomplete results, versions and eviction."""
+    print("Testing result store...")
+    
+    import tempfile
+    from result_store import ResultStore
+    
+    def payload(n, status="completed"):
+        return {"success": True, "jd_text": "Python developer", "resume_text": f"resume {n} " * 50,
+                "ats_score": n, "stages": [{"name": "parse", "status": status}]}
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ResultStore(f"{tmp}/results.sqlite3", max_bytes=1024, version="v1")
+            assert store.put(("a",), payload(1)) and store.get(("a",)) == payload(1)
+            assert not store.put(("b",), payload(2, status="degraded")) and store.get(("b",)) is None
+            
+            # A new scorer/parser/skill DB version misses, and compaction drops the old rows
+            newer = ResultStore(f"{tmp}/results.sqlite3", max_bytes=1024, version="v2")
+            assert newer.get(("a",)) is None
+            assert newer.compact()["stale"] == 1
+            
+            # Least recently used rows go once payloads exceed max_bytes
+            for n in range(20):
+                newer.put((n,), payload(n))
+            assert newer.stats()["payload_bytes"] <= 1024
+            assert newer.get((19,)) is not None and newer.get((0,)) is None
+        
+        # Keyword sets are part of the analysis version
+        import result_store
+        from ats_calculator import ATSCalculator
+        keywords = ATSCalculator.IMPORTANT_KEYWORDS
+        version = result_store.analysis_version()
+        try:
+            ATSCalculator.IMPORTANT_KEYWORDS = keywords | {"kubernetes operators"}
+            result_store._version = None
+            assert result_store.analysis_version() != version
+        finally:
+            ATSCalculator.IMPORTANT_KEYWORDS = keywords
+            result_store._version = None
+        print("✓ Result store completed")
+        return True
+    except Exception as e:
+        print(f"✗ Result store failed: {str(e)}")
+        return False
+
+def test_analysis_graph():
+    """Test that independent analysis nodes run concurrently, after their dependencies."""
+    print("Testing analysis graph...")
+    
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from pipeline import run_graph
+    
+    # a, b and c each wait until all three are running: they must overlap
+    barrier = threading.Barrier(3, timeout=5)
+    
+    def together(value):
+        barrier.wait()
+        return value
+    
+    graph = {
+        "a": ((), lambda: together(1)),
+        "b": ((), lambda: together(2)),
+        "c": ((), lambda: together(3)),
+        "total": (("a", "b", "c"), lambda a, b, c: a + b + c),
+    }
+    sequential = {
+        "a": ((), lambda: 1),
+        "b": ((), lambda: 2),
+        "total": (("a", "b"), lambda a, b: a + b),
+    }
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            start = time.time()
+            try:
+                results = run_graph(graph, executor)
+            except threading.BrokenBarrierError:
+                raise AssertionError("nodes did not overlap")
+            elapsed = time.time() - start
+        assert results["total"] == 6
+        assert run_graph(sequential)["total"] == 3  # one by one without an executor
+        print(f"✓ Analysis graph completed in {elapsed:.2f} seconds")
+        return True
+    except Exception as e:
+        print(f"✗ Analysis graph failed: {str(e)}")
+        return False
+
+def test_fidelity_controller():
+    """Test that the fidelity tier drops under load and recovers after the hold time."""
+    print("Testing fidelity controller...")
+    
+    from contextlib import ExitStack
+    from fidelity import FULL, MINIMAL, TRIMMED, FidelityController
+    
+    controller = FidelityController(in_flight_limits=(2, 3), latency_limits=(60.0, 120.0), hold_seconds=0.2)
+    try:
+        assert controller.tier() == FULL
+        with ExitStack() as stack:
+            stack.enter_context(controller.track())
+            stack.enter_context(controller.track())
+            assert controller.tier() == TRIMMED
+            stack.enter_context(controller.track())
+            assert controller.tier() == MINIMAL
+        assert controller.tier() == MINIMAL  # held before stepping back up
+        time.sleep(0.25)
+        assert controller.tier() == TRIMMED  # one tier at a time
+        time.sleep(0.25)
+        assert controller.tier() == FULL
+        print("✓ Fidelity controller stepped down and recovered")
+        return True
+    except Exception as e:
+        print(f"✗ Fidelity controller failed: {str(e)}")
+        return False
+
+def test_fidelity_skills():
+    """Test that JD skills come from the same extractor as resume skills at every tier."""
+    print("Testing skills per fidelity tier...")
+    
+    import suggest_skills
+    from fidelity import TRIMMED, fidelity_scope
+    from jd_registry import analyze_jd
+    
+    class FakeSkillNER:
+        def annotate(self, text):
+            return {"results": {"full_matches": [{"doc_node_value": "skillner only"}], "ngram_scored": []}}
+    
+    jd_text = "Requirements: 3+ years of Python and Docker experience building backend services."
+    saved = suggest_skills.skill_extractor
+    suggest_skills.skill_extractor = FakeSkillNER()
+    try:
+        profile = analyze_jd("test", jd_text, float("inf"))
+        assert "skillner only" in profile.skills and "skillner only" in profile.calculator.jd_skills
+        assert "skillner only" not in profile.skills_for(TRIMMED)
+        assert "python" in profile.skills_for(TRIMMED)
+        with fidelity_scope(TRIMMED):
+            assert "skillner only" not in profile.calculator.jd_skills
+            assert "skillner only" not in suggest_skills.extract_skills(jd_text)
+        print("✓ Skills per fidelity tier completed")
+        return True
+    except Exception as e:
+        print(f"✗ Skills per fidelity tier failed: {str(e)}")
+        return False
+    finally:
+        suggest_skills.skill_extractor = saved
+
+def test_admission_control():
+    """Test that admission runs a bounded number at once, queues a few and rejects the rest."""
+    print("Testing admission control...")
+    
+    import asyncio
+    from admission import AdmissionController, Overloaded
+    
+    async def scenario():
+        admission = AdmissionController(limit=1, max_queue=1, max_wait=0.2)
+        assert await admission.acquire() == 0.0
+        queued = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.waiting == 1
+        try:
+            await admission.acquire()
+            raise AssertionError("third request was admitted past a full queue")
+        except Overloaded as e:
+            assert e.reason == "queue_full" and e.retry_after >= 1
+        admission.release(0.05)  # hands the slot to the queued request
+        await queued
+        try:
+            await admission.acquire()
+            raise AssertionError("request was admitted while the slot was busy")
+        except Overloaded as e:
+            assert e.reason == "queue_timeout"
+        admission.release(0.05)
+        snapshot = admission.snapshot()
+        assert snapshot["active"] == 0 and snapshot["waiting"] == 0, snapshot
+        assert snapshot["admitted"] == 2 and snapshot["rejected"] == 2, snapshot
+    
+    try:
+        asyncio.run(scenario())
+        print("✓ Admission control completed")
+        return True
+    except Exception as e:
+        print(f"✗ Admission control failed: {str(e)}")
+        return False
+
+def test_jd_segmenter():
+    """Test that benefits, EEO and company text are dropped from a JD and nice-to-haves kept apart."""
+    print("Testing JD segmenter...")
+    
+    from jd_segmenter import BENEFITS, COMPANY, LEGAL, focus_jd
+    
+    jd = """About the job
+Acme is a fast-growing analytics company headquartered in Austin.
+Responsibilities
+Build Python services on AWS
+Requirements
+3+ years of experience with Python and SQL
+Nice to have
+Experience with Terraform
+What we offer
+Competitive salary, 401(k) match and unlimited PTO
+Health, dental and vision insurance
+About Acme
+Acme builds the customer intelligence platform trusted by leading retailers.
+Acme is an equal opportunity employer and does not discriminate on the basis of race, color or national origin."""
+    try:
+        focused = focus_jd(jd)
+        assert set(focused.dropped) == {BENEFITS, COMPANY, LEGAL}, focused.dropped
+        assert "Python" in focused.core and "SQL" in focused.core
+        assert "Terraform" in focused.preferred and "Terraform" not in focused.core
+        for text in ("401(k)", "headquartered", "equal opportunity", "retailers"):
+            assert text not in focused.text, text
+        assert focus_jd(focused.text).text == focused.text  # focusing twice changes nothing
+        plain = "Looking for a Python developer with 3+ years of experience in Django and PostgreSQL."
+        assert focus_jd(plain).text == plain  # no sections: kept as is
+        
+        # Skills that contain heading keywords do not open dropped sections
+        hr = """Responsibilities
+Run recruiting campaigns across channels
+Employer branding
+Experience with Workday and Excel
+Data privacy
+Compensation analysis
+Diversity and inclusion programs
+Benefits
+401(k) matching and unlimited PTO"""
+        focused_hr = focus_jd(hr)
+        assert focused_hr.dropped == (BENEFITS,), focused_hr.dropped
+        for text in ("Employer branding", "Experience with Workday and Excel", "Data privacy",
+                     "Compensation analysis", "Diversity and inclusion programs"):
+            assert text in focused_hr.core, text
+        assert "401(k)" not in focused_hr.text
+        print(f"✓ JD segmenter kept {len(focused.text)} of {len(jd)} characters")
+        return True
+    except Exception as e:
+        print(f"✗ JD segmenter failed: {str(e)}")
+        return False
+
+def test_callback_url():
+    """Test that job callbacks cannot target internal addresses."""
+    print("Testing callback URL checks...")
+    
+    from job_worker import check_callback_url
+    
+    try:
+        for url in ("http://169.254.169.254/latest/meta-data", "http://127.0.0.1:8000/", "http://10.1.2.3/hook",
+                    "http://[::1]/", "file:///etc/passwd"):
+            try:
+                check_callback_url(url)
+                raise AssertionError(f"{url} was accepted")
+            except ValueError:
+                pass
+        assert check_callback_url("https://93.184.216.34/hook")  # public address literal
+        print("✓ Callback URL checks completed")
+        return True
+    except Exception as e:
+        print(f"✗ Callback URL checks failed: {str(e)}")
+        return False
+
+def test_pdf_page_cache():
+    """Test that cached PDF pages are stored without page numbers and relabelled on reuse."""
+    print("Testing PDF page cache...")
+    
+    import parser
+    from resume_structure import ResumeStructure
+    
+    page = ("Skills\n[Table 1 on page 3]\nPython | SQL\n",
+            ResumeStructure([{"type": "table", "content": "Python | SQL", "page": 3, "table_num": 1}]))
+    try:
+        parser._pdf_cache_page("test-page", page)
+        text, structure = parser._pdf_cached_page("test-page", 1)
+        assert "[Table 1 on page 1]" in text, text
+        assert [e["page"] for e in structure] == [1]
+        assert parser._pdf_cached_page(None, 1) is None
+        print("✓ PDF page cache completed")
+        return True
+    except Exception as e:
+        print(f"✗ PDF page cache failed: {str(e)}")
+        return False
+
+def test_bulk_checkpoint():
+    """Test that rows cut off by an interrupted bulk run are scored again."""
+    print("Testing bulk scoring checkpoint...")
+    
+    import tempfile
+    from bulk_score import CSV_COLUMNS, RowWriter, drop_partial_line, read_checkpoint
+    
+    def row(n, error=None):
+        return {"resume": f"r{n}.pdf", "jd": "jd.txt", "jd_id": "j", "ats_score": n,
+                "suggested_skills": ["Python"], "recommendations": [], "stages": {},
+                "error": error, "elapsed_ms": 12.5}
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/scores.csv"
+            writer = RowWriter(path, "csv")
+            writer.write([row(1, error="line one\nline two"), row(2)])
+            writer.close()
+            with open(path, "rb+") as f:
+                f.truncate(f.seek(0, 2) - 3)  # cut inside row 2's elapsed_ms
+            # Without truncation, a row with fewer fields does not count
+            with open(f"{tmp}/short.csv", "w") as f:
+                f.write(",".join(CSV_COLUMNS) + "\nr1.pdf,jd.txt,j,50\n")
+            
+            assert read_checkpoint(f"{tmp}/short.csv", "csv") == set()
+            drop_partial_line(path)
+            assert read_checkpoint(path, "csv") == {("r1.pdf", "j")}
+            writer = RowWriter(path, "csv")
+            writer.write([row(2)])
+            writer.close()
+            assert read_checkpoint(path, "csv") == {("r1.pdf", "j"), ("r2.pdf", "j")}
+        print("✓ Bulk scoring checkpoint completed")
+        return True
+    except Exception as e:
+        print(f"✗ Bulk scoring checkpoint failed: {str(e)}")
+        return False
+
+def test_skill_synonyms():
+    """Test synonym matching: off by default, threshold and exact-match precedence."""
+    print("Testing skill synonyms...")
+    
+    import os
+    import numpy as np
+    import spacy
+    import skill_vectors
+    
+    nlp = spacy.blank("en")
+    for word, vector in [("postgres", [1.0, 0.0, 0.1]), ("postgresql", [1.0, 0.0, 0.0]),
+                         ("mysql", [0.6, 0.8, 0.0]), ("python", [0.0, 0.0, 1.0]),
+                         ("cpython", [0.0, 0.1, 1.0])]:
+        nlp.vocab.set_vector(word, np.array(vector, dtype=np.float32))
+    saved = skill_vectors._index
+    try:
+        skill_vectors._index = skill_vectors.SkillVectorIndex(nlp, ["postgresql", "python"])
+        jd = {"postgresql", "python", "kubernetes"}
+        resume = {"postgres", "mysql", "python", "cpython"}
+        
+        # Off unless the threshold is lowered
+        assert skill_vectors.SKILL_SYNONYM_THRESHOLD == 1.0 or "SKILL_SYNONYM_THRESHOLD" in os.environ
+        assert skill_vectors.match_skills(jd, resume, threshold=1.0) == {"python": "python"}
+        # postgres (cosine 0.995) covers postgresql, mysql (0.6) does not; python stays an exact match
+        matches = skill_vectors.match_skills(jd, resume, threshold=0.9)
+        assert matches == {"python": "python", "postgresql": "postgres"}, matches
+        assert skill_vectors.match_skills(jd, {"mysql"}, threshold=0.9) == {}
+        assert skill_vectors.match_skills(jd, {"mysql"}, threshold=0.5) == {"postgresql": "mysql"}
+        print("✓ Skill synonyms completed")
+        return True
+    except Exception as e:
+        print(f"✗ Skill synonyms failed: {str(e)}")
+        return False
+    finally:
+        skill_vectors._index = saved
+
+def test_store_fork():
+    """Test that SQLite stores opened before fork() work in the child with their own connections."""
+    print("Testing stores across fork...")
+    
+    import os
+    import tempfile
+    from job_queue import JobQueue
+    from result_store import ResultStore
+    
+    if not hasattr(os, "fork"):
+        print("✓ Stores across fork skipped (no os.fork)")
+        return True
+    payload = {"success": True, "stages": [{"name": "parse", "status": "completed"}]}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ResultStore(f"{tmp}/results.sqlite3", version="v1")
+            queue = JobQueue(f"{tmp}/jobs.sqlite3")
+            assert store.put(("parent",), payload)  # the parent's connection is open at fork time
+            parent_conn = store._conn
+            pid = os.fork()
+            if pid == 0:
+                ok = False
+                try:
+                    ok = (store._conn is not parent_conn and store.get(("parent",)) == payload
+                          and store.put(("child",), payload)
+                          and queue.submit("r.pdf", b"%PDF-1.4", jd_text="Python") is not None)
+                finally:
+                    os._exit(0 if ok else 1)
+            _, status = os.waitpid(pid, 0)
+            assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0, "child could not use the stores"
+            assert store._conn is parent_conn
+            assert store.get(("child",)) == payload
+            assert queue.stats().get("queued") == 1, queue.stats()
+        print("✓ Stores across fork completed")
+        return True
+    except Exception as e:
+        print(f"✗ Stores across fork failed: {str(e)}")
+        return False
+
+def test_jd_registry():
+    """Test JD registration ids, unknown/expired lookups and the profile LRU."""
+    print("Testing JD registry...")
+    
+    import tempfile
+    from fastapi import HTTPException
+    import main
+    from jd_registry import ExpiredJDError, JDRegistry, UnknownJDError
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = JDRegistry(f"{tmp}/jd.sqlite3", max_cached=2)
+            first = registry.register("Senior Python developer.\nExperience with Django and SQL.")
+            again = registry.register("  Senior Python developer.  Experience with\tDjango and SQL.  ")
+            assert first.jd_id == again.jd_id, "same normalized JD must keep its jd_id"
+            assert registry.get(first.jd_id) is first
+            
+            try:
+                registry.get("0" * 24)
+                raise AssertionError("unknown jd_id was accepted")
+            except UnknownJDError:
+                pass
+            
+            # LRU: the least recently used profile leaves the cache, not the database
+            second = registry.register("Data engineer with Spark and Airflow, building batch pipelines on AWS.")
+            registry.get(first.jd_id)
+            third = registry.register("Frontend developer with React and TypeScript, shipping accessible web UIs.")
+            assert list(registry._profiles) == [first.jd_id, third.jd_id], list(registry._profiles)
+            assert registry.get(second.jd_id).jd_id == second.jd_id  # rebuilt from the stored text
+            assert len(registry._profiles) == 2
+            
+            expired = JDRegistry(f"{tmp}/expired.sqlite3", ttl_seconds=-1)
+            gone = expired.register("Backend developer with Go and Kubernetes, running services in production.")
+            try:
+                expired.get(gone.jd_id)
+                raise AssertionError("expired jd_id was accepted")
+            except ExpiredJDError:
+                pass
+            assert gone.jd_id not in expired._profiles
+            
+            saved = main.jd_registry
+            try:
+                for reg, jd_id, code in ((registry, "0" * 24, 404), (expired, gone.jd_id, 410)):
+                    main.jd_registry = reg
+                    try:
+                        main.get_jd_profile(jd_id)
+                        raise AssertionError(f"{jd_id} was accepted")
+                    except HTTPException as e:
+                        assert e.status_code == code, (jd_id, e.status_code)
+            finally:
+                main.jd_registry = saved
+        print("✓ JD registry completed")
+        return True
+    except Exception as e:
+        print(f"✗ JD registry failed: {str(e)}")
+        return False
+
+def test_live_admission():
+    """Test that /live rate limits and admits JD analysis ops and closes the socket when busy."""
+    print("Testing /live admission...")
+    
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    import main
+    from admission import AdmissionController
+    
+    saved_admission = main.admission
+    saved_logs = dict(main.request_logs)
+    try:
+        client = TestClient(main.app)
+        busy = AdmissionController(limit=1, max_queue=0, max_wait=0.1)
+        busy._active = 1  # the only slot is taken
+        main.admission = busy
+        main.request_logs.clear()
+        init = {"op": "init", "jd_text": "Python developer", "resume_structure": []}
+        
+        with client.websocket_connect("/live") as ws:
+            ws.send_json({"op": "delete", "index": 0})  # edits before init fail without a slot
+            reply = ws.receive_json()
+            assert reply["type"] == "error" and "init" in reply["message"], reply
+            ws.send_json(init)
+            reply = ws.receive_json()
+            assert reply["type"] == "error" and reply["code"] == "overloaded", reply
+            assert reply["retry_after"] >= 1
+            try:
+                ws.receive_json()
+                raise AssertionError("socket left open after overload")
+            except WebSocketDisconnect as e:
+                assert e.code == 1013, e.code
+        assert busy.rejected == 1
+        
+        busy._active = 0
+        main.request_logs["testclient"] = [time.time()] * main.Config.RATE_LIMIT
+        with client.websocket_connect("/live") as ws:
+            ws.send_json(init)
+            reply = ws.receive_json()
+            assert reply["type"] == "error" and reply["code"] == "rate_limited", reply
+            try:
+                ws.receive_json()
+                raise AssertionError("socket left open after rate limit")
+            except WebSocketDisconnect as e:
+                assert e.code == 1013, e.code
+        assert busy.admitted == 0
+        print("✓ /live admission completed")
+        return True
+    except Exception as e:
+        print(f"✗ /live admission failed: {str(e)}")
+        return False
+    finally:
+        main.admission = saved_admission
+        main.request_logs.clear()
+        main.request_logs.update(saved_logs)
+
+def test_live_session():
+    """Test LiveSession edit deltas, validation and annotation reuse."""
+    print("Testing live session...")
+    
+    import live_session
+    from live_session import LiveSession
+    
+    jd = "Senior Python developer. Required: Python, Django, PostgreSQL, Docker and AWS. 5+ years of experience building REST APIs."
+    structure = [
+        {"type": "heading", "content": "Jane Doe"},
+        {"type": "text", "content": "jane.doe@example.com | +1 555 123 4567"},
+        {"type": "heading", "content": "Experience"},
+        {"type": "bullet", "content": "Built REST APIs in Python and Django for a payments platform"},
+        {"type": "bullet", "content": "Led a team of four engineers"},
+        {"type": "heading", "content": "Skills"},
+        {"type": "text", "content": "Python, Django"},
+    ]
+    education = {"issue": 'Missing "Education" section', "advice": 'Add a clearly labeled "Education" section.'}
+    
+    def expect_error(fn, *args):
+        try:
+            fn(*args)
+        except ValueError:
+            return
+        raise AssertionError(f"no ValueError for {args}")
+    
+    try:
+        session = LiveSession(jd, structure)
+        snapshot = session.snapshot()
+        assert snapshot["type"] == "snapshot" and snapshot["ats_score"] > 0, snapshot
+        assert education in snapshot["improvement_recommendation"]
+        
+        # Count annotations actually computed from here on
+        annotated = []
+        annotate = session.calculator.annotate_element
+        
+        def counting_annotate(element):
+            annotated.append(element["content"])
+            return annotate(element)
+        session.calculator.annotate_element = counting_annotate
+        
+        richer = {"type": "bullet", "content": "Built REST APIs in Python, Django, PostgreSQL and Docker on AWS"}
+        delta = session.apply({"op": "replace", "index": 3, "element": richer})
+        assert delta["type"] == "delta" and delta["seq"] == 1
+        assert delta["previous_ats_score"] == snapshot["ats_score"]
+        assert delta["ats_score"] > delta["previous_ats_score"], delta
+        removed = delta["suggested_skills"]["removed"]
+        assert removed and not set(removed) & set(session.suggested_skills), delta["suggested_skills"]
+        assert annotated == [richer["content"]], annotated  # the other six come from the cache
+        
+        annotated.clear()
+        delta = session.apply({"op": "insert", "index": 5, "element": {"type": "heading", "content": "Education"}})
+        assert delta["improvement_recommendation"]["resolved"] == [education], delta["improvement_recommendation"]
+        assert delta["ats_score"] >= delta["previous_ats_score"]
+        assert annotated == ["Education"], annotated
+        
+        annotated.clear()
+        delta = session.apply({"op": "delete", "index": 5})
+        assert delta["improvement_recommendation"]["added"] == [education]
+        assert delta["seq"] == 3 and len(session.elements) == len(structure)
+        assert annotated == [], annotated  # nothing new to annotate
+        
+        # Validation: element limits and indices
+        expect_error(LiveSession, jd, [structure[0]] * (live_session.MAX_ELEMENTS + 1))
+        expect_error(session.apply, {"op": "replace", "index": len(structure), "element": richer})
+        expect_error(session.apply, {"op": "replace", "index": "3", "element": richer})
+        expect_error(session.apply, {"op": "insert", "index": len(structure) + 1, "element": richer})
+        expect_error(session.apply, {"op": "delete", "index": -1})
+        expect_error(session.apply, {"op": "replace", "index": 0, "element": {"type": "video"}})
+        saved_max = live_session.MAX_ELEMENTS
+        live_session.MAX_ELEMENTS = len(session.elements)
+        try:
+            expect_error(session.apply, {"op": "insert", "index": 0, "element": richer})
+        finally:
+            live_session.MAX_ELEMENTS = saved_max
+        expect_error(LiveSession(jd, structure[:1]).apply, {"op": "delete", "index": 0})
+        assert session.seq == 3 and len(session.elements) == len(structure)  # failed ops change nothing
+        print("✓ Live session completed")
+        return True
+    except Exception as e:
+        print(f"✗ Live session failed: {str(e)}")
+        return False
+
+def test_stage_deadlines():
+    """Test deadline propagation: cooperative checks, stuck stages and child budgets."""
+    print("Testing stage deadlines...")
+    
+    import threading
+    from deadline import Deadline, DeadlineExceeded, check_deadline, current_deadline, run_bounded
+    from pipeline import COMPLETED, DEGRADED, SKIPPED, run_stage
+    
+    def cooperative(pages):
+        done = []
+        for page in range(pages):
+            done.append(page)
+            time.sleep(0.02)
+            check_deadline("parse", partial=list(done))
+        return done
+    
+    release = threading.Event()
+    
+    def stuck(partial=None):
+        if partial is not None:
+            check_deadline("stuck", partial=partial)
+        release.wait(2.0)  # one long call that cannot check the deadline
+        return "late"
+    
+    try:
+        # A child deadline never outlives its parent
+        parent = Deadline(0.5)
+        assert parent.child(10).at == parent.at
+        assert parent.child(0.1).at < parent.at
+        assert parent.child(None).at == parent.at
+        assert Deadline().child(1).at is not None and Deadline().child(None).at is None
+        
+        # Cooperative checks: the partial result at the last checkpoint is used
+        stages = []
+        status_, value = run_stage(stages, "parse", cooperative, 100, budget=0.1)
+        assert status_ == DEGRADED and value and len(value) < 100, (status_, value)
+        assert stages[-1]["name"] == "parse" and stages[-1]["status"] == DEGRADED
+        status_, value = run_stage(stages, "parse", cooperative, 2, budget=5)
+        assert (status_, value) == (COMPLETED, [0, 1])
+        try:
+            run_bounded(Deadline(0.05), "parse", cooperative, 100)
+            raise AssertionError("run_bounded ignored the deadline")
+        except DeadlineExceeded as e:
+            assert e.stage == "parse" and e.partial, e.partial
+        
+        # A stage stuck past its budget is abandoned at the deadline
+        t0 = time.perf_counter()
+        status_, value = run_stage(stages, "stuck", stuck, budget=0.1)
+        assert status_ == SKIPPED and value is None, (status_, value)
+        status_, value = run_stage(stages, "stuck", stuck, {"text": "page 1"}, budget=0.1)
+        assert status_ == DEGRADED and value == {"text": "page 1"}, (status_, value)
+        assert time.perf_counter() - t0 < 1.0, "stage held the caller past its deadline"
+        
+        # The overall deadline caps a generous stage budget
+        t0 = time.perf_counter()
+        status_, _ = run_stage(stages, "stuck", stuck, deadline=Deadline(0.1), budget=10)
+        assert status_ == SKIPPED and time.perf_counter() - t0 < 1.0
+        assert current_deadline().at is None  # the caller's context is untouched
+        print("✓ Stage deadlines completed")
+        return True
+    except Exception as e:
+        print(f"✗ Stage deadlines failed: {str(e)}")
+        return False
+    finally:
+        release.set()
+
+def test_coalescer():
+    """Test that concurrent identical analyses share one computation and always release their key."""
+    print("Testing request coalescing...")
+    
+    import asyncio
+    from coalesce import Coalescer
+    
+    async def scenario():
+        coalescer = Coalescer()
+        calls = []
+        gate = asyncio.Event()
+        
+        async def compute():
+            calls.append(1)
+            await gate.wait()
+            return {"ats_score": 70}
+        
+        # Two identical requests: one computation, the second one shares it
+        leader = asyncio.ensure_future(coalescer.run("k", compute))
+        follower = asyncio.ensure_future(coalescer.run("k", compute))
+        await asyncio.sleep(0)
+        assert len(coalescer) == 1
+        gate.set()
+        assert await leader == ({"ats_score": 70}, False)
+        assert await follower == ({"ats_score": 70}, True)
+        assert len(calls) == 1 and len(coalescer) == 0
+        
+        # A follower that goes away leaves the leader's computation running
+        gate.clear()
+        leader = asyncio.ensure_future(coalescer.run("k", compute))
+        follower = asyncio.ensure_future(coalescer.run("k", compute))
+        await asyncio.sleep(0)
+        task = coalescer._inflight["k"]
+        follower.cancel()
+        await asyncio.sleep(0)
+        assert follower.cancelled() and not task.cancelled() and not leader.done()
+        gate.set()
+        assert await leader == ({"ats_score": 70}, False)
+        assert len(calls) == 2 and len(coalescer) == 0
+        
+        # A failure reaches every waiter and frees the key for the next request
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("parse failed")
+        results = await asyncio.gather(coalescer.run("k", failing), coalescer.run("k", failing),
+                                       return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results), results
+        assert len(coalescer) == 0 and coalescer._inflight == {}
+        assert await coalescer.run("k", compute) == ({"ats_score": 70}, False)
+        assert len(calls) == 3
+    
+    try:
+        asyncio.run(scenario())
+        print("✓ Request coalescing completed")
+        return True
+    except Exception as e:
+        print(f"✗ Request coalescing failed: {str(e)}")
+        return False
+
+def test_response_encoding():
+    """Test Accept negotiation, the JSON fallback without msgpack and offloaded gzip."""
+    print("Testing response encoding...")
+    
+    import gzip
+    import json
+    from fastapi import FastAPI
+    from fastapi.responses import Response
+    from fastapi.testclient import TestClient
+    import encoding
+    import metrics
+    from encoding import JSON, MSGPACK, OffloadedGZipMiddleware, encode, encode_timed, negotiate
+    
+    installed = encoding.msgpack
+    payload = {"ats_score": 72, "suggested_skills": ["docker", "aws"], "tags": {"b", "a"}}
+    try:
+        # negotiate() only needs to know that msgpack is importable
+        encoding.msgpack = installed or object()
+        assert negotiate("") == JSON and negotiate("*/*") == JSON
+        assert negotiate("application/msgpack") == MSGPACK
+        assert negotiate("application/x-msgpack, application/json;q=0.5") == MSGPACK
+        assert negotiate("application/json, application/msgpack;q=0.8") == JSON
+        assert negotiate("application/msgpack;q=0, */*") == JSON
+        assert negotiate("application/json;q=0.2, application/msgpack;q=bad") == JSON
+        assert negotiate("text/html") == JSON
+        
+        # Without msgpack every client gets JSON, whatever it asks for
+        encoding.msgpack = None
+        assert negotiate("application/msgpack") == JSON
+        body, media_type = encode_timed(payload, MSGPACK, "test", "full")
+        assert media_type == JSON and json.loads(body) == dict(payload, tags=["a", "b"])
+        if installed is not None:
+            encoding.msgpack = installed
+            assert installed.unpackb(encode(payload, MSGPACK), raw=False)["tags"] == ["a", "b"]
+        
+        app = FastAPI()
+        app.add_middleware(OffloadedGZipMiddleware, minimum_size=100, offload_size=10_000)
+        
+        @app.get("/size/{n}")
+        def sized(n: int):
+            return Response(b"x" * n, media_type="text/plain")
+        
+        @app.get("/encoded")
+        def encoded():
+            return Response(gzip.compress(b"y" * 500), media_type="text/plain",
+                            headers={"Content-Encoding": "gzip"})
+        
+        client = TestClient(app)
+        metrics.reset()
+        small = client.get("/size/50", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers and small.content == b"x" * 50
+        plain = client.get("/size/5000", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers and len(plain.content) == 5000
+        inline = client.get("/size/5000", headers={"Accept-Encoding": "gzip"})
+        assert inline.headers["content-encoding"] == "gzip" and inline.content == b"x" * 5000
+        assert int(inline.headers["content-length"]) < 5000
+        assert "Accept-Encoding" in inline.headers["vary"]
+        offloaded = client.get("/size/50000", headers={"Accept-Encoding": "gzip"})
+        assert offloaded.headers["content-encoding"] == "gzip" and offloaded.content == b"x" * 50000
+        already = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+        assert already.content == b"y" * 500  # compressed once, not twice
+        recorded = metrics.snapshot()["metrics"]
+        assert recorded["gzip_ms{offloaded=False}"]["count"] == 1, recorded
+        assert recorded["gzip_ms{offloaded=True}"]["count"] == 1, recorded
+        print("✓ Response encoding completed")
+        return True
+    except Exception as e:
+        print(f"✗ Response encoding failed: {str(e)}")
+        return False
+    finally:
+        encoding.msgpack = installed
+        metrics.reset()
+
+def test_resume_token():
+    """Test that X-Resume-Token replaces a re-upload and is dropped with a parser version bump."""
+    print("Testing resume tokens...")
+    
+    import tempfile
+    import zipfile
+    from io import BytesIO
+    from fastapi.testclient import TestClient
+    import main
+    from result_store import ResultStore
+    
+    ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    heading = '<w:pPr><w:pStyle w:val="Heading1"/></w:pPr>'
+    lines = [("Jane Doe", ""), ("jane.doe@example.com | +1 555 123 4567", ""), ("Experience", heading),
+             ("Built REST APIs in Python and Django for a payments platform", ""),
+             ("Skills", heading), ("Python, Django, SQL", ""), ("Education", heading), ("BSc Computer Science", "")]
+    body = "".join(f"<w:p>{style}<w:r><w:t>{text}</w:t></w:r></w:p>" for text, style in lines)
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("word/document.xml", f"<w:document {ns}><w:body>{body}</w:body></w:document>")
+        zf.writestr("word/styles.xml", f'<w:styles {ns}><w:style w:type="paragraph" w:styleId="Heading1">'
+                                       '<w:name w:val="heading 1"/><w:rPr><w:sz w:val="28"/></w:rPr></w:style></w:styles>')
+    docx = ("resume.docx", buffer.getvalue(),
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+    jd = "Senior Python developer. Required: Python, Django, PostgreSQL, Docker and AWS. 5+ years of experience building REST APIs."
+    
+    saved = (main.result_store, main.resume_store, main.parse)
+    parsed = []
+    
+    def counting_parse(*args, **kwargs):
+        parsed.append(args[0])
+        return saved[2](*args, **kwargs)
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # No result store: the token request must run the analysis on the stored parse
+            main.result_store = None
+            main.resume_store = ResultStore(f"{tmp}/resumes.sqlite3", version=f"parser-{main.parser.PARSER_VERSION}")
+            main.parse = counting_parse
+            main.request_logs.clear()
+            client = TestClient(main.app)
+            
+            first = client.post("/process", data={"jd_text": jd}, files={"resume": docx})
+            assert first.status_code == 200, first.text
+            token = first.headers.get("X-Resume-Token")
+            assert token and parsed == ["resume.docx"], (token, parsed)
+            
+            again = client.post("/process", data={"jd_text": jd, "resume_token": token})
+            assert again.status_code == 200, again.text
+            assert parsed == ["resume.docx"], "the stored parse was parsed again"
+            assert again.json()["ats_score"] == first.json()["ats_score"]
+            assert "X-Resume-Token" not in again.headers and "resume_text" not in again.json()
+            
+            unknown = client.post("/process", data={"jd_text": jd, "resume_token": "not-a-token"})
+            assert unknown.status_code == 404 and unknown.json()["detail"]["code"] == "resume_unknown", unknown.text
+            
+            # A new parser version does not serve parses made by the old one
+            main.resume_store = ResultStore(f"{tmp}/resumes.sqlite3", version="parser-next")
+            stale = client.post("/process", data={"jd_text": jd, "resume_token": token})
+            assert stale.status_code == 404 and stale.json()["detail"]["code"] == "resume_unknown", stale.text
+            assert parsed == ["resume.docx"]
+        print("✓ Resume tokens completed")
+        return True
+    except Exception as e:
+        print(f"✗ Resume tokens failed: {str(e)}")
+        return False
+    finally:
+        main.result_store, main.resume_store, main.parse = saved
+        main.request_logs.clear()
+
+def test_skill_artifact():
+    """Test building, matching and rejecting damaged or foreign skill artifacts."""
+    print("Testing skill artifact...")
+    
+    import struct
+    import tempfile
+    from skill_artifact import (FORMAT_VERSION, KIND_LOW, MAGIC, SkillArtifact,
+                                build_artifact, get_skill_artifact)
+    
+    skill_db = {
+        "KS1": {"skill_name": "Python", "skill_type": "Hard Skill",
+                "high_surfce_forms": {"full": "python"}, "low_surface_forms": []},
+        "KS2": {"skill_name": "Machine Learning", "skill_type": "Hard Skill",
+                "high_surfce_forms": {"full": "machine learning", "abv": "ml"},
+                "low_surface_forms": ["machine learn"]},
+        "KS3": {"skill_name": "C++", "skill_type": "Hard Skill", "high_surfce_forms": {"full": "c++"}},
+        "KS4": {"skill_name": "Machine Learning Operations", "skill_type": "Hard Skill",
+                "high_surfce_forms": {"full": "machine learning operations", "abv": "mlops"}},
+    }
+    
+    def expect_rejected(path, reason):
+        try:
+            SkillArtifact(path).close()
+        except ValueError as e:
+            assert reason in str(e), str(e)
+            return
+        raise AssertionError(f"{path} was loaded")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/skills.bin"
+            meta = build_artifact(skill_db, path, source_version="test")
+            assert meta["skills"] == 4 and meta["format_version"] == FORMAT_VERSION
+            
+            artifact = SkillArtifact(path)
+            assert artifact.n_skills == 4 and artifact.meta["source_version"] == "test"
+            assert artifact.token_id("python") >= 0 and artifact.token_id("cobol") == -1
+            assert artifact.extract("Python, C++ and machine learning") == {"python", "c++", "machine learning"}
+            assert artifact.extract("Java and Go") == set()
+            # Longest match wins and consumes its tokens
+            matches = artifact.match("Machine learning operations with ML")
+            assert [artifact.skill_name(m.skill) for m in matches] == ["Machine Learning Operations", "Machine Learning"]
+            assert [m.surface for m in matches] == ["machine learning operations", "ml"]
+            # Low surface forms only on request
+            assert artifact.extract("machine learn") == set()
+            assert artifact.extract("machine learn", include_low=True) == {"machine learn"}
+            assert artifact.match("machine learn")[0].kind == KIND_LOW
+            artifact.close()
+            
+            data = open(path, "rb").read()
+            with open(f"{tmp}/truncated.bin", "wb") as f:
+                f.write(data[:len(data) // 2])
+            expect_rejected(f"{tmp}/truncated.bin", "truncated")
+            with open(f"{tmp}/garbage.bin", "wb") as f:
+                f.write(b"PK\x03\x04" + data[4:])
+            expect_rejected(f"{tmp}/garbage.bin", "not a skill artifact")
+            foreign = bytearray(data)
+            struct.pack_into("<8sI", foreign, 0, MAGIC, FORMAT_VERSION + 1)
+            with open(f"{tmp}/foreign.bin", "wb") as f:
+                f.write(foreign)
+            expect_rejected(f"{tmp}/foreign.bin", f"v{FORMAT_VERSION + 1}")
+            
+            # The shared loader falls back to SkillNER instead of failing
+            assert get_skill_artifact(f"{tmp}/foreign.bin") is None
+            assert get_skill_artifact(f"{tmp}/missing.bin") is None
+        print("✓ Skill artifact completed")
+        return True
+    except Exception as e:
+        print(f"✗ Skill artifact failed: {str(e)}")
+        return False
+
 def main():
     """Run all tests."""
     print("Starting functionality tests...\n")
@@ -151,7 +1307,32 @@ def main():
     tests = [
         test_suggest_skills,
         test_ats_calculator,
-        test_restructure_advice
+        test_restructure_advice,
+        test_lite_scorer,
+        test_job_queue,
+        test_response_projection,
+        test_docx_parser,
+        test_triage,
+        test_skill_vocab,
+        test_result_store,
+        test_analysis_graph,
+        test_fidelity_controller,
+        test_fidelity_skills,
+        test_admission_control,
+        test_jd_segmenter,
+        test_callback_url,
+        test_pdf_page_cache,
+        test_bulk_checkpoint,
+        test_skill_synonyms,
+        test_store_fork,
+        test_jd_registry,
+        test_live_admission,
+        test_live_session,
+        test_stage_deadlines,
+        test_coalescer,
+        test_response_encoding,
+        test_resume_token,
+        test_skill_artifact
     ]
     
     results = []
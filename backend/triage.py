@@ -0,0 +1,211 @@
+"""
+triage.py
+Fast document triage in front of the resume parsers.
+
+Full extraction (parser.parse_pdf_resume) takes seconds per document, even
+for uploads that can never produce a usable result. triage_document() reads
+only the file header, the PDF trailer/page tree and the first page's
+resources and content stream (or the DOCX zip directory), and classifies the
+upload in milliseconds:
+
+    kind            'pdf' or 'docx'
+    page_count      PDF pages (None for DOCX)
+    encrypted       needs a password to open
+    has_text_layer  the first page draws text with fonts
+    image_only      the first page is images only (a scan)
+    approx_chars    text-showing operands on the first page (rough size)
+
+check_triage() turns a classification into a TriageError (a ValueError, so
+callers that already treat ValueError as a bad upload keep working) with a
+machine-readable `code`:
+
+    not_a_pdf / not_a_docx / corrupt / encrypted / image_only /
+    no_text_layer / too_many_pages
+
+A PDF that PyPDF2 cannot read is passed on unclassified (pdfplumber
+recovers some of them); the parser's own error applies if it cannot either.
+
+Usage:
+    >>> result = triage_document("resume.pdf", file_bytes)
+    >>> check_triage(result, max_pages=10)   # raises TriageError for bad uploads
+"""
+
+import re
+import zipfile
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+# Text-showing operands in a content stream: (literal) or <hex> before Tj/TJ/'/"
+_TEXT_SHOW_REGEX = re.compile(rb"(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)\s*(?:Tj|'|\")|\[(.*?)\]\s*TJ", re.S)
+_TJ_STRING_REGEX = re.compile(rb"\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>")
+
+# Signature of OLE compound files. Password-protected Office documents are
+# stored in one instead of a zip, with an EncryptedPackage stream (directory
+# entry names are UTF-16); so are legacy .doc files, without that stream
+_OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ENCRYPTED_PACKAGE = "EncryptedPackage".encode("utf-16-le")
+
+
+class TriageError(ValueError):
+    """An upload that cannot be parsed into a useful result."""
+
+    def __init__(self, code: str, title: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.title = title
+
+
+@dataclass
+class Triage:
+    """Classification of an upload from its metadata and first page."""
+    kind: str
+    page_count: Optional[int] = None
+    encrypted: bool = False
+    has_text_layer: bool = True
+    image_only: bool = False
+    approx_chars: int = 0
+    error: Optional[TriageError] = None  # set when the file cannot even be classified
+
+
+def triage_document(filename: str, file_bytes: bytes) -> Triage:
+    """Classify an upload by file extension and content (see module docstring)."""
+    if (filename or "").lower().endswith(".docx"):
+        return _triage_docx(file_bytes)
+    return _triage_pdf(file_bytes)
+
+
+def check_triage(result: Triage, max_pages: Optional[int] = None) -> None:
+    """
+    Raise TriageError for uploads that should not be parsed.
+
+    Raises:
+        TriageError: With a specific code (see module docstring)
+    """
+    if result.error is not None:
+        raise result.error
+    if result.encrypted:
+        raise TriageError(
+            "encrypted", "Encrypted file",
+            "The file is password-protected. Remove the password and upload it again."
+        )
+    if max_pages is not None and result.page_count is not None and result.page_count > max_pages:
+        raise TriageError(
+            "too_many_pages", "Resume too long",
+            f"Resumes longer than {max_pages} pages are not supported"
+        )
+    if result.image_only:
+        raise TriageError(
+            "image_only", "No text layer",
+            "The PDF is a scanned image without selectable text. "
+            "Export your resume as a text-based PDF or DOCX."
+        )
+    if not result.has_text_layer:
+        raise TriageError(
+            "no_text_layer", "No text layer",
+            "No text was found on the first page of the PDF."
+        )
+
+
+def _triage_pdf(file_bytes: bytes) -> Triage:
+    result = Triage(kind="pdf")
+    if b"%PDF-" not in file_bytes[:1024]:
+        result.error = TriageError("not_a_pdf", "Invalid file", "The file is not a PDF document.")
+        return result
+
+    from PyPDF2 import PdfReader
+
+    try:
+        reader = PdfReader(BytesIO(file_bytes), strict=False)
+        if reader.is_encrypted:
+            try:
+                # Many 'secured' PDFs only restrict editing and open with an empty password
+                result.encrypted = not reader.decrypt("")
+            except Exception:
+                # Cipher not supported here; let the parser try
+                return result
+            if result.encrypted:
+                return result
+        result.page_count = len(reader.pages)
+        if not result.page_count:
+            result.error = TriageError("corrupt", "Invalid file", "The PDF has no pages.")
+            return result
+        _inventory_first_page(result, reader.pages[0])
+    except Exception as e:
+        # PyPDF2 gives up on some files pdfplumber still reads: let the parser decide
+        print(f"Warning: PDF triage failed, deferring to the parser: {str(e)}")
+        return Triage(kind="pdf")
+    return result
+
+
+def _inventory_first_page(result: Triage, page) -> None:
+    """Fonts, image XObjects and text operands of the first page."""
+    fonts, form_fonts, images = _page_resources(page.get("/Resources"))
+
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b""
+    chars = 0
+    for match in _TEXT_SHOW_REGEX.finditer(data):
+        if match.group(1) is not None:
+            chars += _operand_length(match.group(1))
+        else:
+            chars += sum(_operand_length(s) for s in _TJ_STRING_REGEX.findall(match.group(2)))
+    result.approx_chars = chars
+
+    # Text drawn inside form XObjects is not in the page stream; their fonts count
+    result.has_text_layer = (fonts > 0 and chars > 0) or form_fonts > 0
+    result.image_only = not result.has_text_layer and images > 0
+
+
+def _page_resources(resources, depth: int = 0) -> tuple:
+    """
+    (font count, font count in form XObjects, image count) of a resource
+    dict, following form XObjects one level down.
+    """
+    if resources is None:
+        return 0, 0, 0
+    resources = resources.get_object()
+    font_dict = resources.get("/Font")
+    fonts = len(font_dict.get_object()) if font_dict is not None else 0
+    form_fonts = images = 0
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        for ref in xobjects.get_object().values():
+            xobject = ref.get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                images += 1
+            elif subtype == "/Form" and depth == 0:
+                nested_fonts, _, nested_images = _page_resources(xobject.get("/Resources"), depth + 1)
+                form_fonts += nested_fonts
+                images += nested_images
+    return fonts, form_fonts, images
+
+
+def _operand_length(operand: bytes) -> int:
+    if operand.startswith(b"<"):
+        # Hex strings: two digits per byte (one or two bytes per glyph)
+        return len(re.sub(rb"\s", b"", operand[1:-1])) // 2
+    return len(operand) - 2
+
+
+def _triage_docx(file_bytes: bytes) -> Triage:
+    result = Triage(kind="docx")
+    if file_bytes[:8] == _OLE_SIGNATURE:
+        if _ENCRYPTED_PACKAGE in file_bytes:
+            result.encrypted = True
+        else:
+            result.error = TriageError(
+                "not_a_docx", "Invalid file",
+                "The file is a legacy Word document (.doc). Save it as .docx and upload it again."
+            )
+        return result
+    try:
+        with zipfile.ZipFile(BytesIO(file_bytes)) as zf:
+            info = zf.getinfo("word/document.xml")
+            result.approx_chars = info.file_size  # upper bound: XML markup included
+    except KeyError:
+        result.error = TriageError("not_a_docx", "Invalid file", "The file is not a Word document.")
+    except zipfile.BadZipFile:
+        result.error = TriageError("not_a_docx", "Invalid file", "The file is not a DOCX document.")
+    return result
@@ -34,6 +34,32 @@ function Spinner() {
   );
 }
 
+// Job descriptions already registered with the backend: JD text -> { jdId, expiresAt }
+// Scans send the short jd_id instead of re-sending (and re-analyzing) the whole JD.
+const registeredJDs = new Map();
+
+// Register a JD once via /jd and reuse its jd_id until shortly before it expires
+async function getJdId(jdText, signal) {
+  const cached = registeredJDs.get(jdText);
+  if (cached && cached.expiresAt * 1000 > Date.now() + 60000) {
+    return cached.jdId;
+  }
+  const formData = new FormData();
+  formData.append("jd_text", jdText);
+  const response = await fetch("http://localhost:8000/jd", {
+    method: "POST",
+    body: formData,
+    signal
+  });
+  if (!response.ok) {
+    const errData = await response.json().catch(() => ({}));
+    throw new Error(errData.detail?.message || errData.error || `HTTP error! status: ${response.status}`);
+  }
+  const data = await response.json();
+  registeredJDs.set(jdText, { jdId: data.jd_id, expiresAt: data.expires_at });
+  return data.jd_id;
+}
+
 // Main App component
 function App() {
   // State: loading indicators, results, error, PDF file info
@@ -96,21 +122,47 @@ function App() {
         throw new Error("Please upload a resume (PDF or DOCX) before scanning.");
       }
 
-      // Prepare form data for backend
-      const formData = new FormData();
-      formData.append("jd_text", pastedJD);
-      formData.append("resume", resumeFile);
-
       // POST to backend API with timeout
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout
-      
-      try {
-        const response = await fetch("http://localhost:8000/process", {
+
+      // Prepare form data for backend: registered jd_id + resume token, or the file itself
+      const postProcess = async (sendFile) => {
+        const formData = new FormData();
+        formData.append("jd_id", await getJdId(pastedJD, controller.signal));
+        if (sendFile || !resumeToken) {
+          formData.append("resume", resumeFile);
+        } else {
+          formData.append("resume_token", resumeToken);
+        }
+        // Results only: the JD, resume text and structure are not echoed back
+        formData.append("compact", "true");
+        return fetch("http://localhost:8000/process", {
           method: "POST",
           body: formData,
           signal: controller.signal
         });
+      };
+      
+      // Send only the token of an earlier upload; upload the file if the backend no longer knows it
+      const postWithResume = async () => {
+        const response = await postProcess(false);
+        if (response.status === 404 && resumeToken) {
+          const errData = await response.clone().json().catch(() => ({}));
+          if (errData.detail?.code === "resume_unknown") {
+            return postProcess(true);
+          }
+        }
+        return response;
+      };
+      
+      try {
+        let response = await postWithResume();
+        // jd_id expired or unknown to the server: register the JD again and retry once
+        if (response.status === 404 || response.status === 410) {
+          registeredJDs.delete(pastedJD);
+          response = await postWithResume();
+        }
         
         clearTimeout(timeoutId);
         
@@ -121,9 +173,14 @@ function App() {
         
         const data = await response.json();
         console.log("Backend response:", data);
+        // Issued when the file was uploaded: later scans of this file send only the token
+        const issuedToken = response.headers.get("X-Resume-Token");
+        if (issuedToken) {
+          setResumeToken(issuedToken);
+        }
         
         // Update state with backend response
-        setJobDesc(data.jd_text || "");
+        setJobDesc(pastedJD);
         setAtsScore(typeof data.ats_score === "number" ? data.ats_score : null);
         setSuggestedSkills(Array.isArray(data.suggested_skills) ? data.suggested_skills : []);
         setImprovementAdvice(Array.isArray(data.improvement_recommendation) ? data.improvement_recommendation : []);
@@ -146,11 +203,12 @@ function App() {
     }
   };
 
-  // Store uploaded resume file for later scan
+  // Store uploaded resume file (and the server's token for it) for later scan
   const [resumeFile, setResumeFile] = useState(null);
+  const [resumeToken, setResumeToken] = useState(null);
 
   // Handler: PDF/DOCX resume upload
-  const handleUploadResume = (event) => {
+  const handleUploadResume = async (event) => {
     setPdfLoading(true);
     setError("");
     setResumeFilename("");
@@ -168,6 +226,7 @@ function App() {
     }
     setResumeFilename(file.name + " (" + Math.round(file.size / 1024) + " KB)");
     setResumeFile(file);
+    setResumeToken(null);  // the previous file's token must not be sent for this one
     setPdfLoading(false);
   };
 